@@ -1,11 +1,51 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
-from inventario.models import Category, Product, Batch, Movement
+from inventario.models import Category, Product, Batch, Movement, ProductStock
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.services.cache_service import CatalogCache
 from inventario.services.stock_service import StockService
+from inventario.services.valuation_service import ValuationService
+
+
+def _categorias(product_ids):
+    """Categorías de los productos dados"""
+    return set(
+        Product.objects.filter(id__in=product_ids).values_list('category_id', flat=True)
+    )
+
+
+class InvalidaCatalogoMixin:
+    """Invalida la caché y los ETags del catálogo al guardar o borrar"""
+    touches = ()
+    company_path = 'company_id'
+
+    def _empresa(self, obj):
+        return obj.company_id
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        CatalogCache.invalidar(self._empresa(obj), *self.touches)
+
+    def delete_model(self, request, obj):
+        company_id = self._empresa(obj)
+        super().delete_model(request, obj)
+        CatalogCache.invalidar(company_id, *self.touches)
+
+    def delete_queryset(self, request, queryset):
+        company_ids = set(queryset.values_list(self.company_path, flat=True))
+        super().delete_queryset(request, queryset)
+        CatalogCache.invalidar(company_ids, *self.touches)
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(InvalidaCatalogoMixin, admin.ModelAdmin):
+    touches = (
+        CompanyResourceVersion.CATEGORIES,
+        CompanyResourceVersion.PRODUCTS,
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.MOVEMENTS,
+    )
     list_display = ('name', 'slug', 'created_at', 'updated_at')
     search_fields = ('name', 'slug')
     list_filter = ('created_at', 'updated_at')
@@ -14,36 +54,66 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(InvalidaCatalogoMixin, admin.ModelAdmin):
+    touches = (
+        CompanyResourceVersion.PRODUCTS,
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.MOVEMENTS,
+    )
     list_display = ('name', 'category', 'presentation', 'supplier', 'total_stock', 'slug')
     search_fields = ('name', 'slug', 'distribuidor')
     list_filter = ('category',)
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ('total_stock_display',)
+    list_select_related = ('category', 'stock')
 
-    def total_stock_display(self, obj):
-        """Muestra el stock total usando el servicio"""
+    def _on_hand(self, obj):
         try:
-            batches = obj.batches.all()
-            total = sum(b.quantity_available for b in batches)
-            return format_html(
-                '<span style="font-weight: bold; color: {};">{}</span>',
-                'green' if total > 0 else 'red',
-                total
-            )
-        except:
-            return "N/A"
+            return obj.stock.on_hand
+        except ProductStock.DoesNotExist:
+            return 0
+
+    def total_stock_display(self, obj):
+        """Muestra el stock total desde la proyección ProductStock"""
+        total = self._on_hand(obj)
+        return format_html(
+            '<span style="font-weight: bold; color: {};">{}</span>',
+            'green' if total > 0 else 'red',
+            total
+        )
     total_stock_display.short_description = "Stock Total"
 
     def total_stock(self, obj):
         """Columna adicional para listar"""
-        batches = obj.batches.all()
-        return sum(b.quantity_available for b in batches)
+        return self._on_hand(obj)
     total_stock.short_description = "Stock Total"
 
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        """Guarda el producto y revalúa las categorías si cambió de categoría"""
+        super().save_model(request, obj, form, change)
+        if change and 'category' in form.changed_data:
+            ValuationService.reconstruir({form.initial.get('category'), obj.category_id})
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ValuationService.reconstruir([obj.category_id])
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        category_ids = set(queryset.values_list('category_id', flat=True))
+        super().delete_queryset(request, queryset)
+        ValuationService.reconstruir(category_ids)
+
 
 @admin.register(Batch)
-class BatchAdmin(admin.ModelAdmin):
+class BatchAdmin(InvalidaCatalogoMixin, admin.ModelAdmin):
+    touches = (
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.PRODUCTS,
+        CompanyResourceVersion.MOVEMENTS,
+    )
     list_display = ('product', 'quantity_received', 'quantity_available', 'purchase_price', 'expiration_date', 'stock_status', 'supplier')
     search_fields = ('product__name', 'supplier')
     list_filter = ('expiration_date', 'supplier', 'received_at')
@@ -82,9 +152,28 @@ class BatchAdmin(admin.ModelAdmin):
         )
     stock_status.short_description = "Estado Stock"
 
+    @transaction.atomic
     def save_model(self, request, obj, form, change):
-        """Guarda el modelo usando transacciones atómicas del servicio"""
+        """Guarda el lote y reconstruye el stock de los productos afectados"""
+        product_ids = {obj.product_id}
+        if change and 'product' in form.changed_data:
+            product_ids.add(form.initial.get('product'))
         super().save_model(request, obj, form, change)
+        StockService.reconstruir_stock(product_ids)
+        ValuationService.reconstruir(_categorias(product_ids))
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        StockService.reconstruir_stock([obj.product_id])
+        ValuationService.reconstruir(_categorias([obj.product_id]))
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        product_ids = set(queryset.values_list('product_id', flat=True))
+        super().delete_queryset(request, queryset)
+        StockService.reconstruir_stock(product_ids)
+        ValuationService.reconstruir(_categorias(product_ids))
 
 
 @admin.register(Movement)
@@ -0,0 +1,46 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.services.reorder_service import ReorderService
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula el punto de pedido de cada producto a partir de la demanda "
+        "diaria de las últimas semanas y del plazo de entrega. Programarlo "
+        "a diario después de que cierre el día."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fecha",
+            help="Último día de la ventana de demanda YYYY-MM-DD (por defecto hoy)"
+        )
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="Procesar solo esta empresa (se puede repetir)"
+        )
+        parser.add_argument(
+            "--company-chunk",
+            type=int,
+            default=100,
+            help="Empresas procesadas por bloque"
+        )
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options["fecha"]:
+            try:
+                fecha = date.fromisoformat(options["fecha"])
+            except ValueError:
+                raise CommandError("--fecha debe tener el formato YYYY-MM-DD")
+
+        total = ReorderService.calcular(
+            fecha=fecha,
+            company_ids=options["company"],
+            company_chunk=options["company_chunk"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"{total} puntos de pedido calculados"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from inventario.services.reservation_service import ReservationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Libera en bloque las reservas de stock vencidas. "
+        "Pensado para ejecutarse cada minuto desde cron o un scheduler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Reservas liberadas por transacción"
+        )
+
+    def handle(self, *args, **options):
+        total = ReservationService.liberar_vencidas(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} reservas liberadas"))
@@ -0,0 +1,46 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.services.expiration_risk_service import ExpirationRiskService
+
+
+class Command(BaseCommand):
+    help = (
+        "Pronostica qué unidades de cada lote vencerán sin venderse, "
+        "agotando los lotes en orden FEFO al ritmo de ventas de las últimas "
+        "semanas. Programarlo cada noche después de calcular_reorden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fecha",
+            help="Día desde el que se simula YYYY-MM-DD (por defecto hoy)"
+        )
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="Procesar solo esta empresa (se puede repetir)"
+        )
+        parser.add_argument(
+            "--company-chunk",
+            type=int,
+            default=100,
+            help="Empresas procesadas por bloque"
+        )
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options["fecha"]:
+            try:
+                fecha = date.fromisoformat(options["fecha"])
+            except ValueError:
+                raise CommandError("--fecha debe tener el formato YYYY-MM-DD")
+
+        total = ExpirationRiskService.pronosticar(
+            fecha=fecha,
+            company_ids=options["company"],
+            company_chunk=options["company_chunk"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"{total} lotes con unidades en riesgo"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from inventario.models.product import Product
+from inventario.services.stock_service import StockService
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la proyección ProductStock a partir de los lotes. "
+        "Conviene programarlo a diario: 'expiring_soon' depende de la fecha."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            help="Reconstruir solo los productos de esta empresa"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Productos procesados por consulta"
+        )
+
+    def handle(self, *args, **options):
+        productos = Product.objects.order_by("id")
+        if options["company"]:
+            productos = productos.filter(company_id=options["company"])
+
+        ids = list(productos.values_list("id", flat=True))
+        chunk_size = options["chunk_size"]
+        total = 0
+
+        for inicio in range(0, len(ids), chunk_size):
+            total += StockService.reconstruir_stock(ids[inicio:inicio + chunk_size])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} productos reconstruidos"))
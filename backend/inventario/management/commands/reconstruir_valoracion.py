@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from inventario.models.category import Category
+from inventario.services.valuation_service import ValuationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la valoración de inventario por categoría (CategoryValuation) "
+        "a partir de los lotes y del costo de las salidas registradas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            help="Reconstruir solo las categorías de esta empresa"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Categorías procesadas por consulta"
+        )
+
+    def handle(self, *args, **options):
+        categorias = Category.objects.order_by("id")
+        if options["company"]:
+            categorias = categorias.filter(company_id=options["company"])
+
+        ids = list(categorias.values_list("id", flat=True))
+        chunk_size = options["chunk_size"]
+        total = 0
+
+        for inicio in range(0, len(ids), chunk_size):
+            total += ValuationService.reconstruir(ids[inicio:inicio + chunk_size])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} categorías reconstruidas"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import Company
+from inventario.services.metrics_service import MetricsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las métricas del dashboard (CompanyMetrics) de cada "
+        "empresa. Programarlo cada pocos minutos para que el dashboard "
+        "nunca tenga que recalcularlas al abrirse."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="Procesar solo esta empresa (se puede repetir)"
+        )
+
+    def handle(self, *args, **options):
+        company_ids = options["company"] or list(
+            Company.objects.order_by("id").values_list("id", flat=True)
+        )
+        filas = MetricsService.refrescar(company_ids)
+        self.stdout.write(self.style.SUCCESS(f"{len(filas)} empresas actualizadas"))
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.services.outbox_service import OutboxService
+from inventario.services.outbox_sinks import crear_sink
+
+
+class Command(BaseCommand):
+    help = (
+        "Publica los eventos de movimientos pendientes en un destino "
+        "(file:/ruta.jsonl, http(s)://... o queue:) con entrega al menos una "
+        "vez. Cada consumidor avanza su propio cursor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sink", required=True, help="Destino de los eventos")
+        parser.add_argument(
+            "--consumer",
+            default="default",
+            help="Nombre del cursor del consumidor"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Eventos enviados por lote"
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Seguir publicando hasta que se detenga el proceso"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Segundos de espera entre pasadas con --loop"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sink = crear_sink(options["sink"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        while True:
+            total = OutboxService.publicar(
+                sink,
+                consumer=options["consumer"],
+                batch_size=options["batch_size"]
+            )
+            if total:
+                self.stdout.write(f"{total} eventos publicados")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,46 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.services.snapshot_service import SnapshotService
+
+
+class Command(BaseCommand):
+    help = (
+        "Guarda el stock de cada producto al cierre de un día (por defecto "
+        "ayer). Programarlo a diario para que las consultas históricas solo "
+        "tengan que aplicar los movimientos posteriores al último snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fecha",
+            help="Día a fotografiar YYYY-MM-DD (por defecto ayer)"
+        )
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="Procesar solo esta empresa (se puede repetir)"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Productos procesados por bloque"
+        )
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options["fecha"]:
+            try:
+                fecha = date.fromisoformat(options["fecha"])
+            except ValueError:
+                raise CommandError("--fecha debe tener el formato YYYY-MM-DD")
+
+        total = SnapshotService.tomar_snapshots(
+            fecha=fecha,
+            company_ids=options["company"],
+            chunk_size=options["chunk_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"{total} snapshots guardados"))
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.services.stock_service import StockService
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como vencidos todos los lotes con stock cuya fecha de "
+        "vencimiento ya pasó, en todas las empresas. Es seguro ejecutarlo "
+        "varias veces; pensado para programarse a diario (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fecha",
+            help="Fecha de referencia YYYY-MM-DD (por defecto hoy)"
+        )
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="Procesar solo esta empresa (se puede repetir)"
+        )
+        parser.add_argument(
+            "--company-chunk",
+            type=int,
+            default=100,
+            help="Empresas procesadas por bloque"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Lotes vencidos por transacción"
+        )
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options["fecha"]:
+            try:
+                fecha = date.fromisoformat(options["fecha"])
+            except ValueError:
+                raise CommandError("--fecha debe tener el formato YYYY-MM-DD")
+
+        total = StockService.vencer_lotes(
+            fecha=fecha,
+            company_ids=options["company"],
+            company_chunk=options["company_chunk"],
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"{total} lotes vencidos"))
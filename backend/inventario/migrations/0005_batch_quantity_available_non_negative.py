@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0004_alter_batch_code_alter_batch_expiration_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='batch',
+            constraint=models.CheckConstraint(condition=models.Q(('quantity_available__gte', 0)), name='batch_quantity_available_non_negative'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:40
+
+import django.db.models.deletion
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def poblar_stock(apps, schema_editor):
+    Product = apps.get_model('inventario', 'Product')
+    ProductStock = apps.get_model('inventario', 'ProductStock')
+
+    limite = timezone.localdate() + timedelta(days=30)
+    con_stock = Q(batches__quantity_available__gt=0)
+    filas = Product.objects.annotate(
+        on_hand=Sum('batches__quantity_available', filter=con_stock, default=0),
+        expiring_soon=Sum(
+            'batches__quantity_available',
+            filter=con_stock & Q(batches__expiration_date__lte=limite),
+            default=0
+        ),
+        batch_count=Count('batches', filter=con_stock),
+    ).values_list('id', 'on_hand', 'expiring_soon', 'batch_count')
+
+    ProductStock.objects.bulk_create(
+        [
+            ProductStock(
+                product_id=pid,
+                on_hand=on_hand,
+                expiring_soon=expiring_soon,
+                batch_count=batch_count
+            )
+            for pid, on_hand, expiring_soon, batch_count in filas
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_batch_quantity_available_non_negative'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStock',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock', serialize=False, to='inventario.product')),
+                ('on_hand', models.IntegerField(default=0)),
+                ('expiring_soon', models.IntegerField(default=0)),
+                ('batch_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product stock',
+                'verbose_name_plural': 'Product stock',
+            },
+        ),
+        migrations.RunPython(poblar_stock, migrations.RunPython.noop),
+    ]
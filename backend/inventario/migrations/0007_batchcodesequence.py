@@ -0,0 +1,26 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0006_productstock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchCodeSequence',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='batch_code_sequence', serialize=False, to='accounts.company')),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Batch code sequence',
+                'verbose_name_plural': 'Batch code sequences',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0007_batchcodesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productstock',
+            name='reserved',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('ACTIVE', 'Activa'), ('RELEASED', 'Liberada'), ('CONSUMED', 'Consumida'), ('EXPIRED', 'Vencida')], default='ACTIVE', max_length=8)),
+                ('reference', models.CharField(blank=True, default='', max_length=255)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='accounts.company')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='inventario.product')),
+            ],
+            options={
+                'verbose_name': 'Stock reservation',
+                'verbose_name_plural': 'Stock reservations',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['expires_at'], name='reservation_active_expiry_idx')],
+            },
+        ),
+    ]
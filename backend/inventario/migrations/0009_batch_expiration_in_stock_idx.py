@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0008_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(condition=models.Q(('quantity_available__gt', 0)), fields=['expiration_date'], name='batch_expiration_in_stock_idx'),
+        ),
+    ]
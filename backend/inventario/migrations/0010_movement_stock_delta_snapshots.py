@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def poblar_stock_delta(apps, schema_editor):
+    """
+    IN adds and OUT/EXPIRED remove their quantity. The direction of past
+    ADJUST movements was never stored, so they keep a delta of 0.
+    """
+    Movement = apps.get_model('inventario', 'Movement')
+    Movement.objects.filter(movement_type='IN').update(stock_delta=F('quantity'))
+    Movement.objects.filter(movement_type__in=['OUT', 'EXPIRED']).update(
+        stock_delta=-F('quantity')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0009_batch_expiration_in_stock_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movement',
+            name='stock_delta',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(poblar_stock_delta, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ProductStockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='accounts.company')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventario.product')),
+            ],
+            options={
+                'verbose_name': 'Product stock snapshot',
+                'verbose_name_plural': 'Product stock snapshots',
+                'ordering': ['product', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date'), name='unique_stock_snapshot_per_product_date')],
+            },
+        ),
+    ]
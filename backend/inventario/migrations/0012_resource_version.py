@@ -0,0 +1,30 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0011_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyResourceVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=50)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resource_versions', to='accounts.company')),
+            ],
+            options={
+                'verbose_name': 'Resource version',
+                'verbose_name_plural': 'Resource versions',
+                'constraints': [models.UniqueConstraint(fields=('company', 'resource'), name='resource_version_company_resource_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# (index name, table, column) for the UPPER(column) gin_trgm_ops indexes used
+# by ProductSearchService. They serve both the trigram operator and the
+# UPPER(col) LIKE 'Q%' produced by istartswith.
+INDICES = [
+    ('product_name_trgm_idx', 'inventario_product', 'name'),
+    ('product_slug_trgm_idx', 'inventario_product', 'slug'),
+    ('product_supplier_trgm_idx', 'inventario_product', 'supplier'),
+    ('batch_code_trgm_idx', 'inventario_batch', 'code'),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        # SQLite (local dev) uses the LIKE fallback without these indexes
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nombre, tabla, columna in INDICES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} '
+            f'USING gin (UPPER({columna}::text) gin_trgm_ops)'
+        )
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _, _ in INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nombre}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0012_resource_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
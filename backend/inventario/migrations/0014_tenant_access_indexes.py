@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0013_product_search_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(condition=models.Q(('quantity_available__gt', 0)), fields=['product', 'expiration_date', 'id'], name='batch_product_fefo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['company', 'id'], name='category_company_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['batch', 'created_at'], name='movement_batch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['created_at'], name='movement_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['movement_type', 'created_at'], name='movement_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['company', 'id'], name='product_company_id_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_company(apps, schema_editor):
+    Product = apps.get_model('inventario', 'Product')
+    Batch = apps.get_model('inventario', 'Batch')
+    Movement = apps.get_model('inventario', 'Movement')
+
+    # Set-based: one UPDATE ... SET company_id = (SELECT ...) per table
+    Batch.objects.filter(company__isnull=True).update(
+        company_id=Subquery(
+            Product.objects.filter(id=OuterRef('product_id')).values('company_id')[:1]
+        )
+    )
+    Movement.objects.filter(company__isnull=True).update(
+        company_id=Subquery(
+            Batch.objects.filter(id=OuterRef('batch_id')).values('company_id')[:1]
+        )
+    )
+
+    if schema_editor.connection.vendor == 'postgresql':
+        # The new FKs are DEFERRABLE INITIALLY DEFERRED: fire the checks
+        # queued by the UPDATEs now, or the SET NOT NULL below fails with
+        # "pending trigger events"
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0014_tenant_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batch',
+            name='company',
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='batches',
+                to='accounts.company'
+            ),
+        ),
+        migrations.AddField(
+            model_name='movement',
+            name='company',
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='movements',
+                to='accounts.company'
+            ),
+        ),
+        migrations.RunPython(copiar_company, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='batch',
+            name='company',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='batches',
+                to='accounts.company'
+            ),
+        ),
+        migrations.AlterField(
+            model_name='movement',
+            name='company',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='movements',
+                to='accounts.company'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['company', 'id'], name='batch_company_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['company', 'id'], name='movement_company_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['company', 'created_at'], name='movement_company_created_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:32
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+
+
+def poblar_valoracion(apps, schema_editor):
+    Batch = apps.get_model('inventario', 'Batch')
+    Category = apps.get_model('inventario', 'Category')
+    Movement = apps.get_model('inventario', 'Movement')
+    CategoryValuation = apps.get_model('inventario', 'CategoryValuation')
+
+    # Existing movements take the current price of their batch
+    Movement.objects.filter(unit_cost__isnull=True).update(
+        unit_cost=Subquery(
+            Batch.objects.filter(id=OuterRef('batch_id')).values('purchase_price')[:1]
+        )
+    )
+
+    costo = DecimalField(max_digits=16, decimal_places=2)
+    stock = {
+        category_id: (quantity, value)
+        for category_id, quantity, value in (
+            Batch.objects
+            .filter(quantity_available__gt=0)
+            .order_by()
+            .values('product__category_id')
+            .annotate(
+                quantity=Sum('quantity_available'),
+                value=Sum(F('quantity_available') * F('purchase_price'), output_field=costo),
+            )
+            .values_list('product__category_id', 'quantity', 'value')
+        )
+    }
+    cogs = dict(
+        Movement.objects
+        .filter(movement_type='OUT')
+        .order_by()
+        .values('batch__product__category_id')
+        .annotate(total=Sum(F('quantity') * F('unit_cost'), output_field=costo))
+        .values_list('batch__product__category_id', 'total')
+    )
+
+    filas = []
+    for category_id, company_id in Category.objects.values_list('id', 'company_id'):
+        quantity, value = stock.get(category_id, (0, Decimal('0')))
+        filas.append(CategoryValuation(
+            category_id=category_id,
+            company_id=company_id,
+            quantity=quantity,
+            value=value,
+            cogs=cogs.get(category_id) or Decimal('0')
+        ))
+    CategoryValuation.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0015_batch_movement_company'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movement',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='CategoryValuation',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='valuation', serialize=False, to='inventario.category')),
+                ('quantity', models.IntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cogs', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='valuations', to='accounts.company')),
+            ],
+            options={
+                'verbose_name': 'Category valuation',
+                'verbose_name_plural': 'Category valuations',
+            },
+        ),
+        migrations.RunPython(poblar_valoracion, migrations.RunPython.noop),
+    ]
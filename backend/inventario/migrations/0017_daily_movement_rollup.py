@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0016_category_valuation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMovementRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('movement_type', models.CharField(choices=[('IN', 'Entrada'), ('OUT', 'Salida'), ('ADJUST', 'Ajuste'), ('EXPIRED', 'Expirado')], max_length=7)),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('stock_delta', models.BigIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movement_rollups', to='accounts.company')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movement_rollups', to='inventario.product')),
+            ],
+            options={
+                'verbose_name': 'Daily movement rollup',
+                'verbose_name_plural': 'Daily movement rollups',
+                'ordering': ['day', 'product', 'movement_type'],
+                'indexes': [models.Index(fields=['company', 'day'], name='rollup_company_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day', 'movement_type'), name='unique_rollup_per_product_day_type')],
+            },
+        ),
+    ]
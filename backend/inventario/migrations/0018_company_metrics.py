@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0017_daily_movement_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyMetrics',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics', serialize=False, to='accounts.company')),
+                ('total_products', models.IntegerField(default=0)),
+                ('total_categories', models.IntegerField(default=0)),
+                ('active_batches', models.IntegerField(default=0)),
+                ('stock_units', models.BigIntegerField(default=0)),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('low_stock_products', models.IntegerField(default=0)),
+                ('expiring_soon_units', models.BigIntegerField(default=0)),
+                ('expiring_soon_products', models.IntegerField(default=0)),
+                ('movements_today', models.IntegerField(default=0)),
+                ('versions', models.CharField(blank=True, default='', max_length=255)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Company metrics',
+                'verbose_name_plural': 'Company metrics',
+            },
+        ),
+    ]
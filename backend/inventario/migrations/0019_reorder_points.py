@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0018_company_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='lead_time_days',
+            field=models.PositiveSmallIntegerField(default=7),
+        ),
+        migrations.CreateModel(
+            name='ProductReorderPoint',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reorder', serialize=False, to='inventario.product')),
+                ('avg_daily_demand', models.FloatField(default=0)),
+                ('demand_std', models.FloatField(default=0)),
+                ('lead_time_days', models.PositiveSmallIntegerField()),
+                ('safety_stock', models.IntegerField(default=0)),
+                ('reorder_point', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_points', to='accounts.company')),
+            ],
+            options={
+                'verbose_name': 'Product reorder point',
+                'verbose_name_plural': 'Product reorder points',
+            },
+        ),
+    ]
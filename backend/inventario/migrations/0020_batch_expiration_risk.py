@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('inventario', '0019_reorder_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchExpirationRisk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expiration_date', models.DateField()),
+                ('quantity_available', models.IntegerField()),
+                ('expected_sold', models.IntegerField()),
+                ('at_risk_quantity', models.IntegerField()),
+                ('at_risk_value', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('daily_demand', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('batch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='expiration_risk', to='inventario.batch')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiration_risks', to='accounts.company')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiration_risks', to='inventario.product')),
+            ],
+            options={
+                'verbose_name': 'Batch expiration risk',
+                'verbose_name_plural': 'Batch expiration risks',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['company', 'id'], name='expiration_risk_company_idx')],
+            },
+        ),
+    ]
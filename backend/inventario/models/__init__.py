@@ -2,3 +2,14 @@ from .category import Category
 from .product import Product
 from .batch import Batch
 from .movement import Movement
+from .product_stock import ProductStock
+from .batch_code_sequence import BatchCodeSequence
+from .reservation import StockReservation
+from .stock_snapshot import ProductStockSnapshot
+from .outbox import OutboxEvent, OutboxCursor
+from .resource_version import CompanyResourceVersion
+from .valuation import CategoryValuation
+from .movement_rollup import DailyMovementRollup
+from .company_metrics import CompanyMetrics
+from .reorder_point import ProductReorderPoint
+from .expiration_risk import BatchExpirationRisk
@@ -1,4 +1,5 @@
 from django.db import models
+from accounts.models import Company
 from inventario.models.product import Product
 
 
@@ -9,6 +10,13 @@ class Batch(models.Model):
         related_name="batches"
     )
 
+    # Copy of product.company so tenant filters need no join
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="batches"
+    )
+
     code = models.CharField(
         max_length=50,
         blank=True,
@@ -47,8 +55,33 @@ class Batch(models.Model):
             models.UniqueConstraint(
                 fields=["product", "code"],
                 name="unique_batch_code_per_product"
+            ),
+            models.CheckConstraint(
+                condition=models.Q(quantity_available__gte=0),
+                name="batch_quantity_available_non_negative"
             )
         ]
 
+        indexes = [
+            models.Index(
+                fields=["expiration_date"],
+                condition=models.Q(quantity_available__gt=0),
+                name="batch_expiration_in_stock_idx"
+            ),
+            # FEFO allocation: in-stock batches of the ordered products
+            models.Index(
+                fields=["product", "expiration_date", "id"],
+                condition=models.Q(quantity_available__gt=0),
+                name="batch_product_fefo_idx"
+            ),
+            # Company-scoped keyset lists
+            models.Index(fields=["company", "id"], name="batch_company_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Keep the denormalized company in sync with the product
+        self.company_id = self.product.company_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Lote {self.code} - {self.product.name}"
\ No newline at end of file
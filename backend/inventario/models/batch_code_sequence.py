@@ -0,0 +1,26 @@
+from django.db import models
+from accounts.models import Company
+
+
+class BatchCodeSequence(models.Model):
+    """
+    Last BAT-NNNN number handed out per company.
+
+    Codes are allocated by StockService.reservar_codigos with a single
+    UPDATE ... RETURNING, so concurrent stock entries never share a code.
+    """
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="batch_code_sequence"
+    )
+
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Batch code sequence"
+        verbose_name_plural = "Batch code sequences"
+
+    def __str__(self):
+        return f"BAT-{self.last_value:04d} ({self.company_id})"
@@ -13,6 +13,10 @@ class Category(models.Model):
         ordering = ["id"]
         verbose_name = "Category"
         verbose_name_plural = "Categories"
+        indexes = [
+            # Company-scoped lists ordered by id
+            models.Index(fields=["company", "id"], name="category_company_id_idx"),
+        ]
         constraints = [
         models.UniqueConstraint(
             fields=["company", "slug"],
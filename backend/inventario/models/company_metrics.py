@@ -0,0 +1,53 @@
+from django.db import models
+from accounts.models import Company
+
+
+class CompanyMetrics(models.Model):
+    """
+    Dashboard KPIs of a company, computed from the stock projections.
+
+    Served by /api/dashboard/summary/ and recomputed by MetricsService when
+    the company's resource versions change or the row gets older than
+    DASHBOARD_METRICS_MAX_AGE; ``python manage.py refrescar_metricas``
+    refreshes it on a schedule.
+    """
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="metrics"
+    )
+
+    total_products = models.IntegerField(default=0)
+
+    total_categories = models.IntegerField(default=0)
+
+    active_batches = models.IntegerField(default=0)
+
+    stock_units = models.BigIntegerField(default=0)
+
+    stock_value = models.DecimalField(
+        decimal_places=2,
+        max_digits=16,
+        default=0
+    )
+
+    low_stock_products = models.IntegerField(default=0)
+
+    expiring_soon_units = models.BigIntegerField(default=0)
+
+    expiring_soon_products = models.IntegerField(default=0)
+
+    movements_today = models.IntegerField(default=0)
+
+    # Resource versions the row was computed from
+    versions = models.CharField(max_length=255, blank=True, default="")
+
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Company metrics"
+        verbose_name_plural = "Company metrics"
+
+    def __str__(self):
+        return f"Métricas de {self.company_id} ({self.refreshed_at})"
@@ -0,0 +1,62 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.batch import Batch
+from inventario.models.product import Product
+
+
+class BatchExpirationRisk(models.Model):
+    """
+    Units of a batch forecast to expire unsold at the current demand rate.
+
+    Written nightly by ``python manage.py pronosticar_vencimientos``; only
+    batches with units at risk get a row, in FEFO order.
+    """
+    batch = models.OneToOneField(
+        Batch,
+        on_delete=models.CASCADE,
+        related_name="expiration_risk"
+    )
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="expiration_risks"
+    )
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="expiration_risks"
+    )
+
+    expiration_date = models.DateField()
+
+    quantity_available = models.IntegerField()
+
+    # Units expected to sell before expiration_date
+    expected_sold = models.IntegerField()
+
+    at_risk_quantity = models.IntegerField()
+
+    at_risk_value = models.DecimalField(
+        decimal_places=2,
+        max_digits=14
+    )
+
+    daily_demand = models.FloatField()
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["id"]
+
+        verbose_name = "Batch expiration risk"
+        verbose_name_plural = "Batch expiration risks"
+
+        indexes = [
+            # Company-scoped keyset pages
+            models.Index(fields=["company", "id"], name="expiration_risk_company_idx"),
+        ]
+
+    def __str__(self):
+        return f"Lote {self.batch_id}: {self.at_risk_quantity} en riesgo"
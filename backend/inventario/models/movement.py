@@ -1,8 +1,11 @@
 from django.db import models
+from accounts.models import Company
 from inventario.models.batch import Batch
 
 class Movement(models.Model):
     batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name="movements")
+    # Copy of batch.company so tenant filters need no join
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="movements")
     TYPES = [
         ("IN", "Entrada"),
         ("OUT", "Salida"),
@@ -11,6 +14,10 @@ class Movement(models.Model):
     ]
     movement_type = models.CharField(max_length=7, choices=TYPES)
     quantity = models.PositiveIntegerField()
+    # Signed effect on the batch's quantity_available (ADJUST can go either way)
+    stock_delta = models.IntegerField(default=0)
+    # Purchase price of the batch (cost layer) when the movement happened
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     note = models.TextField(blank=True, null=True)
 
@@ -18,6 +25,23 @@ class Movement(models.Model):
         ordering = ["id"]
         verbose_name = "Movement"
         verbose_name_plural = "Movements"
+        indexes = [
+            # Company-scoped keyset lists and date-range exports
+            models.Index(fields=["company", "id"], name="movement_company_id_idx"),
+            models.Index(fields=["company", "created_at"], name="movement_company_created_idx"),
+            # Batch ledger and as-of-date deltas per product
+            models.Index(fields=["batch", "created_at"], name="movement_batch_created_idx"),
+            # Date-range exports and reports, optionally by type
+            models.Index(fields=["created_at"], name="movement_created_idx"),
+            models.Index(fields=["movement_type", "created_at"], name="movement_type_created_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.company_id is None:
+            self.company_id = self.batch.company_id
+        if self.unit_cost is None:
+            self.unit_cost = self.batch.purchase_price
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.movement_type
\ No newline at end of file
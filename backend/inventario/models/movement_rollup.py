@@ -0,0 +1,57 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.movement import Movement
+from inventario.models.product import Product
+
+
+class DailyMovementRollup(models.Model):
+    """
+    Movement totals per product, local day and movement type.
+
+    Kept up to date by StockService in the transaction that writes the
+    movements; rebuild any date range from the ledger with
+    ``python manage.py reconstruir_rollup``. Time-series reports read only
+    this table.
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="movement_rollups"
+    )
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="movement_rollups"
+    )
+
+    day = models.DateField()
+
+    movement_type = models.CharField(max_length=7, choices=Movement.TYPES)
+
+    quantity = models.BigIntegerField(default=0)
+
+    stock_delta = models.BigIntegerField(default=0)
+
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["day", "product", "movement_type"]
+
+        verbose_name = "Daily movement rollup"
+        verbose_name_plural = "Daily movement rollups"
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day", "movement_type"],
+                name="unique_rollup_per_product_day_type"
+            )
+        ]
+
+        indexes = [
+            # Company trend queries over a date range
+            models.Index(fields=["company", "day"], name="rollup_company_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.day} {self.movement_type}: {self.quantity}"
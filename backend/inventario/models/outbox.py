@@ -0,0 +1,71 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.movement import Movement
+
+
+class OutboxEvent(models.Model):
+    """
+    Change-feed row written in the same transaction as a Movement.
+
+    The id is the cursor: relays and API consumers read events with an id
+    greater than the last one they processed.
+    """
+    MOVEMENT_CREATED = "movement.created"
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="outbox_events"
+    )
+
+    movement = models.ForeignKey(
+        Movement,
+        on_delete=models.SET_NULL,
+        related_name="outbox_events",
+        blank=True,
+        null=True
+    )
+
+    event_type = models.CharField(max_length=50)
+
+    payload = models.JSONField()
+
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ["id"]
+
+        verbose_name = "Outbox event"
+        verbose_name_plural = "Outbox events"
+
+        indexes = [
+            models.Index(
+                fields=["company", "id"],
+                name="outbox_company_id_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.id}"
+
+
+class OutboxCursor(models.Model):
+    """Last event id published by a relay consumer."""
+    name = models.CharField(max_length=100, unique=True)
+
+    last_event_id = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        ordering = ["name"]
+
+        verbose_name = "Outbox cursor"
+        verbose_name_plural = "Outbox cursors"
+
+    def __str__(self):
+        return f"{self.name}: {self.last_event_id}"
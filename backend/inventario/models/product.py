@@ -8,6 +8,8 @@ class Product(models.Model):
     slug = models.SlugField()
     presentation = models.CharField(max_length=255, blank=True, null=True)
     supplier = models.CharField(max_length=255)
+    # Days the supplier takes to deliver; drives the reorder point
+    lead_time_days = models.PositiveSmallIntegerField(default=7)
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -16,6 +18,10 @@ class Product(models.Model):
         ordering = ["id"]
         verbose_name = "Product"
         verbose_name_plural = "Products"
+        indexes = [
+            # Company-scoped lists ordered by id
+            models.Index(fields=["company", "id"], name="product_company_id_idx"),
+        ]
         constraints = [
         models.UniqueConstraint(
         fields=["company", "slug"],
@@ -0,0 +1,35 @@
+from django.db import models
+from inventario.models.product import Product
+
+
+class ProductStock(models.Model):
+    """
+    Per-product stock projection kept up to date by StockService.
+
+    Rebuild it from batches with ``python manage.py reconstruir_stock``.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stock"
+    )
+
+    on_hand = models.IntegerField(default=0)
+
+    expiring_soon = models.IntegerField(default=0)
+
+    batch_count = models.IntegerField(default=0)
+
+    reserved = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = "Product stock"
+        verbose_name_plural = "Product stock"
+
+    def __str__(self):
+        return f"Stock de {self.product_id}: {self.on_hand}"
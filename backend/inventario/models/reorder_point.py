@@ -0,0 +1,44 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.product import Product
+
+
+class ProductReorderPoint(models.Model):
+    """
+    Reorder point of a product from its recent sales velocity.
+
+    ``reorder_point = avg_daily_demand * lead_time_days + safety_stock``,
+    with ``safety_stock = z * demand_std * sqrt(lead_time_days)``. Computed
+    for every product at once by ``python manage.py calcular_reorden``.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="reorder"
+    )
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="reorder_points"
+    )
+
+    avg_daily_demand = models.FloatField(default=0)
+
+    demand_std = models.FloatField(default=0)
+
+    lead_time_days = models.PositiveSmallIntegerField()
+
+    safety_stock = models.IntegerField(default=0)
+
+    reorder_point = models.IntegerField(default=0)
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Product reorder point"
+        verbose_name_plural = "Product reorder points"
+
+    def __str__(self):
+        return f"Punto de pedido de {self.product_id}: {self.reorder_point}"
@@ -0,0 +1,71 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.product import Product
+
+
+class StockReservation(models.Model):
+    """
+    Temporary hold on a product's stock between cart and payment.
+
+    Active holds are counted in ProductStock.reserved, which StockService
+    subtracts from the stock it can allocate to sales.
+    """
+    ACTIVE = "ACTIVE"
+    RELEASED = "RELEASED"
+    CONSUMED = "CONSUMED"
+    EXPIRED = "EXPIRED"
+    STATUSES = [
+        (ACTIVE, "Activa"),
+        (RELEASED, "Liberada"),
+        (CONSUMED, "Consumida"),
+        (EXPIRED, "Vencida"),
+    ]
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+
+    quantity = models.PositiveIntegerField()
+
+    status = models.CharField(
+        max_length=8,
+        choices=STATUSES,
+        default=ACTIVE
+    )
+
+    reference = models.CharField(
+        max_length=255,
+        blank=True,
+        default=""
+    )
+
+    expires_at = models.DateTimeField()
+
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ["id"]
+
+        verbose_name = "Stock reservation"
+        verbose_name_plural = "Stock reservations"
+
+        indexes = [
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(status="ACTIVE"),
+                name="reservation_active_expiry_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Reserva {self.id} - {self.quantity} de {self.product_id}"
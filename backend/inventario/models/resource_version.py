@@ -0,0 +1,39 @@
+from django.db import models
+from accounts.models import Company
+
+
+class CompanyResourceVersion(models.Model):
+    """
+    Write counter per company and resource (products, batches, ...).
+
+    Bumped on every write by the views and StockService; list and detail
+    GETs derive their ETag from it, so polling clients get a 304 without
+    reading the resource tables.
+    """
+    CATEGORIES = "categories"
+    PRODUCTS = "products"
+    BATCHES = "batches"
+    MOVEMENTS = "movements"
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="resource_versions"
+    )
+
+    resource = models.CharField(max_length=50)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "resource"],
+                name="resource_version_company_resource_unique"
+            ),
+        ]
+        verbose_name = "Resource version"
+        verbose_name_plural = "Resource versions"
+
+    def __str__(self):
+        return f"{self.resource} v{self.version} ({self.company_id})"
@@ -0,0 +1,47 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.product import Product
+
+
+class ProductStockSnapshot(models.Model):
+    """
+    Stock of a product at the end of ``date``.
+
+    Taken daily by ``python manage.py tomar_snapshots``; historical stock is
+    the nearest snapshot plus the movement deltas after it.
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots"
+    )
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots"
+    )
+
+    date = models.DateField()
+
+    quantity = models.IntegerField()
+
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ["product", "date"]
+
+        verbose_name = "Product stock snapshot"
+        verbose_name_plural = "Product stock snapshots"
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "date"],
+                name="unique_stock_snapshot_per_product_date"
+            )
+        ]
+
+    def __str__(self):
+        return f"Stock de {self.product_id} al {self.date}: {self.quantity}"
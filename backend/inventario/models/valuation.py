@@ -0,0 +1,51 @@
+from django.db import models
+from accounts.models import Company
+from inventario.models.category import Category
+
+
+class CategoryValuation(models.Model):
+    """
+    Inventory value per category, kept up to date by StockService.
+
+    ``value`` is the cost of the units on hand, each batch being a cost
+    layer at its purchase price; ``cogs`` is the accumulated cost of the
+    units sold (OUT movements) at the cost of the layers they consumed.
+    Rebuild it with ``python manage.py reconstruir_valoracion``.
+    """
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="valuation"
+    )
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="valuations"
+    )
+
+    quantity = models.IntegerField(default=0)
+
+    value = models.DecimalField(
+        decimal_places=2,
+        max_digits=16,
+        default=0
+    )
+
+    cogs = models.DecimalField(
+        decimal_places=2,
+        max_digits=16,
+        default=0
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = "Category valuation"
+        verbose_name_plural = "Category valuations"
+
+    def __str__(self):
+        return f"Valoración de {self.category_id}: {self.value}"
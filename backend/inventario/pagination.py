@@ -0,0 +1,100 @@
+"""
+Keyset (cursor) pagination for large list endpoints.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    """
+    Paginate a queryset by ascending primary key.
+
+    Each page is read with ``WHERE id > <last id> ORDER BY id LIMIT n``, so
+    it costs the same index range scan whether it is page 1 or page 10,000.
+    The position travels as an opaque ``cursor`` query parameter; the body
+    stays a plain list and the next page is announced in a ``Link`` header
+    (``rel="next"``) and in ``X-Next-Cursor``.
+
+    Query Parameters:
+        - cursor: Opaque cursor from the previous page (optional)
+        - limit: Page size (default PAGE_SIZE, max 1000)
+    """
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = settings.REST_FRAMEWORK.get('PAGE_SIZE', 100)
+    max_limit = 1000
+
+    @staticmethod
+    def encode_cursor(last_id):
+        raw = json.dumps({"id": last_id}).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Raises:
+            ValueError: If the cursor was not produced by this paginator
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        return last_id
+
+    def get_limit(self, request):
+        value = request.query_params.get(self.limit_query_param)
+        if value is None:
+            return self.default_limit
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        return max(1, min(limit, self.max_limit))
+
+    def paginate_queryset(self, queryset, request):
+        """
+        Return one page of ``queryset`` as a list.
+
+        One extra row is fetched to know whether a next page exists
+        without a COUNT query.
+        """
+        self.request = request
+        limit = self.get_limit(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(id__gt=self.decode_cursor(cursor))
+
+        page = list(queryset.order_by('id')[:limit + 1])
+        self.next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            self.next_cursor = self.encode_cursor(page[-1].id)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        response = Response(data)
+        next_link = self.get_next_link()
+        if next_link:
+            response['Link'] = f'<{next_link}>; rel="next"'
+            response['X-Next-Cursor'] = self.next_cursor
+        return response
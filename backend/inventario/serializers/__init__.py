@@ -1,4 +1,6 @@
 from inventario.serializers.batch_serializer import BatchCreateSerializer
 from inventario.serializers.category_serializer import CategorySerializer
 from inventario.serializers.movement_serializer import MovementSerializer
-from inventario.serializers.product_serializer import ProductSerializer
\ No newline at end of file
+from inventario.serializers.product_serializer import ProductSerializer
+from inventario.serializers.stock_serializer import StockBulkInSerializer, StockOrderOutSerializer
+from inventario.serializers.reservation_serializer import StockReservationSerializer
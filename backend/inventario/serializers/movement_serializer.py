@@ -26,7 +26,7 @@ class MovementSerializer(serializers.ModelSerializer):
     
     def get_product(self, obj):
         """Return product ID from the batch."""
-        return obj.batch.product.id
+        return obj.batch.product_id
 
     def get_product_name(self, obj):
         """Return product name from the batch."""
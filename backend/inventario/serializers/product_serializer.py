@@ -1,11 +1,21 @@
 from rest_framework import serializers
 from inventario.models.product import Product
+from inventario.models.product_stock import ProductStock
 
 class ProductSerializer(serializers.ModelSerializer):
+    stock = serializers.SerializerMethodField()
+
     class Meta:
         model = Product
-        fields = ["id", "name", "slug", "presentation", "supplier", "company", "category", "created_at", "updated_at"]
+        fields = ["id", "name", "slug", "presentation", "supplier", "lead_time_days", "company", "category", "stock", "created_at", "updated_at"]
         read_only_fields = ["id", "company", "created_at", "updated_at"]
+
+    def get_stock(self, obj):
+        """Return on-hand quantity from the ProductStock projection."""
+        try:
+            return obj.stock.on_hand
+        except ProductStock.DoesNotExist:
+            return 0
     
     def create(self, validated_data):
         """
@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from inventario.models.reservation import StockReservation
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    """Serializer for StockReservation responses."""
+
+    class Meta:
+        model = StockReservation
+        fields = [
+            "id",
+            "product",
+            "quantity",
+            "status",
+            "reference",
+            "expires_at",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class StockReservationCreateSerializer(serializers.Serializer):
+    """Serializer for creating reservations with POST requests."""
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    ttl_seconds = serializers.IntegerField(min_value=1, max_value=86400, required=False)
+    reference = serializers.CharField(max_length=255, required=False, allow_blank=True)
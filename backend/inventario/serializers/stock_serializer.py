@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+
+class StockInLineSerializer(serializers.Serializer):
+    """One line of a supplier delivery."""
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    purchase_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    supplier = serializers.CharField(max_length=255)
+    expiration_date = serializers.DateField(required=False, allow_null=True)
+    code = serializers.CharField(max_length=50, required=False, allow_blank=True)
+
+
+class StockBulkInSerializer(serializers.Serializer):
+    """Serializer for POST /stock/in/bulk/."""
+    lines = StockInLineSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class StockOutLineSerializer(serializers.Serializer):
+    """One line of an order."""
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockOrderOutSerializer(serializers.Serializer):
+    """Serializer for POST /stock/out/order/."""
+    lines = StockOutLineSerializer(many=True, allow_empty=False, max_length=500)
+    note = serializers.CharField(required=False, allow_blank=True)
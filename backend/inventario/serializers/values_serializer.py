@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.db.models import Count, F, FilteredRelation, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+class ValuesSerializer:
+    """
+    Read-only list serializer over ``QuerySet.values_list()``.
+
+    Produces the same output as the matching ModelSerializer without
+    building model or serializer field instances per row, and only selects
+    the columns of the requested fields (``?fields=id,name``).
+
+    Subclasses declare ``fields`` as ``{output name: ORM path or
+    expression}`` in output order; datetime columns go in ``datetimes``.
+    """
+
+    fields = {}
+    datetimes = ()
+
+    @classmethod
+    def parse_fields(cls, raw):
+        """
+        Turn a ``fields`` query parameter into a list of output names.
+
+        Raises:
+            ValueError: If a requested field does not exist
+        """
+        if not raw:
+            return list(cls.fields)
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in requested if name not in cls.fields]
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(unknown)}. "
+                f"Available: {', '.join(cls.fields)}"
+            )
+        return [name for name in cls.fields if name in requested]
+
+    @staticmethod
+    def _datetime_formatter():
+        """
+        Same output as DRF's DateTimeField.to_representation, with the
+        timezone and format looked up once per list instead of per value.
+        """
+        if api_settings.DATETIME_FORMAT is None or api_settings.DATETIME_FORMAT.lower() != ISO_8601 \
+                or not settings.USE_TZ:
+            return serializers.DateTimeField().to_representation
+
+        tz = timezone.get_current_timezone()
+
+        def formatear(value):
+            value = value.astimezone(tz).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+
+        return formatear
+
+    @classmethod
+    def serialize(cls, queryset, names=None):
+        names = names or list(cls.fields)
+        columns = [
+            F(cls.fields[name]) if isinstance(cls.fields[name], str) else cls.fields[name]
+            for name in names
+        ]
+        rows = queryset.values_list(*columns)
+
+        fechas = [name for name in names if name in cls.datetimes]
+        data = [dict(zip(names, row)) for row in rows]
+        if fechas:
+            formatear = cls._datetime_formatter()
+            for item in data:
+                for name in fechas:
+                    if item[name] is not None:
+                        item[name] = formatear(item[name])
+        return data
+
+
+def pick_fields(data, names):
+    """Keep only ``names`` from one serialized object, in their order."""
+    return {name: data[name] for name in names}
+
+
+class ProductValuesSerializer(ValuesSerializer):
+    """Fast path of ProductSerializer for list GETs."""
+
+    fields = {
+        "id": "id",
+        "name": "name",
+        "slug": "slug",
+        "presentation": "presentation",
+        "supplier": "supplier",
+        "lead_time_days": "lead_time_days",
+        "company": "company_id",
+        "category": "category_id",
+        "stock": Coalesce(F("stock__on_hand"), 0),
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    datetimes = ("created_at", "updated_at")
+
+
+class ProductStockValuesSerializer(ProductValuesSerializer):
+    """
+    ProductValuesSerializer plus live stock aggregates (``?include=stock``).
+
+    The aggregates come from the product's in-stock batches, joined through
+    a FilteredRelation and grouped by product in the same list query.
+    """
+
+    fields = {
+        **ProductValuesSerializer.fields,
+        "stock_available": Coalesce(Sum("in_stock_batches__quantity_available"), 0),
+        "nearest_expiration": Min("in_stock_batches__expiration_date"),
+        "active_batches": Count("in_stock_batches"),
+    }
+
+    @classmethod
+    def serialize(cls, queryset, names=None):
+        queryset = queryset.alias(in_stock_batches=FilteredRelation(
+            "batches",
+            condition=Q(batches__quantity_available__gt=0)
+        ))
+        return super().serialize(queryset, names)
+
+
+class CategoryValuesSerializer(ValuesSerializer):
+    """Fast path of CategorySerializer for list GETs."""
+
+    fields = {
+        "id": "id",
+        "name": "name",
+        "slug": "slug",
+        "description": "description",
+        "company": "company_id",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    datetimes = ("created_at", "updated_at")
@@ -1,4 +1,29 @@
 # inventario/services/__init__.py
-from .stock_service import StockService
+from .stock_service import StockService, StockInsuficienteError
+from .reservation_service import ReservationService
+from .snapshot_service import SnapshotService
+from .outbox_service import OutboxService
+from .version_service import VersionService
+from .cache_service import CatalogCache
+from .search_service import ProductSearchService
+from .valuation_service import ValuationService
+from .rollup_service import RollupService
+from .metrics_service import MetricsService
+from .reorder_service import ReorderService
+from .expiration_risk_service import ExpirationRiskService
 
-__all__ = ["StockService"]
+__all__ = [
+    "StockService",
+    "StockInsuficienteError",
+    "ReservationService",
+    "SnapshotService",
+    "OutboxService",
+    "VersionService",
+    "CatalogCache",
+    "ProductSearchService",
+    "ValuationService",
+    "RollupService",
+    "MetricsService",
+    "ReorderService",
+    "ExpirationRiskService",
+]
@@ -0,0 +1,89 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.services.version_service import VersionService
+
+
+class CatalogCache:
+    """
+    Read-through cache for catalog GETs (categories, products).
+
+    Entries are keyed by company, resource, resource version and request
+    parameters. Writes never delete keys: they bump the version
+    (VersionService), so old entries stop being addressed and expire on
+    their own.
+    """
+
+    ALIAS = getattr(settings, "CATALOG_CACHE_ALIAS", "default")
+    TIMEOUT = getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+    RESOURCES = (CompanyResourceVersion.CATEGORIES, CompanyResourceVersion.PRODUCTS)
+
+    @staticmethod
+    def _cache():
+        return caches[CatalogCache.ALIAS]
+
+    @staticmethod
+    def clave(company_id, resource, version, params):
+        """Cache key; ``params`` is a mapping of query/URL parameters."""
+        firma = hashlib.md5(
+            urlencode(sorted((str(k), str(v)) for k, v in params.items())).encode()
+        ).hexdigest()
+        return f"catalog:{company_id}:{resource}:v{version}:{firma}"
+
+    @staticmethod
+    def _contar(company_id, resource, evento):
+        cache = CatalogCache._cache()
+        key = f"catalog:stats:{company_id}:{resource}:{evento}"
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(); start again from 1
+            cache.set(key, 1, None)
+
+    @staticmethod
+    def obtener(company_id, resource, version, params):
+        """Cached value, or None on a miss. Counts the hit or miss."""
+        value = CatalogCache._cache().get(
+            CatalogCache.clave(company_id, resource, version, params)
+        )
+        CatalogCache._contar(company_id, resource, "misses" if value is None else "hits")
+        return value
+
+    @staticmethod
+    def guardar(company_id, resource, version, params, value):
+        CatalogCache._cache().set(
+            CatalogCache.clave(company_id, resource, version, params),
+            value,
+            CatalogCache.TIMEOUT
+        )
+
+    @staticmethod
+    def invalidar(company_ids, *resources):
+        """Make every cached entry of ``resources`` stale for the companies."""
+        VersionService.incrementar(company_ids, *(resources or CatalogCache.RESOURCES))
+
+    @staticmethod
+    def estadisticas(company_id):
+        """Hits, misses and hit rate per cached resource for one company."""
+        cache = CatalogCache._cache()
+        contadores = cache.get_many([
+            f"catalog:stats:{company_id}:{resource}:{evento}"
+            for resource in CatalogCache.RESOURCES
+            for evento in ("hits", "misses")
+        ])
+        stats = {}
+        for resource in CatalogCache.RESOURCES:
+            hits = contadores.get(f"catalog:stats:{company_id}:{resource}:hits", 0)
+            misses = contadores.get(f"catalog:stats:{company_id}:{resource}:misses", 0)
+            total = hits + misses
+            stats[resource] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 4) if total else None,
+            }
+        return stats
@@ -0,0 +1,144 @@
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from accounts.models import Company
+from inventario.models.batch import Batch
+from inventario.models.expiration_risk import BatchExpirationRisk
+from inventario.services.reorder_service import ReorderService
+
+
+class ExpirationRiskService:
+
+    @staticmethod
+    def simular(productos, cantidades, dias, demanda):
+        """
+        Units each batch sells before it expires, for every product at once.
+
+        The arrays describe the in-stock batches in FEFO order (grouped by
+        product, earliest expiration first): product position, units
+        available and days until expiration (``inf`` when undated).
+        ``demanda`` is the daily demand of each product position.
+
+        Selling at a constant rate, the cumulative units sold from a
+        product's first ``i`` batches by the time batch ``i`` expires is
+        ``T_i = min(T_{i-1} + q_i, rate * d_i)``, which unrolls to
+        ``Q_i + min(0, min_{k<=i}(rate * d_k - Q_k))`` with ``Q`` the prefix
+        sum of units, a segmented running minimum. Returns the units sold
+        per batch.
+        """
+        if not len(productos):
+            return np.empty(0)
+
+        inicio = np.ones(len(productos), dtype=bool)
+        inicio[1:] = productos[1:] != productos[:-1]
+        grupo = np.cumsum(inicio) - 1
+        primeros = np.flatnonzero(inicio)
+
+        acumulado = np.cumsum(cantidades)
+        previo = np.concatenate(([0.0], acumulado[:-1]))
+        prefijo = acumulado - previo[primeros][grupo]
+
+        with np.errstate(invalid="ignore"):
+            capacidad = demanda[productos] * dias
+        capacidad[np.isinf(dias)] = np.inf
+
+        holgura = capacidad - prefijo
+        # Push each product below every earlier one so the running minimum
+        # restarts at each product
+        finitos = holgura[np.isfinite(holgura)]
+        escala = (finitos.max() - finitos.min() + 1) if len(finitos) else 1.0
+        desplazamiento = grupo * escala
+        minimo = np.minimum.accumulate(holgura - desplazamiento) + desplazamiento
+
+        vendido_acumulado = prefijo + np.minimum(0.0, minimo)
+        vendido_previo = np.concatenate(([0.0], vendido_acumulado[:-1]))
+        vendido_previo[primeros] = 0.0
+        return vendido_acumulado - vendido_previo
+
+    @staticmethod
+    def pronosticar(fecha=None, company_ids=None, company_chunk=100):
+        """
+        Rewrite BatchExpirationRisk for every company.
+
+        Companies are processed ``company_chunk`` at a time, each chunk in
+        its own transaction: one query for the demand (see
+        ReorderService.ventas_diarias), one for the in-stock batches in
+        FEFO order, the simulation in NumPy and a bulk insert of the
+        batches with units at risk. Returns the number of rows written.
+        """
+        fecha = fecha or timezone.localdate()
+        if company_ids is None:
+            company_ids = Company.objects.order_by("id").values_list("id", flat=True)
+        company_ids = list(company_ids)
+
+        total = 0
+        for inicio in range(0, len(company_ids), company_chunk):
+            total += ExpirationRiskService._pronosticar_chunk(
+                fecha, company_ids[inicio:inicio + company_chunk]
+            )
+        return total
+
+    @staticmethod
+    @transaction.atomic
+    def _pronosticar_chunk(fecha, company_ids):
+        BatchExpirationRisk.objects.filter(company_id__in=company_ids).delete()
+
+        filas = list(
+            Batch.objects
+            .filter(company_id__in=company_ids, quantity_available__gt=0)
+            .order_by("product_id", F("expiration_date").asc(nulls_last=True), "id")
+            .values_list(
+                "id", "company_id", "product_id", "quantity_available",
+                "expiration_date", "purchase_price"
+            )
+        )
+        if not filas:
+            return 0
+
+        batch_ids, companies, product_ids, cantidades, vencimientos, precios = zip(*filas)
+        lote_producto = np.fromiter(product_ids, dtype=np.int64, count=len(filas))
+        cantidades = np.fromiter(cantidades, dtype=np.float64, count=len(filas))
+        dias = np.fromiter(
+            (
+                np.inf if vencimiento is None else max((vencimiento - fecha).days, 0)
+                for vencimiento in vencimientos
+            ),
+            dtype=np.float64,
+            count=len(filas)
+        )
+
+        productos, posicion = np.unique(lote_producto, return_inverse=True)
+        ventas_producto, ventas_cantidad = ReorderService.ventas_diarias(company_ids, fecha)
+        indices, ventas_cantidad = ReorderService.alinear_ventas(
+            productos, ventas_producto, ventas_cantidad
+        )
+        demanda = np.bincount(
+            indices, weights=ventas_cantidad, minlength=len(productos)
+        ) / ReorderService.WINDOW_DAYS
+
+        vendido = np.floor(ExpirationRiskService.simular(posicion, cantidades, dias, demanda))
+        en_riesgo = (cantidades - vendido).astype(np.int64)
+
+        ahora = timezone.now()
+        riesgos = BatchExpirationRisk.objects.bulk_create(
+            [
+                BatchExpirationRisk(
+                    batch_id=batch_ids[i],
+                    company_id=companies[i],
+                    product_id=product_ids[i],
+                    expiration_date=vencimientos[i],
+                    quantity_available=int(cantidades[i]),
+                    expected_sold=int(vendido[i]),
+                    at_risk_quantity=int(en_riesgo[i]),
+                    at_risk_value=int(en_riesgo[i]) * Decimal(precios[i]),
+                    daily_demand=float(demanda[posicion[i]]),
+                    computed_at=ahora
+                )
+                for i in np.flatnonzero(en_riesgo > 0).tolist()
+            ],
+            batch_size=1000
+        )
+        return len(riesgos)
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from inventario.models.category import Category
+from inventario.models.company_metrics import CompanyMetrics
+from inventario.models.movement_rollup import DailyMovementRollup
+from inventario.models.product import Product
+from inventario.models.valuation import CategoryValuation
+from inventario.services.stock_service import StockService
+from inventario.services.version_service import VersionService
+
+
+class MetricsService:
+
+    LOW_STOCK_THRESHOLD = getattr(settings, "STOCK_LOW_THRESHOLD", 10)
+
+    # Date-dependent KPIs (movements today, expiring soon) roll over even
+    # when nothing is written
+    MAX_AGE = timedelta(seconds=getattr(settings, "DASHBOARD_METRICS_MAX_AGE", 300))
+
+    @staticmethod
+    def calcular(company_id):
+        """
+        Compute the KPIs of a company from the ProductStock, valuation and
+        rollup tables: four aggregate queries, none over batches or
+        movements.
+
+        Returns:
+            CompanyMetrics: Unsaved row
+        """
+        stock = Product.objects.filter(company_id=company_id).aggregate(
+            total_products=Count("id"),
+            stock_units=Sum("stock__on_hand", default=0),
+            active_batches=Sum("stock__batch_count", default=0),
+            surtidos=Count(
+                "id", filter=Q(stock__on_hand__gt=MetricsService.LOW_STOCK_THRESHOLD)
+            ),
+            expiring_soon_units=Sum("stock__expiring_soon", default=0),
+            expiring_soon_products=Count("id", filter=Q(stock__expiring_soon__gt=0)),
+        )
+
+        return CompanyMetrics(
+            company_id=company_id,
+            total_products=stock["total_products"],
+            total_categories=Category.objects.filter(company_id=company_id).count(),
+            active_batches=stock["active_batches"],
+            stock_units=stock["stock_units"],
+            stock_value=CategoryValuation.objects.filter(company_id=company_id).aggregate(
+                total=Sum("value", default=Decimal("0"))
+            )["total"],
+            low_stock_products=stock["total_products"] - stock["surtidos"],
+            expiring_soon_units=stock["expiring_soon_units"],
+            expiring_soon_products=stock["expiring_soon_products"],
+            movements_today=DailyMovementRollup.objects.filter(
+                company_id=company_id,
+                day=timezone.localdate()
+            ).aggregate(total=Sum("count", default=0))["total"],
+            refreshed_at=timezone.now(),
+        )
+
+    @staticmethod
+    def refrescar(company_ids):
+        """
+        Recompute and store the metrics of every company in ``company_ids``.
+        Returns the rows written.
+        """
+        filas = []
+        for company_id in company_ids:
+            # Versions first: a write that lands while computing leaves
+            # the row stale rather than wrongly fresh
+            firma = VersionService.firma(company_id)
+            metricas = MetricsService.calcular(company_id)
+            metricas.versions = firma
+            filas.append(metricas)
+
+        return CompanyMetrics.objects.bulk_create(
+            filas,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["company"],
+            update_fields=[
+                field.name for field in CompanyMetrics._meta.concrete_fields
+                if not field.primary_key
+            ]
+        )
+
+    @staticmethod
+    def resumen(company_id):
+        """
+        Metrics of a company, recomputed only when the company has been
+        written to since the last refresh or the row is older than MAX_AGE.
+        A fresh row costs two queries.
+
+        Returns:
+            CompanyMetrics
+        """
+        metricas = CompanyMetrics.objects.filter(company_id=company_id).first()
+        if (
+            metricas is not None
+            and metricas.versions == VersionService.firma(company_id)
+            and timezone.now() - metricas.refreshed_at < MetricsService.MAX_AGE
+            and timezone.localdate(metricas.refreshed_at) == timezone.localdate()
+        ):
+            return metricas
+        return MetricsService.refrescar([company_id])[0]
+
+    @staticmethod
+    def serializar(metricas):
+        return {
+            "total_products": metricas.total_products,
+            "total_categories": metricas.total_categories,
+            "active_batches": metricas.active_batches,
+            "stock_units": metricas.stock_units,
+            "stock_value": f"{metricas.stock_value:.2f}",
+            "low_stock_products": metricas.low_stock_products,
+            "low_stock_threshold": MetricsService.LOW_STOCK_THRESHOLD,
+            "expiring_soon_units": metricas.expiring_soon_units,
+            "expiring_soon_products": metricas.expiring_soon_products,
+            "expiring_soon_days": StockService.EXPIRING_SOON_DAYS,
+            "movements_today": metricas.movements_today,
+            "refreshed_at": metricas.refreshed_at,
+        }
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from inventario.models.outbox import OutboxCursor, OutboxEvent
+
+
+class OutboxService:
+
+    # Events younger than this are left for the next pass, so a transaction
+    # that committed late with a lower id is not skipped by the cursor.
+    SETTLE_SECONDS = getattr(settings, "OUTBOX_SETTLE_SECONDS", 5)
+
+    @staticmethod
+    def _payload(movement):
+        return {
+            "movement_id": movement.id,
+            "batch_id": movement.batch_id,
+            "batch_code": movement.batch.code,
+            "product_id": movement.batch.product_id,
+            "movement_type": movement.movement_type,
+            "quantity": movement.quantity,
+            "stock_delta": movement.stock_delta,
+            "note": movement.note,
+            "created_at": movement.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def registrar_movimientos(movements):
+        """
+        Write one ``movement.created`` event per movement with bulk_create.
+
+        Must run inside the transaction that created the movements.
+        """
+        if not movements:
+            return []
+
+        return OutboxEvent.objects.bulk_create([
+            OutboxEvent(
+                company_id=movement.company_id,
+                movement=movement,
+                event_type=OutboxEvent.MOVEMENT_CREATED,
+                payload=OutboxService._payload(movement)
+            )
+            for movement in movements
+        ])
+
+    @staticmethod
+    def _serializar(event):
+        return {
+            "id": event.id,
+            "company_id": event.company_id,
+            "event_type": event.event_type,
+            "payload": event.payload,
+            "created_at": event.created_at,
+        }
+
+    @staticmethod
+    def publicar(sink, consumer="default", batch_size=500, max_batches=None):
+        """
+        Relay pending events to ``sink`` in batches, at least once.
+
+        Each batch runs in a transaction that locks the consumer's cursor,
+        sends the events and then advances the cursor; if the sink or the
+        commit fails, the same events are sent again on the next pass.
+        Returns the number of events published.
+        """
+        OutboxCursor.objects.get_or_create(name=consumer)
+        total = 0
+        enviados = 0
+
+        while max_batches is None or enviados < max_batches:
+            with transaction.atomic():
+                cursor = OutboxCursor.objects.select_for_update().get(name=consumer)
+                limite = timezone.now() - timedelta(seconds=OutboxService.SETTLE_SECONDS)
+                events = list(
+                    OutboxEvent.objects
+                    .filter(id__gt=cursor.last_event_id, created_at__lte=limite)
+                    .order_by("id")[:batch_size]
+                )
+                if not events:
+                    return total
+
+                sink.send([OutboxService._serializar(event) for event in events])
+
+                cursor.last_event_id = events[-1].id
+                cursor.save(update_fields=["last_event_id", "updated_at"])
+
+            total += len(events)
+            enviados += 1
+            if len(events) < batch_size:
+                return total
+
+        return total
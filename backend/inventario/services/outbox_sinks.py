@@ -0,0 +1,72 @@
+"""
+Destinations for the outbox relay.
+
+A sink receives a list of event dicts and must raise if they were not
+delivered; the relay then keeps its cursor and retries the same events.
+"""
+
+import json
+import os
+import queue
+import urllib.request
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class FileSink:
+    """Appends events as JSON lines to a local file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for event in events:
+                fh.write(json.dumps(event, cls=DjangoJSONEncoder) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+class HttpSink:
+    """POSTs each batch of events as a JSON array."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps(events, cls=DjangoJSONEncoder).encode("utf-8")
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise ConnectionError(f"Sink HTTP respondió {response.status}")
+
+
+class QueueSink:
+    """Puts events on an in-process queue (tests and local consumers)."""
+
+    def __init__(self, target=None):
+        self.queue = target if target is not None else queue.Queue()
+
+    def send(self, events):
+        for event in events:
+            self.queue.put(event)
+
+
+def crear_sink(spec):
+    """
+    Build a sink from a string: ``file:/path/events.jsonl``,
+    ``http(s)://host/path`` or ``queue:``.
+    """
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec)
+    if spec == "queue:":
+        return QueueSink()
+    raise ValueError(f"Sink desconocido: {spec}")
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from accounts.models import Company
+from inventario.models.movement_rollup import DailyMovementRollup
+from inventario.models.product import Product
+from inventario.models.reorder_point import ProductReorderPoint
+
+
+class ReorderService:
+
+    # Trailing days of sales the demand statistics are computed over
+    WINDOW_DAYS = getattr(settings, "REORDER_WINDOW_DAYS", 56)
+
+    # Probability of not running out during the lead time
+    SERVICE_LEVEL = getattr(settings, "REORDER_SERVICE_LEVEL", 0.95)
+
+    @staticmethod
+    def _columnas(queryset, campos, tipos):
+        """One query, one NumPy array per column."""
+        filas = list(queryset.values_list(*campos))
+        if not filas:
+            return [np.empty(0, dtype=tipo) for tipo in tipos]
+        return [
+            np.fromiter(columna, dtype=tipo, count=len(filas))
+            for columna, tipo in zip(zip(*filas), tipos)
+        ]
+
+    @staticmethod
+    def ventas_diarias(company_ids, fecha, window_days=None):
+        """
+        OUT quantity per product and day of the ``window_days`` days up to
+        ``fecha``, as two aligned arrays (product id, quantity), read from
+        DailyMovementRollup in one query.
+        """
+        window_days = window_days or ReorderService.WINDOW_DAYS
+        return ReorderService._columnas(
+            DailyMovementRollup.objects.filter(
+                company_id__in=company_ids,
+                movement_type="OUT",
+                day__gt=fecha - timedelta(days=window_days),
+                day__lte=fecha
+            ),
+            ("product_id", "quantity"),
+            (np.int64, np.float64)
+        )
+
+    @staticmethod
+    def alinear_ventas(product_ids, ventas_producto, ventas_cantidad):
+        """
+        Position of each sale's product in the sorted ``product_ids``;
+        sales of products not in it are dropped.
+        """
+        indices = np.searchsorted(product_ids, ventas_producto)
+        conocidos = indices < len(product_ids)
+        conocidos[conocidos] = product_ids[indices[conocidos]] == ventas_producto[conocidos]
+        return indices[conocidos], ventas_cantidad[conocidos]
+
+    @staticmethod
+    def calcular_puntos(ventas_producto, ventas_cantidad, product_ids, lead_times,
+                        window_days, service_level):
+        """
+        Reorder points of every product in ``product_ids`` at once.
+
+        ``ventas_producto``/``ventas_cantidad`` hold one entry per product
+        and day with sales in the window (days without sales count as
+        zero demand). Returns ``(avg, std, safety_stock, reorder_point)``
+        arrays aligned with ``product_ids``, which must be sorted.
+        """
+        indices, ventas_cantidad = ReorderService.alinear_ventas(
+            product_ids, ventas_producto, ventas_cantidad
+        )
+        suma = np.bincount(indices, weights=ventas_cantidad, minlength=len(product_ids))
+        cuadrados = np.bincount(indices, weights=ventas_cantidad ** 2, minlength=len(product_ids))
+
+        media = suma / window_days
+        varianza = (cuadrados - window_days * media ** 2) / max(window_days - 1, 1)
+        desviacion = np.sqrt(np.clip(varianza, 0, None))
+
+        z = NormalDist().inv_cdf(service_level)
+        seguridad = np.ceil(z * desviacion * np.sqrt(lead_times))
+        punto = np.ceil(media * lead_times + seguridad)
+        return media, desviacion, seguridad.astype(np.int64), punto.astype(np.int64)
+
+    @staticmethod
+    def calcular(fecha=None, company_ids=None, company_chunk=100):
+        """
+        Compute and store the reorder point of every product.
+
+        Companies are processed ``company_chunk`` at a time: one query for
+        their products, one for the OUT totals per product and day of the
+        last WINDOW_DAYS days (read from DailyMovementRollup), the maths
+        in NumPy and a bulk upsert. Returns the number of products.
+        """
+        fecha = fecha or timezone.localdate()
+        if company_ids is None:
+            company_ids = Company.objects.order_by("id").values_list("id", flat=True)
+        company_ids = list(company_ids)
+
+        total = 0
+        for inicio in range(0, len(company_ids), company_chunk):
+            total += ReorderService._calcular_chunk(
+                fecha, company_ids[inicio:inicio + company_chunk]
+            )
+        return total
+
+    @staticmethod
+    @transaction.atomic
+    def _calcular_chunk(fecha, company_ids):
+        window = ReorderService.WINDOW_DAYS
+        product_ids, product_companies, lead_times = ReorderService._columnas(
+            Product.objects.filter(company_id__in=company_ids).order_by("id"),
+            ("id", "company_id", "lead_time_days"),
+            (np.int64, np.int64, np.float64)
+        )
+        if not len(product_ids):
+            return 0
+
+        ventas_producto, ventas_cantidad = ReorderService.ventas_diarias(company_ids, fecha)
+
+        media, desviacion, seguridad, punto = ReorderService.calcular_puntos(
+            ventas_producto, ventas_cantidad, product_ids, lead_times,
+            window, ReorderService.SERVICE_LEVEL
+        )
+
+        ahora = timezone.now()
+        ProductReorderPoint.objects.bulk_create(
+            [
+                ProductReorderPoint(
+                    product_id=product_id,
+                    company_id=company_id,
+                    avg_daily_demand=avg,
+                    demand_std=std,
+                    lead_time_days=lead_time,
+                    safety_stock=safety_stock,
+                    reorder_point=reorder_point,
+                    computed_at=ahora
+                )
+                for product_id, company_id, avg, std, lead_time, safety_stock, reorder_point in zip(
+                    product_ids.tolist(), product_companies.tolist(), media.tolist(),
+                    desviacion.tolist(), lead_times.astype(np.int64).tolist(),
+                    seguridad.tolist(), punto.tolist()
+                )
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=[
+                "avg_daily_demand", "demand_std", "lead_time_days",
+                "safety_stock", "reorder_point", "computed_at"
+            ]
+        )
+        return len(product_ids)
@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from inventario.models.product_stock import ProductStock
+from inventario.models.reservation import StockReservation
+from inventario.services.stock_service import StockService
+
+
+class ReservationService:
+
+    TTL_SECONDS = getattr(settings, "STOCK_RESERVATION_TTL_SECONDS", 900)
+
+    @staticmethod
+    def _tomar(product_id, quantity):
+        """Conditionally add ``quantity`` to the product's reserved counter."""
+        return ProductStock.objects.filter(
+            product_id=product_id,
+            on_hand__gte=F("reserved") + quantity
+        ).update(reserved=F("reserved") + quantity)
+
+    @staticmethod
+    @transaction.atomic
+    def reservar(product, quantity, ttl_seconds=None, reference=""):
+        """
+        Hold ``quantity`` units of ``product`` for ``ttl_seconds``.
+
+        The happy path is one conditional UPDATE on ProductStock plus the
+        INSERT of the hold. If the product looks full, its expired holds are
+        released and the UPDATE is retried once.
+        """
+        if quantity <= 0:
+            raise ValueError("La cantidad debe ser mayor a cero")
+
+        if not ReservationService._tomar(product.id, quantity):
+            ReservationService.liberar_vencidas(product_ids=[product.id])
+            if not ReservationService._tomar(product.id, quantity):
+                raise ValueError("Stock insuficiente para reservar")
+
+        ttl = ttl_seconds or ReservationService.TTL_SECONDS
+        return StockReservation.objects.create(
+            company_id=product.company_id,
+            product=product,
+            quantity=quantity,
+            reference=reference,
+            expires_at=timezone.now() + timedelta(seconds=ttl)
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def liberar(reservation):
+        """
+        Release an active hold. Returns False if it was no longer active.
+        """
+        liberada = StockReservation.objects.filter(
+            pk=reservation.pk,
+            status=StockReservation.ACTIVE
+        ).update(status=StockReservation.RELEASED)
+
+        if not liberada:
+            return False
+
+        reservation.status = StockReservation.RELEASED
+        ProductStock.objects.filter(product_id=reservation.product_id).update(
+            reserved=F("reserved") - reservation.quantity
+        )
+        return True
+
+    @staticmethod
+    @transaction.atomic
+    def confirmar(reservation, note=None):
+        """
+        Turn an active hold into a sale through StockService.
+
+        Returns the allocation plan of the OUT movements.
+        """
+        reservation = (
+            StockReservation.objects
+            .select_for_update(of=("self",))
+            .select_related("product")
+            .get(pk=reservation.pk)
+        )
+        if (
+            reservation.status != StockReservation.ACTIVE
+            or reservation.expires_at <= timezone.now()
+        ):
+            raise ValueError("La reserva no está activa")
+
+        plan = StockService.despachar_pedido(
+            [{"product": reservation.product, "quantity": reservation.quantity}],
+            note=note or reservation.reference or None,
+            reservas={reservation.product_id: reservation.quantity}
+        )[0]
+
+        reservation.status = StockReservation.CONSUMED
+        reservation.save(update_fields=["status"])
+        return plan
+
+    @staticmethod
+    def liberar_vencidas(now=None, product_ids=None, chunk_size=1000):
+        """
+        Mark expired holds as EXPIRED and return their stock, in bulk.
+
+        Each chunk is its own transaction: the expired rows are locked with
+        SKIP LOCKED so several sweepers (or a confirm in flight) don't block
+        each other, then released with one UPDATE per table. Returns the
+        number of holds released.
+        """
+        now = now or timezone.now()
+        total = 0
+
+        while True:
+            with transaction.atomic():
+                vencidas = StockReservation.objects.filter(
+                    status=StockReservation.ACTIVE,
+                    expires_at__lte=now
+                )
+                if product_ids is not None:
+                    vencidas = vencidas.filter(product_id__in=product_ids)
+
+                ids = list(
+                    vencidas
+                    .select_for_update(skip_locked=True)
+                    .order_by("id")
+                    .values_list("id", flat=True)[:chunk_size]
+                )
+                if not ids:
+                    return total
+
+                lote = StockReservation.objects.filter(id__in=ids)
+                por_producto = dict(
+                    lote.order_by()
+                    .values("product_id")
+                    .annotate(total=Sum("quantity"))
+                    .values_list("product_id", "total")
+                )
+                lote.update(status=StockReservation.EXPIRED)
+                StockService._aplicar_deltas_stock({
+                    pid: {"reserved": -cantidad}
+                    for pid, cantidad in por_producto.items()
+                })
+
+            total += len(ids)
+            if len(ids) < chunk_size:
+                return total
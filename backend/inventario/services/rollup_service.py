@@ -0,0 +1,205 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from inventario.models.movement import Movement
+from inventario.models.movement_rollup import DailyMovementRollup
+
+
+class RollupService:
+
+    # Rows per INSERT ... ON CONFLICT statement (7 parameters each)
+    UPSERT_CHUNK = 500
+
+    INTERVALOS = {
+        "day": None,
+        "week": TruncWeek,
+        "month": TruncMonth,
+    }
+
+    @staticmethod
+    def _inicio_dia(fecha):
+        return timezone.make_aware(datetime.combine(fecha, time.min))
+
+    @staticmethod
+    def registrar_movimientos(movements):
+        """
+        Add the movements to DailyMovementRollup.
+
+        Movements are grouped by (product, local day, type) in Python and
+        added with one ``INSERT ... ON CONFLICT DO UPDATE`` per
+        UPSERT_CHUNK groups, so the rollup never needs a read. Must run
+        inside the transaction that created the movements.
+        """
+        grupos = {}
+        for movement in movements:
+            clave = (
+                movement.batch.product_id,
+                timezone.localdate(movement.created_at),
+                movement.movement_type,
+            )
+            grupo = grupos.setdefault(clave, [movement.company_id, 0, 0, 0])
+            grupo[1] += movement.quantity
+            grupo[2] += movement.stock_delta
+            grupo[3] += 1
+        if not grupos:
+            return
+
+        q = connection.ops.quote_name
+        tabla = q(DailyMovementRollup._meta.db_table)
+        columnas = ", ".join(q(columna) for columna in (
+            "company_id", "product_id", "day", "movement_type", "quantity", "stock_delta", "count"
+        ))
+        sumas = ", ".join(
+            f"{q(columna)} = {tabla}.{q(columna)} + EXCLUDED.{q(columna)}"
+            for columna in ("quantity", "stock_delta", "count")
+        )
+        filas = [
+            (
+                company_id, product_id, connection.ops.adapt_datefield_value(day),
+                movement_type, quantity, stock_delta, count
+            )
+            for (product_id, day, movement_type), (company_id, quantity, stock_delta, count)
+            in grupos.items()
+        ]
+
+        with connection.cursor() as cursor:
+            for inicio in range(0, len(filas), RollupService.UPSERT_CHUNK):
+                chunk = filas[inicio:inicio + RollupService.UPSERT_CHUNK]
+                valores = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+                cursor.execute(
+                    f"INSERT INTO {tabla} ({columnas}) VALUES {valores} "
+                    f"ON CONFLICT ({q('product_id')}, {q('day')}, {q('movement_type')}) "
+                    f"DO UPDATE SET {sumas}",
+                    [valor for fila in chunk for valor in fila]
+                )
+
+    @staticmethod
+    def descontar_movimiento(movement):
+        """
+        Take a deleted movement out of its rollup row, dropping the row
+        once no movement is left in it. Must run inside the transaction
+        that deletes the movement.
+        """
+        filas = DailyMovementRollup.objects.filter(
+            product_id=movement.batch.product_id,
+            day=timezone.localdate(movement.created_at),
+            movement_type=movement.movement_type
+        )
+        filas.update(
+            quantity=F("quantity") - movement.quantity,
+            stock_delta=F("stock_delta") - movement.stock_delta,
+            count=F("count") - 1
+        )
+        filas.filter(count__lte=0).delete()
+
+    @staticmethod
+    @transaction.atomic
+    def reconstruir(desde, hasta, company_ids=None):
+        """
+        Rebuild the rollup rows of days ``desde``..``hasta`` (inclusive)
+        from the movement ledger.
+
+        The range is replaced in one transaction, so ranges that do not
+        overlap can be rebuilt concurrently. Nothing locks the range
+        against StockService's upserts, so while traffic is live only
+        closed days are safe to rebuild: a movement written to a day being
+        rebuilt is lost, counted twice or fails the insert. Returns the
+        number of rows written.
+        """
+        filas = DailyMovementRollup.objects.filter(day__gte=desde, day__lte=hasta)
+        movimientos = Movement.objects.filter(
+            created_at__gte=RollupService._inicio_dia(desde),
+            created_at__lt=RollupService._inicio_dia(hasta + timedelta(days=1))
+        )
+        if company_ids is not None:
+            filas = filas.filter(company_id__in=company_ids)
+            movimientos = movimientos.filter(company_id__in=company_ids)
+        filas.delete()
+
+        grupos = (
+            movimientos
+            .order_by()
+            .annotate(day=TruncDate("created_at"))
+            .values("company_id", "batch__product_id", "day", "movement_type")
+            .annotate(
+                total_quantity=Sum("quantity"),
+                total_delta=Sum("stock_delta"),
+                total_count=Count("id"),
+            )
+            .values_list(
+                "company_id", "batch__product_id", "day", "movement_type",
+                "total_quantity", "total_delta", "total_count"
+            )
+        )
+        rollups = DailyMovementRollup.objects.bulk_create(
+            [
+                DailyMovementRollup(
+                    company_id=company_id,
+                    product_id=product_id,
+                    day=day,
+                    movement_type=movement_type,
+                    quantity=quantity,
+                    stock_delta=stock_delta,
+                    count=count
+                )
+                for company_id, product_id, day, movement_type, quantity, stock_delta, count
+                in grupos
+            ],
+            batch_size=1000
+        )
+        return len(rollups)
+
+    @staticmethod
+    def serie(company, desde, hasta, intervalo="day", product_id=None, movement_type=None):
+        """
+        Movement totals of ``company`` per period and type, read from the
+        rollup only.
+
+        Raises:
+            ValueError: If ``intervalo`` is not day, week or month
+
+        Returns:
+            list: Dicts with period, movement_type, quantity, stock_delta
+            and count, ordered by period and type
+        """
+        if intervalo not in RollupService.INTERVALOS:
+            raise ValueError("interval must be day, week or month")
+
+        filas = DailyMovementRollup.objects.filter(
+            company=company,
+            day__gte=desde,
+            day__lte=hasta
+        )
+        if product_id is not None:
+            filas = filas.filter(product_id=product_id)
+        if movement_type is not None:
+            filas = filas.filter(movement_type=movement_type)
+
+        truncar = RollupService.INTERVALOS[intervalo]
+        periodo = F("day") if truncar is None else truncar("day")
+        grupos = (
+            filas
+            .order_by()
+            .annotate(period=periodo)
+            .values("period", "movement_type")
+            .annotate(
+                total_quantity=Sum("quantity"),
+                total_delta=Sum("stock_delta"),
+                total_count=Sum("count"),
+            )
+            .order_by("period", "movement_type")
+            .values_list("period", "movement_type", "total_quantity", "total_delta", "total_count")
+        )
+        return [
+            {
+                "period": period,
+                "movement_type": movement_type,
+                "quantity": quantity,
+                "stock_delta": stock_delta,
+                "count": count,
+            }
+            for period, movement_type, quantity, stock_delta, count in grupos
+        ]
@@ -0,0 +1,102 @@
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+from inventario.models.batch import Batch
+from inventario.models.product import Product
+
+
+class ProductSearchService:
+    """
+    Ranked product search on name, slug, supplier and batch code.
+
+    On PostgreSQL matches come from the ``UPPER(col) gin_trgm_ops`` indexes
+    (migration 0013): prefix matches via LIKE and fuzzy matches via the
+    trigram ``%`` operator, ranked by similarity. Other backends fall back
+    to case-insensitive prefix/contains matching with fixed scores.
+    """
+
+    # Below this length trigrams are meaningless; only prefixes are used
+    MIN_FUZZY_LENGTH = 3
+
+    @staticmethod
+    def buscar(company, q, limit=20):
+        """
+        Products of ``company`` matching ``q``, best match first.
+
+        Returns:
+            QuerySet: At most ``limit`` products annotated with ``rank``
+        """
+        q = q.strip()
+        por_codigo = Q(id__in=Batch.objects.filter(
+            company=company,
+            code__istartswith=q
+        ).values("product_id"))
+
+        # (condition, score) from best to worst
+        prefijos = [
+            (Q(name__istartswith=q), 1.0),
+            (por_codigo, 0.95),
+            (Q(slug__istartswith=q), 0.9),
+            (Q(supplier__istartswith=q), 0.7),
+        ]
+
+        productos = Product.objects.filter(company=company)
+        if connection.vendor == "postgresql" and len(q) >= ProductSearchService.MIN_FUZZY_LENGTH:
+            resultados = ProductSearchService._buscar_trigram(productos, q, prefijos)
+        else:
+            contiene = [] if connection.vendor == "postgresql" else [
+                (Q(name__icontains=q), 0.5),
+                (Q(slug__icontains=q), 0.4),
+                (Q(supplier__icontains=q), 0.3),
+            ]
+            resultados = ProductSearchService._buscar_like(productos, prefijos + contiene)
+
+        return resultados.order_by("-rank", "name", "id")[:limit]
+
+    @staticmethod
+    def _puntaje(condiciones):
+        return Case(
+            *[When(condicion, then=Value(score)) for condicion, score in condiciones],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+
+    @staticmethod
+    def _buscar_like(productos, condiciones):
+        coincide = Q()
+        for condicion, _ in condiciones:
+            coincide |= condicion
+        return productos.filter(coincide).annotate(
+            rank=ProductSearchService._puntaje(condiciones)
+        )
+
+    @staticmethod
+    def _buscar_trigram(productos, q, prefijos):
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        termino = q.upper()
+        coincide = (
+            Q(u_name__trigram_similar=termino)
+            | Q(u_slug__trigram_similar=termino)
+            | Q(u_supplier__trigram_similar=termino)
+        )
+        for condicion, _ in prefijos:
+            coincide |= condicion
+
+        return (
+            productos
+            .alias(
+                u_name=Upper("name"),
+                u_slug=Upper("slug"),
+                u_supplier=Upper("supplier"),
+            )
+            .filter(coincide)
+            .annotate(rank=Greatest(
+                ProductSearchService._puntaje(prefijos),
+                TrigramSimilarity("u_name", termino),
+                TrigramSimilarity("u_slug", termino) * 0.9,
+                TrigramSimilarity("u_supplier", termino) * 0.7,
+                output_field=FloatField()
+            ))
+        )
@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+from inventario.models.movement import Movement
+from inventario.models.product import Product
+from inventario.models.stock_snapshot import ProductStockSnapshot
+
+
+class SnapshotService:
+
+    @staticmethod
+    def _inicio_dia(fecha):
+        return timezone.make_aware(datetime.combine(fecha, time.min))
+
+    @staticmethod
+    def stock_a_fecha(product_ids, fecha):
+        """
+        Stock of each product at the end of ``fecha``.
+
+        Starts from each product's latest snapshot on or before ``fecha``
+        and adds only the movement deltas recorded after it: one query for
+        the snapshots plus one grouped query per distinct snapshot date
+        (normally one). Products without snapshots replay their whole
+        history. Returns {product_id: quantity}.
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+
+        ultimo = ProductStockSnapshot.objects.filter(
+            product=OuterRef("pk"),
+            date__lte=fecha
+        ).order_by("-date")
+        bases = (
+            Product.objects
+            .filter(id__in=product_ids)
+            .annotate(
+                snapshot_date=Subquery(ultimo.values("date")[:1]),
+                snapshot_quantity=Subquery(ultimo.values("quantity")[:1]),
+            )
+            .values_list("id", "snapshot_date", "snapshot_quantity")
+        )
+
+        stock = {}
+        por_fecha = {}
+        for pid, snapshot_date, snapshot_quantity in bases:
+            stock[pid] = snapshot_quantity or 0
+            por_fecha.setdefault(snapshot_date, []).append(pid)
+
+        fin = SnapshotService._inicio_dia(fecha + timedelta(days=1))
+        for snapshot_date, pids in por_fecha.items():
+            if snapshot_date == fecha:
+                continue
+
+            movimientos = Movement.objects.filter(
+                batch__product_id__in=pids,
+                created_at__lt=fin
+            )
+            if snapshot_date is not None:
+                movimientos = movimientos.filter(
+                    created_at__gte=SnapshotService._inicio_dia(
+                        snapshot_date + timedelta(days=1)
+                    )
+                )
+
+            deltas = (
+                movimientos
+                .order_by()
+                .values("batch__product_id")
+                .annotate(total=Sum("stock_delta"))
+                .values_list("batch__product_id", "total")
+            )
+            for pid, total in deltas:
+                stock[pid] += total
+
+        return stock
+
+    @staticmethod
+    def tomar_snapshots(fecha=None, company_ids=None, chunk_size=1000):
+        """
+        Store the end-of-day stock of every product for ``fecha``.
+
+        Defaults to yesterday, the last complete day. Each snapshot is built
+        incrementally from the previous one; re-running a date overwrites
+        it. Returns the number of snapshots written.
+        """
+        fecha = fecha or timezone.localdate() - timedelta(days=1)
+
+        productos = Product.objects.order_by("id")
+        if company_ids is not None:
+            productos = productos.filter(company_id__in=company_ids)
+        productos = list(productos.values_list("id", "company_id"))
+
+        total = 0
+        for inicio in range(0, len(productos), chunk_size):
+            chunk = dict(productos[inicio:inicio + chunk_size])
+            stock = SnapshotService.stock_a_fecha(chunk, fecha)
+            ProductStockSnapshot.objects.bulk_create(
+                [
+                    ProductStockSnapshot(
+                        company_id=chunk[pid],
+                        product_id=pid,
+                        date=fecha,
+                        quantity=quantity
+                    )
+                    for pid, quantity in stock.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["product", "date"],
+                update_fields=["quantity"]
+            )
+            total += len(stock)
+
+        return total
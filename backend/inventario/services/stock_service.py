@@ -1,23 +1,254 @@
-from django.db import transaction
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 import re
+from accounts.models import Company
 from inventario.models.batch import Batch
+from inventario.models.batch_code_sequence import BatchCodeSequence
 from inventario.models.movement import Movement
+from inventario.models.product import Product
+from inventario.models.product_stock import ProductStock
+from inventario.models.reservation import StockReservation
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.services.outbox_service import OutboxService
+from inventario.services.rollup_service import RollupService
+from inventario.services.valuation_service import ValuationService
+from inventario.services.version_service import VersionService
+
+
+class StockInsuficienteError(ValueError):
+    """
+    Raised when an order can't be covered. ``faltantes`` lists the short
+    lines as dicts with ``line``, ``product``, ``requested`` and ``missing``.
+    """
+
+    def __init__(self, faltantes):
+        super().__init__("Stock insuficiente")
+        self.faltantes = faltantes
 
 
 class StockService:
 
+    EXPIRING_SOON_DAYS = getattr(settings, "STOCK_EXPIRING_SOON_DAYS", 30)
+
+    @staticmethod
+    def _limite_vencimiento():
+        return timezone.localdate() + timedelta(days=StockService.EXPIRING_SOON_DAYS)
+
+    @staticmethod
+    def _vence_pronto(batch):
+        return (
+            batch.expiration_date is not None
+            and batch.expiration_date <= StockService._limite_vencimiento()
+        )
+
+    @staticmethod
+    def _aplicar_deltas_stock(deltas):
+        """
+        Add ``deltas`` ({product_id: {field: delta}}) to ProductStock.
+
+        Costs two queries whatever the number of products: an INSERT that
+        creates missing rows and a single UPDATE ... CASE.
+        """
+        deltas = {pid: d for pid, d in deltas.items() if any(d.values())}
+        if not deltas:
+            return
+
+        ProductStock.objects.bulk_create(
+            [ProductStock(product_id=pid) for pid in deltas],
+            ignore_conflicts=True
+        )
+
+        cambios = {}
+        for campo in ("on_hand", "expiring_soon", "batch_count", "reserved"):
+            whens = [
+                When(product_id=pid, then=Value(d[campo]))
+                for pid, d in deltas.items()
+                if d.get(campo)
+            ]
+            if whens:
+                cambios[campo] = F(campo) + Case(*whens, default=Value(0))
+
+        ProductStock.objects.filter(product_id__in=deltas).update(**cambios)
+
+    @staticmethod
+    def reconstruir_stock(product_ids=None):
+        """
+        Recompute ProductStock from batches and active reservations.
+
+        Pass ``product_ids`` to rebuild only those products; by default every
+        product is rebuilt. Bumps the products version of the companies
+        involved. Returns the number of rows written.
+        """
+        productos = Product.objects.all()
+        if product_ids is not None:
+            productos = productos.filter(id__in=product_ids)
+
+        reservas_activas = (
+            StockReservation.objects
+            .filter(
+                product=OuterRef("pk"),
+                status=StockReservation.ACTIVE,
+                expires_at__gt=timezone.now()
+            )
+            .values("product")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+
+        con_stock = Q(batches__quantity_available__gt=0)
+        filas = productos.annotate(
+            on_hand=Sum("batches__quantity_available", filter=con_stock, default=0),
+            expiring_soon=Sum(
+                "batches__quantity_available",
+                filter=con_stock & Q(
+                    batches__expiration_date__lte=StockService._limite_vencimiento()
+                ),
+                default=0
+            ),
+            batch_count=Count("batches", filter=con_stock),
+            reserved=Coalesce(Subquery(reservas_activas), 0),
+        ).values_list(
+            "id", "company_id", "on_hand", "expiring_soon", "batch_count", "reserved"
+        )
+
+        stock = []
+        companies = set()
+        for pid, company_id, on_hand, expiring_soon, batch_count, reserved in filas:
+            companies.add(company_id)
+            stock.append(ProductStock(
+                product_id=pid,
+                on_hand=on_hand,
+                expiring_soon=expiring_soon,
+                batch_count=batch_count,
+                reserved=reserved
+            ))
+        ProductStock.objects.bulk_create(
+            stock,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=[
+                "on_hand", "expiring_soon", "batch_count", "reserved", "updated_at"
+            ]
+        )
+        VersionService.incrementar(companies, CompanyResourceVersion.PRODUCTS)
+        return len(stock)
+
+    @staticmethod
+    def _crear_movimientos(movimientos):
+        """
+        Insert movements and their outbox events in the current transaction
+        and bump the ETag versions of the companies involved once it
+        commits.
+
+        Every Movement written by the service goes through here; the
+        denormalized company and the unit cost are copied from the batch
+        when missing, and the category valuation and daily rollup are
+        updated. Callers apply their ProductStock deltas first, so every
+        stock write locks ProductStock before CategoryValuation.
+        """
+        for movimiento in movimientos:
+            if movimiento.company_id is None:
+                movimiento.company_id = movimiento.batch.company_id
+            if movimiento.unit_cost is None:
+                movimiento.unit_cost = Movement._meta.get_field("unit_cost").to_python(
+                    movimiento.batch.purchase_price
+                )
+        Movement.objects.bulk_create(movimientos)
+        ValuationService.registrar_movimientos(movimientos)
+        RollupService.registrar_movimientos(movimientos)
+        events = OutboxService.registrar_movimientos(movimientos)
+        # After commit: the version rows are shared by every write of the
+        # company, so holding them until commit would serialize stock
+        # writes across products. The ETag only needs to move once the
+        # data is visible.
+        companies = {event.company_id for event in events}
+        transaction.on_commit(lambda: VersionService.incrementar(
+            companies,
+            CompanyResourceVersion.PRODUCTS,
+            CompanyResourceVersion.BATCHES,
+            CompanyResourceVersion.MOVEMENTS,
+        ))
+        return movimientos
+
+    @staticmethod
+    def registrar_movimiento(batch, movement_type, quantity, note=None):
+        """
+        Record a movement that does not change the batch's stock.
+        """
+        with transaction.atomic():
+            return StockService._crear_movimientos([
+                Movement(
+                    batch=batch,
+                    movement_type=movement_type,
+                    quantity=quantity,
+                    note=note
+                )
+            ])[0]
+
+    @staticmethod
+    def _ultimo_codigo_existente(company_id):
+        """Highest BAT-NNNN number already used by the company's batches."""
+        codigos = Batch.objects.filter(
+            company_id=company_id,
+            code__startswith="BAT-"
+        ).values_list("code", flat=True)
+
+        numeros = [
+            int(match.group(1))
+            for match in (re.fullmatch(r"BAT-(\d+)", code) for code in codigos)
+            if match
+        ]
+        return max(numeros, default=0)
+
+    @staticmethod
+    def reservar_codigos(company_id, cantidad=1):
+        """
+        Reserve ``cantidad`` consecutive batch codes for the company.
+
+        The whole block is taken with one UPDATE ... RETURNING on the
+        company's BatchCodeSequence row. The first call for a company seeds
+        the sequence from its existing codes.
+        """
+        if cantidad <= 0:
+            return []
+
+        tabla = connection.ops.quote_name(BatchCodeSequence._meta.db_table)
+        sql = (
+            f"UPDATE {tabla} SET last_value = last_value + %s "
+            f"WHERE company_id = %s RETURNING last_value"
+        )
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [cantidad, company_id])
+            fila = cursor.fetchone()
+
+            if fila is None:
+                BatchCodeSequence.objects.bulk_create(
+                    [BatchCodeSequence(
+                        company_id=company_id,
+                        last_value=StockService._ultimo_codigo_existente(company_id)
+                    )],
+                    ignore_conflicts=True
+                )
+                cursor.execute(sql, [cantidad, company_id])
+                fila = cursor.fetchone()
+
+        ultimo = fila[0]
+        return [
+            f"BAT-{numero:04d}"
+            for numero in range(ultimo - cantidad + 1, ultimo + 1)
+        ]
+
     @staticmethod
     def _generate_batch_code(company_id):
-        last_batch = Batch.objects.filter(product__company_id=company_id).order_by('-id').first()
-        if last_batch and last_batch.code:
-            match = re.search(r'BAT-(\d+)', last_batch.code)
-            if match:
-                new_num = int(match.group(1)) + 1
-            else:
-                new_num = 1
-        else:
-            new_num = 1
-        return f"BAT-{new_num:04d}"
+        return StockService.reservar_codigos(company_id)[0]
 
     @staticmethod
     @transaction.atomic
@@ -29,104 +260,455 @@ class StockService:
         supplier,
         code=None
     ):
-        if not code:
-            code = StockService._generate_batch_code(product.company_id)
-        
-        batch = Batch.objects.create(
-            product=product,
-            quantity_received=quantity,
-            quantity_available=quantity,
-            purchase_price=purchase_price,
-            expiration_date=expiration_date,
-            supplier=supplier,
-            code=code
-        )
-
-        Movement.objects.create(
-            batch=batch,
-            movement_type="IN",
-            quantity=quantity,
-            note="Ingreso de producto"
-        )
+        return StockService.registrar_entradas([{
+            "product": product,
+            "quantity": quantity,
+            "purchase_price": purchase_price,
+            "expiration_date": expiration_date,
+            "supplier": supplier,
+            "code": code,
+        }])[0]
 
-        return batch
-    
     @staticmethod
     @transaction.atomic
-    def registrar_salida(product, quantity, note=None):
-        batches = (
-            Batch.objects
-            .filter(product=product, quantity_available__gt=0)
-            .order_by("expiration_date", "id")
+    def registrar_entradas(lineas, note="Ingreso de producto"):
+        """
+        Register several stock entries in one transaction.
+
+        Each line is a dict with ``product``, ``quantity``, ``purchase_price``,
+        ``expiration_date``, ``supplier`` and optionally ``code``. Batches and
+        IN movements are written with bulk_create and missing codes are
+        reserved in one block per company, so the number of queries does not
+        grow with the number of lines. Returns the created batches in order.
+        """
+        batches = []
+        sin_codigo = {}
+
+        for linea in lineas:
+            expiration_date = linea.get("expiration_date")
+            if isinstance(expiration_date, str):
+                try:
+                    expiration_date = Batch._meta.get_field(
+                        "expiration_date"
+                    ).to_python(expiration_date)
+                except ValidationError:
+                    raise ValueError("Fecha de vencimiento inválida")
+
+            product = linea["product"]
+            batch = Batch(
+                product=product,
+                company_id=product.company_id,
+                quantity_received=linea["quantity"],
+                quantity_available=linea["quantity"],
+                purchase_price=linea["purchase_price"],
+                expiration_date=expiration_date,
+                supplier=linea["supplier"],
+                code=linea.get("code") or None
+            )
+            if not batch.code:
+                sin_codigo.setdefault(product.company_id, []).append(batch)
+            batches.append(batch)
+
+        for company_id, pendientes in sin_codigo.items():
+            codigos = StockService.reservar_codigos(company_id, len(pendientes))
+            for batch, code in zip(pendientes, codigos):
+                batch.code = code
+
+        Batch.objects.bulk_create(batches)
+
+        # ProductStock before the aggregates _crear_movimientos updates,
+        # the same lock order as every other stock write
+        deltas = {}
+        for batch in batches:
+            delta = deltas.setdefault(
+                batch.product_id,
+                {"on_hand": 0, "expiring_soon": 0, "batch_count": 0}
+            )
+            delta["on_hand"] += batch.quantity_received
+            if StockService._vence_pronto(batch):
+                delta["expiring_soon"] += batch.quantity_received
+            if batch.quantity_received > 0:
+                delta["batch_count"] += 1
+        StockService._aplicar_deltas_stock(deltas)
+
+        StockService._crear_movimientos([
+            Movement(
+                batch=batch,
+                movement_type="IN",
+                quantity=batch.quantity_received,
+                stock_delta=batch.quantity_received,
+                note=note
+            )
+            for batch in batches
+        ])
+
+        return batches
+
+    @staticmethod
+    def _orden_fefo(batch):
+        """Sort key: earliest expiration first, undated batches last."""
+        return (
+            batch.expiration_date is None,
+            batch.expiration_date or date.min,
+            batch.id
         )
 
-        total = sum(b.quantity_available for b in batches)
-        if total < quantity:
-            raise ValueError("Stock insuficiente")
+    @staticmethod
+    def _planificar_fefo(batches, quantity, consumido=None):
+        """
+        Split ``quantity`` across ``batches`` (already in FEFO order).
 
+        ``consumido`` maps batch ids to units already promised to earlier
+        lines of the same order and is updated in place. Returns the list of
+        ``(batch, quantity)`` tuples and the quantity left uncovered.
+        """
+        consumido = {} if consumido is None else consumido
+        plan = []
         restante = quantity
 
         for batch in batches:
             if restante == 0:
                 break
 
-            if batch.quantity_available >= restante:
-                batch.quantity_available -= restante
-                batch.save()
+            usado = min(
+                batch.quantity_available - consumido.get(batch.pk, 0),
+                restante
+            )
+            if usado <= 0:
+                continue
 
-                Movement.objects.create(
-                    batch=batch,
-                    movement_type="OUT",
-                    quantity=restante,
-                    note=note
-                )
-                restante = 0
-            else:
-                usado = batch.quantity_available
-                batch.quantity_available = 0
-                batch.save()
+            plan.append((batch, usado))
+            consumido[batch.pk] = consumido.get(batch.pk, 0) + usado
+            restante -= usado
 
-                Movement.objects.create(
-                    batch=batch,
-                    movement_type="OUT",
-                    quantity=usado,
-                    note=note
-                )
-                restante -= usado
+        return plan, restante
+
+    @staticmethod
+    def _aplicar_salida(plan, note=None):
+        """
+        Apply an allocation plan with one UPDATE and one INSERT.
+
+        The UPDATE decrements relative to the stored value, so a stale plan
+        can never write back an old quantity; the non-negative check
+        constraint on Batch turns an oversell into "Stock insuficiente".
+        A batch may appear in several entries of the plan (one per order
+        line); it still gets a single UPDATE.
+        """
+        consumo = {}
+        lotes = {}
+        for batch, usado in plan:
+            consumo[batch.pk] = consumo.get(batch.pk, 0) + usado
+            lotes[batch.pk] = batch
+
+        restantes = {}
+        deltas = {}
+        for batch in lotes.values():
+            usado = consumo[batch.pk]
+            restantes[batch.pk] = batch.quantity_available - usado
+            delta = deltas.setdefault(
+                batch.product_id,
+                {"on_hand": 0, "expiring_soon": 0, "batch_count": 0}
+            )
+            delta["on_hand"] -= usado
+            if StockService._vence_pronto(batch):
+                delta["expiring_soon"] -= usado
+            if restantes[batch.pk] == 0:
+                delta["batch_count"] -= 1
+            batch.quantity_available = F("quantity_available") - usado
+
+        try:
+            Batch.objects.bulk_update(lotes.values(), ["quantity_available"])
+        except IntegrityError:
+            raise ValueError("Stock insuficiente")
+
+        for batch in lotes.values():
+            batch.quantity_available = restantes[batch.pk]
+
+        StockService._aplicar_deltas_stock(deltas)
+        StockService._crear_movimientos([
+            Movement(
+                batch=batch,
+                movement_type="OUT",
+                quantity=usado,
+                stock_delta=-usado,
+                note=note
+            )
+            for batch, usado in plan
+        ])
+
+    @staticmethod
+    @transaction.atomic
+    def despachar_pedido(lineas, note=None, reservas=None):
+        """
+        Dispatch a multi-line order first-expired-first-out, all or nothing.
+
+        ``lineas`` is a list of dicts with ``product`` and ``quantity``. All
+        batches involved are locked with one query in (product,
+        expiration_date, id) order, read from batch_product_fefo_idx, so
+        concurrent orders over the same products always lock in the same
+        sequence and cannot deadlock. Stock held by active, unexpired
+        reservations is not allocated, except the holds listed in ``reservas``
+        ({product_id: quantity}), which this order consumes. Returns one
+        allocation plan per line; raises StockInsuficienteError listing
+        every short line.
+        """
+        reservas = reservas or {}
+
+        for linea in lineas:
+            if linea["quantity"] <= 0:
+                raise ValueError("La cantidad debe ser mayor a cero")
+
+        # Row locks only cover the ordered products' batches, so orders
+        # over different products never wait on each other.
+        lotes = (
+            Batch.objects
+            .select_for_update()
+            .filter(
+                product_id__in={linea["product"].id for linea in lineas},
+                quantity_available__gt=0
+            )
+            .order_by("product_id", "expiration_date", "id")
+        )
+
+        productos = {linea["product"].id: linea["product"] for linea in lineas}
+        por_producto = {}
+        for batch in lotes:
+            batch.product = productos[batch.product_id]
+            por_producto.setdefault(batch.product_id, []).append(batch)
+        for batches in por_producto.values():
+            batches.sort(key=StockService._orden_fefo)
+
+        # Locking the ProductStock rows orders sales against new holds.
+        reservado = dict(
+            ProductStock.objects
+            .select_for_update()
+            .filter(product_id__in=por_producto)
+            .order_by("product_id")
+            .values_list("product_id", "reserved")
+        )
+        # Holds past their expiry still count in ``reserved`` until the
+        # sweeper runs; they must not block the sale meanwhile.
+        vencido = dict(
+            StockReservation.objects
+            .filter(
+                product_id__in=por_producto,
+                status=StockReservation.ACTIVE,
+                expires_at__lte=timezone.now()
+            )
+            .order_by()
+            .values("product_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("product_id", "total")
+        )
+        libre = {
+            pid: sum(batch.quantity_available for batch in batches)
+            - reservado.get(pid, 0)
+            + vencido.get(pid, 0)
+            + reservas.get(pid, 0)
+            for pid, batches in por_producto.items()
+        }
+
+        consumido = {}
+        planes = []
+        faltantes = []
+        for indice, linea in enumerate(lineas):
+            product = linea["product"]
+            asignable = max(0, min(linea["quantity"], libre.get(product.id, 0)))
+            plan, faltante = StockService._planificar_fefo(
+                por_producto.get(product.id, []),
+                asignable,
+                consumido
+            )
+            faltante += linea["quantity"] - asignable
+            libre[product.id] = libre.get(product.id, 0) - asignable
+            if faltante:
+                faltantes.append({
+                    "line": indice,
+                    "product": product.id,
+                    "requested": linea["quantity"],
+                    "missing": faltante,
+                })
+            planes.append(plan)
+
+        if faltantes:
+            raise StockInsuficienteError(faltantes)
+
+        StockService._aplicar_salida(
+            [asignacion for plan in planes for asignacion in plan],
+            note=note
+        )
+        StockService._aplicar_deltas_stock({
+            pid: {"reserved": -cantidad} for pid, cantidad in reservas.items()
+        })
+
+        return planes
+
+    @staticmethod
+    @transaction.atomic
+    def registrar_salida(product, quantity, note=None):
+        """
+        Remove stock first-expired-first-out.
+
+        Batches without expiration date are consumed last. Returns the
+        allocation plan as a list of ``(batch, quantity)`` tuples.
+        """
+        return StockService.despachar_pedido(
+            [{"product": product, "quantity": quantity}],
+            note=note
+        )[0]
 
     @staticmethod
     @transaction.atomic
     def ajustar_stock(batch, new_quantity, note=None):
-        diferencia = new_quantity - batch.quantity_available
-        batch.quantity_available = new_quantity
-        batch.save()
+        if new_quantity < 0:
+            raise ValueError("La cantidad no puede ser negativa")
 
-        Movement.objects.create(
-            batch=batch,
-            movement_type="ADJUST",
-            quantity=abs(diferencia),
-            note=note or "Ajuste manual"
+        actual = (
+            Batch.objects
+            .select_for_update()
+            .values_list("quantity_available", flat=True)
+            .get(pk=batch.pk)
         )
+        diferencia = new_quantity - actual
+        batch.quantity_available = new_quantity
+        Batch.objects.filter(pk=batch.pk).update(quantity_available=new_quantity)
+
+        StockService._aplicar_deltas_stock({
+            batch.product_id: {
+                "on_hand": diferencia,
+                "expiring_soon": diferencia if StockService._vence_pronto(batch) else 0,
+                "batch_count": (new_quantity > 0) - (actual > 0),
+            }
+        })
+
+        StockService._crear_movimientos([
+            Movement(
+                batch=batch,
+                movement_type="ADJUST",
+                quantity=abs(diferencia),
+                stock_delta=diferencia,
+                note=note or "Ajuste manual"
+            )
+        ])
 
     @staticmethod
     @transaction.atomic
     def marcar_vencido(batch):
-        if batch.quantity_available <= 0:
+        cantidad = (
+            Batch.objects
+            .select_for_update()
+            .values_list("quantity_available", flat=True)
+            .get(pk=batch.pk)
+        )
+        if cantidad <= 0:
             return
 
-        cantidad = batch.quantity_available
         batch.quantity_available = 0
-        batch.save()
+        Batch.objects.filter(pk=batch.pk).update(quantity_available=0)
+
+        StockService._aplicar_deltas_stock({
+            batch.product_id: {
+                "on_hand": -cantidad,
+                "expiring_soon": -cantidad if StockService._vence_pronto(batch) else 0,
+                "batch_count": -1,
+            }
+        })
 
-        Movement.objects.create(
-            batch=batch,
-            movement_type="EXPIRED",
-            quantity=cantidad,
-            note="Producto vencido"
+        StockService._crear_movimientos([
+            Movement(
+                batch=batch,
+                movement_type="EXPIRED",
+                quantity=cantidad,
+                stock_delta=-cantidad,
+                note="Producto vencido"
+            )
+        ])
+
+    @staticmethod
+    def vencer_lotes(fecha=None, company_ids=None, company_chunk=100, batch_size=1000):
+        """
+        Expire every batch past its expiration date that still has stock.
+
+        Same result as calling marcar_vencido on each batch, but set-based:
+        companies are processed ``company_chunk`` at a time and each
+        transaction zeroes up to ``batch_size`` batches with one UPDATE,
+        writes their EXPIRED movements with bulk_create and applies the
+        ProductStock deltas once. Batches locked by a running sale are
+        skipped and picked up by the next run; already expired batches have
+        no stock left, so re-running is harmless. Returns the number of
+        batches expired.
+        """
+        fecha = fecha or timezone.localdate()
+
+        if company_ids is None:
+            company_ids = Company.objects.order_by("id").values_list("id", flat=True)
+        company_ids = list(company_ids)
+
+        total = 0
+        for inicio in range(0, len(company_ids), company_chunk):
+            chunk = company_ids[inicio:inicio + company_chunk]
+            while True:
+                vencidos = StockService._vencer_chunk(fecha, chunk, batch_size)
+                total += vencidos
+                if vencidos < batch_size:
+                    break
+
+        return total
+
+    @staticmethod
+    @transaction.atomic
+    def _vencer_chunk(fecha, company_ids, batch_size):
+        batches = list(
+            Batch.objects
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                company_id__in=company_ids,
+                expiration_date__lt=fecha,
+                quantity_available__gt=0
+            )
+            .order_by("id")
+            .only(
+                "id", "code", "product_id", "company_id", "quantity_available",
+                "expiration_date", "purchase_price"
+            )
+            [:batch_size]
         )
+        if not batches:
+            return 0
+
+        Batch.objects.filter(id__in=[batch.id for batch in batches]).update(
+            quantity_available=0
+        )
+
+        deltas = {}
+        for batch in batches:
+            delta = deltas.setdefault(
+                batch.product_id,
+                {"on_hand": 0, "expiring_soon": 0, "batch_count": 0}
+            )
+            delta["on_hand"] -= batch.quantity_available
+            delta["expiring_soon"] -= batch.quantity_available
+            delta["batch_count"] -= 1
+        StockService._aplicar_deltas_stock(deltas)
+
+        StockService._crear_movimientos([
+            Movement(
+                batch=batch,
+                movement_type="EXPIRED",
+                quantity=batch.quantity_available,
+                stock_delta=-batch.quantity_available,
+                note="Producto vencido"
+            )
+            for batch in batches
+        ])
+
+        return len(batches)
 
 def stock_total(product):
-    return sum(
-        b.quantity_available
-        for b in product.batches.all()
-    )
+    return (
+        ProductStock.objects
+        .filter(product_id=product.id)
+        .values_list("on_hand", flat=True)
+        .first()
+    ) or 0
+
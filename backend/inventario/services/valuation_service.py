@@ -0,0 +1,199 @@
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from inventario.models.batch import Batch
+from inventario.models.category import Category
+from inventario.models.movement import Movement
+from inventario.models.product import Product
+from inventario.models.valuation import CategoryValuation
+
+
+class ValuationService:
+
+    CAMPOS = ("quantity", "value", "cogs")
+
+    @staticmethod
+    def _categorias(movements):
+        """
+        {product_id: category_id} for the movements' products. Products
+        already cached on the batches cost nothing; the rest one query.
+        """
+        categorias = {}
+        sin_producto = set()
+        for movement in movements:
+            if Batch.product.is_cached(movement.batch):
+                categorias[movement.batch.product_id] = movement.batch.product.category_id
+            else:
+                sin_producto.add(movement.batch.product_id)
+
+        if sin_producto - set(categorias):
+            categorias.update(
+                Product.objects
+                .filter(id__in=sin_producto - set(categorias))
+                .values_list("id", "category_id")
+            )
+        return categorias
+
+    @staticmethod
+    def registrar_movimientos(movements):
+        """
+        Add the movements' effect to CategoryValuation.
+
+        Each movement moves ``stock_delta`` units of its batch's cost layer
+        in or out of stock; OUT movements also add ``quantity * unit_cost``
+        to the cost of goods sold. Must run inside the transaction that
+        created the movements.
+        """
+        movements = [movement for movement in movements if movement.stock_delta]
+        if not movements:
+            return
+
+        categorias = ValuationService._categorias(movements)
+        deltas = {}
+        companies = {}
+        for movement in movements:
+            category_id = categorias[movement.batch.product_id]
+            companies[category_id] = movement.company_id
+            delta = deltas.setdefault(
+                category_id,
+                {"quantity": 0, "value": Decimal("0"), "cogs": Decimal("0")}
+            )
+            delta["quantity"] += movement.stock_delta
+            delta["value"] += movement.stock_delta * movement.unit_cost
+            if movement.movement_type == "OUT":
+                delta["cogs"] += movement.quantity * movement.unit_cost
+
+        ValuationService._aplicar_deltas(deltas, companies)
+
+    @staticmethod
+    def _aplicar_deltas(deltas, companies):
+        """
+        Same two-query upsert as the ProductStock projection: an INSERT of
+        the missing rows and a single UPDATE ... CASE.
+        """
+        CategoryValuation.objects.bulk_create(
+            [
+                CategoryValuation(category_id=category_id, company_id=companies[category_id])
+                for category_id in deltas
+            ],
+            ignore_conflicts=True
+        )
+
+        cambios = {}
+        for campo in ValuationService.CAMPOS:
+            whens = [
+                When(category_id=category_id, then=Value(d[campo]))
+                for category_id, d in deltas.items()
+                if d[campo]
+            ]
+            if whens:
+                cambios[campo] = F(campo) + Case(
+                    *whens,
+                    default=Value(0),
+                    output_field=CategoryValuation._meta.get_field(campo)
+                )
+
+        if cambios:
+            CategoryValuation.objects.filter(category_id__in=deltas).update(**cambios)
+
+    @staticmethod
+    def reconstruir(category_ids=None):
+        """
+        Recompute CategoryValuation from batches and the movement ledger.
+
+        Pass ``category_ids`` to rebuild only those categories (after an
+        edit that bypasses StockService, such as changing a batch's price
+        or a product's category); by default every category is rebuilt.
+        Returns the number of rows written.
+        """
+        categorias = Category.objects.all()
+        batches = Batch.objects.filter(quantity_available__gt=0)
+        ventas = Movement.objects.filter(movement_type="OUT")
+        if category_ids is not None:
+            categorias = categorias.filter(id__in=category_ids)
+            batches = batches.filter(product__category_id__in=category_ids)
+            ventas = ventas.filter(batch__product__category_id__in=category_ids)
+
+        costo = DecimalField(max_digits=16, decimal_places=2)
+        stock = {
+            category_id: (quantity, value)
+            for category_id, quantity, value in (
+                batches
+                .order_by()
+                .values("product__category_id")
+                .annotate(
+                    quantity=Sum("quantity_available"),
+                    value=Sum(F("quantity_available") * F("purchase_price"), output_field=costo),
+                )
+                .values_list("product__category_id", "quantity", "value")
+            )
+        }
+        cogs = dict(
+            ventas
+            .filter(unit_cost__isnull=False)
+            .order_by()
+            .values("batch__product__category_id")
+            .annotate(total=Sum(F("quantity") * F("unit_cost"), output_field=costo))
+            .values_list("batch__product__category_id", "total")
+        )
+
+        filas = []
+        for category_id, company_id in categorias.values_list("id", "company_id"):
+            quantity, value = stock.get(category_id, (0, Decimal("0")))
+            filas.append(CategoryValuation(
+                category_id=category_id,
+                company_id=company_id,
+                quantity=quantity,
+                value=value,
+                cogs=cogs.get(category_id, Decimal("0"))
+            ))
+        CategoryValuation.objects.bulk_create(
+            filas,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["category"],
+            update_fields=["quantity", "value", "cogs", "updated_at"]
+        )
+        return len(filas)
+
+    @staticmethod
+    def reporte(company):
+        """
+        Valuation of ``company`` per category plus totals, read from the
+        CategoryValuation rows only.
+
+        Returns:
+            dict: ``categories`` (one entry per category) and ``totals``
+        """
+        filas = (
+            CategoryValuation.objects
+            .filter(company=company)
+            .order_by("category__name", "category_id")
+            .values_list(
+                "category_id", "category__name", "quantity", "value", "cogs", "updated_at"
+            )
+        )
+
+        categorias = []
+        totales = {"quantity": 0, "value": Decimal("0"), "cogs": Decimal("0")}
+        for category_id, name, quantity, value, cogs, updated_at in filas:
+            categorias.append({
+                "category": category_id,
+                "category_name": name,
+                "quantity": quantity,
+                "value": f"{value:.2f}",
+                "cogs": f"{cogs:.2f}",
+                "updated_at": updated_at,
+            })
+            totales["quantity"] += quantity
+            totales["value"] += value
+            totales["cogs"] += cogs
+
+        return {
+            "categories": categorias,
+            "totals": {
+                "quantity": totales["quantity"],
+                "value": f"{totales['value']:.2f}",
+                "cogs": f"{totales['cogs']:.2f}",
+            },
+        }
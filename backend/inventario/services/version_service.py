@@ -0,0 +1,63 @@
+from django.db.models import F
+
+from inventario.models.resource_version import CompanyResourceVersion
+
+
+class VersionService:
+
+    @staticmethod
+    def incrementar(company_ids, *resources):
+        """
+        Bump the version of ``resources`` for every company in ``company_ids``.
+
+        One UPDATE in the common case. When a counter does not exist yet the
+        missing rows are seeded with bulk_create(ignore_conflicts) and the
+        UPDATE is run again; counters already bumped go up twice, which is
+        harmless, and no concurrent first write loses its increment.
+        """
+        company_ids = {company_ids} if isinstance(company_ids, int) else set(company_ids)
+        if not company_ids or not resources:
+            return
+
+        filas = CompanyResourceVersion.objects.filter(
+            company_id__in=company_ids,
+            resource__in=resources
+        )
+        if filas.update(version=F("version") + 1) == len(company_ids) * len(resources):
+            return
+
+        CompanyResourceVersion.objects.bulk_create(
+            [
+                CompanyResourceVersion(company_id=company_id, resource=resource)
+                for company_id in company_ids
+                for resource in resources
+            ],
+            ignore_conflicts=True
+        )
+        filas.update(version=F("version") + 1)
+
+    @staticmethod
+    def version(company_id, resource):
+        """Current version of ``resource`` for the company, 0 if never written."""
+        return (
+            CompanyResourceVersion.objects
+            .filter(company_id=company_id, resource=resource)
+            .values_list("version", flat=True)
+            .first()
+        ) or 0
+
+    @staticmethod
+    def firma(company_id):
+        """
+        Every version of the company in one string, e.g.
+        ``batches:4,products:7``; it changes whenever any resource is written.
+        """
+        return ",".join(
+            f"{resource}:{version}"
+            for resource, version in (
+                CompanyResourceVersion.objects
+                .filter(company_id=company_id)
+                .order_by("resource")
+                .values_list("resource", "version")
+            )
+        )
@@ -9,7 +9,23 @@ Tests cover:
 - Company assignment
 """
 
-from django.test import TestCase
+import csv
+import json
+import math
+import queue
+import re
+import threading
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.admin.sites import site as admin_site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -19,6 +35,28 @@ from inventario.models.category import Category
 from inventario.models.product import Product
 from inventario.models.batch import Batch
 from inventario.models.movement import Movement
+from inventario.models.product_stock import ProductStock
+from inventario.models.reservation import StockReservation
+from inventario.models.stock_snapshot import ProductStockSnapshot
+from inventario.models.outbox import OutboxCursor, OutboxEvent
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.models.valuation import CategoryValuation
+from inventario.models.movement_rollup import DailyMovementRollup
+from inventario.models.company_metrics import CompanyMetrics
+from inventario.models.reorder_point import ProductReorderPoint
+from inventario.models.expiration_risk import BatchExpirationRisk
+from inventario.serializers.category_serializer import CategorySerializer
+from inventario.serializers.product_serializer import ProductSerializer
+from inventario.services.cache_service import CatalogCache
+from inventario.services.expiration_risk_service import ExpirationRiskService
+from inventario.services.outbox_service import OutboxService
+from inventario.services.outbox_sinks import QueueSink
+from inventario.services.reorder_service import ReorderService
+from inventario.services.reservation_service import ReservationService
+from inventario.services.snapshot_service import SnapshotService
+from inventario.services.version_service import VersionService
+from inventario.services.stock_service import StockService, stock_total
+from inventario.services.valuation_service import ValuationService
 
 
 class MultiTenantTestBase(TestCase):
@@ -26,6 +64,7 @@ class MultiTenantTestBase(TestCase):
 
     def setUp(self):
         """Set up test data."""
+        cache.clear()
         self.client = APIClient()
         
         # Create companies
@@ -84,6 +123,48 @@ class MultiTenantTestBase(TestCase):
             company=self.company_b
         )
 
+    def _ventas(self, producto, cantidades):
+        """Seed the daily OUT rollup: ``cantidades[d]`` units sold ``d`` days ago."""
+        hoy = timezone.localdate()
+        DailyMovementRollup.objects.bulk_create([
+            DailyMovementRollup(
+                company_id=producto.company_id, product=producto,
+                day=hoy - timedelta(days=dia), movement_type="OUT",
+                quantity=cantidad, stock_delta=-cantidad, count=1
+            )
+            for dia, cantidad in enumerate(cantidades) if cantidad
+        ])
+
+
+class QueryBudgetMixin:
+    """
+    Assert that an endpoint's (or job's) query count does not grow with
+    its rows.
+
+    ``preparar(n)`` sets up data for ``n`` rows and returns a callable that
+    performs the request or runs the job; only that callable is measured,
+    with an empty catalog cache so the database path is what gets counted.
+    """
+
+    def contar_queries(self, peticion):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = peticion()
+        if hasattr(response, "status_code"):
+            self.assertLess(response.status_code, 400, getattr(response, "data", None))
+        return queries
+
+    def assertQueryBudget(self, preparar, pocas=2, muchas=20):
+        con_pocas = self.contar_queries(preparar(pocas))
+        con_muchas = self.contar_queries(preparar(muchas))
+        self.assertEqual(
+            len(con_pocas),
+            len(con_muchas),
+            "Queries grow with rows:\n" + "\n".join(
+                q["sql"] for q in con_muchas.captured_queries
+            )
+        )
+
 
 class CategoryAPIViewTests(MultiTenantTestBase):
     """Tests for CategoryAPIView."""
@@ -372,3 +453,2040 @@ class MovementAPIViewTests(MultiTenantTestBase):
         
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Movement.objects.filter(id=self.movement_a.id).exists())
+
+
+class StockServiceSalidaTests(MultiTenantTestBase):
+    """Tests for the FEFO allocation in StockService.registrar_salida."""
+
+    def _crear_lotes(self, count, quantity=10):
+        inicio = Batch.objects.filter(product=self.product_a).count()
+        return [
+            Batch.objects.create(
+                product=self.product_a,
+                code=f"LOT-{inicio + i}",
+                quantity_received=quantity,
+                quantity_available=quantity,
+                purchase_price=10.00,
+                expiration_date=date(2027, 1, 1) + timedelta(days=inicio + i),
+                supplier="Supplier A"
+            )
+            for i in range(count)
+        ]
+
+    def test_salida_consumes_first_expired_first(self):
+        """Stock leaves the batches closest to expiration first."""
+        lotes = self._crear_lotes(3)
+
+        plan = StockService.registrar_salida(self.product_a, 15, note="Venta")
+
+        self.assertEqual(
+            [(batch.id, usado) for batch, usado in plan],
+            [(lotes[0].id, 10), (lotes[1].id, 5)]
+        )
+        disponibles = list(
+            Batch.objects.filter(product=self.product_a)
+            .order_by("id")
+            .values_list("quantity_available", flat=True)
+        )
+        self.assertEqual(disponibles, [0, 5, 10])
+        self.assertEqual(
+            Movement.objects.filter(movement_type="OUT").count(), 2
+        )
+
+    def test_salida_batches_without_expiration_go_last(self):
+        """Batches with no expiration date are consumed after dated ones."""
+        sin_fecha = Batch.objects.create(
+            product=self.product_a,
+            code="LOT-NODATE",
+            quantity_received=10,
+            quantity_available=10,
+            purchase_price=10.00,
+            supplier="Supplier A"
+        )
+        lotes = self._crear_lotes(1)
+
+        plan = StockService.registrar_salida(self.product_a, 12)
+
+        self.assertEqual(
+            [batch.id for batch, _ in plan], [lotes[0].id, sin_fecha.id]
+        )
+
+    def test_salida_insufficient_stock_changes_nothing(self):
+        """A sale larger than the stock raises and leaves batches untouched."""
+        self._crear_lotes(2)
+
+        with self.assertRaises(ValueError):
+            StockService.registrar_salida(self.product_a, 21)
+
+        self.assertEqual(
+            sum(Batch.objects.values_list("quantity_available", flat=True)), 20
+        )
+        self.assertFalse(Movement.objects.exists())
+
+    def test_salida_query_count_independent_of_batches(self):
+        """A sale spanning many batches costs the same queries as one."""
+        self._crear_lotes(1)
+        VersionService.incrementar(
+            self.company_a.id,
+            CompanyResourceVersion.PRODUCTS,
+            CompanyResourceVersion.BATCHES,
+            CompanyResourceVersion.MOVEMENTS,
+        )
+        with CaptureQueriesContext(connection) as pocos:
+            StockService.registrar_salida(self.product_a, 10)
+
+        self._crear_lotes(40)
+        with CaptureQueriesContext(connection) as muchos:
+            StockService.registrar_salida(self.product_a, 400)
+
+        self.assertEqual(len(pocos), len(muchos))
+
+
+class StockConcurrencyTests(TransactionTestCase):
+    """Concurrent stock exits must never oversell a product."""
+
+    HILOS = 8
+    VENTAS_POR_HILO = 10
+
+    def setUp(self):
+        company = Company.objects.create(name="Concurrency Co")
+        category = Category.objects.create(
+            name="Concurrency", slug="concurrency", company=company
+        )
+        self.products = [
+            Product.objects.create(
+                name=f"Concurrent {i}",
+                slug=f"concurrent-{i}",
+                category=category,
+                supplier="Supplier",
+                company=company
+            )
+            for i in range(2)
+        ]
+        for product in self.products:
+            for i in range(3):
+                Batch.objects.create(
+                    product=product,
+                    code=f"C-{i}",
+                    quantity_received=10,
+                    quantity_available=10,
+                    purchase_price=1.00,
+                    expiration_date=date(2027, 1, 1) + timedelta(days=i),
+                    supplier="Supplier"
+                )
+
+    def _vender(self, product, vendidas, lock):
+        try:
+            for _ in range(self.VENTAS_POR_HILO):
+                try:
+                    StockService.registrar_salida(product, 1)
+                except (ValueError, OperationalError):
+                    continue
+                with lock:
+                    vendidas[product.id] += 1
+        finally:
+            connection.close()
+
+    def test_concurrent_exits_never_oversell(self):
+        """More sales than stock: sold units match the stock that left."""
+        vendidas = {product.id: 0 for product in self.products}
+        lock = threading.Lock()
+        hilos = [
+            threading.Thread(
+                target=self._vender,
+                args=(self.products[i % 2], vendidas, lock)
+            )
+            for i in range(self.HILOS)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertGreater(sum(vendidas.values()), 0)
+        for product in self.products:
+            disponible = sum(
+                Batch.objects.filter(product=product)
+                .values_list("quantity_available", flat=True)
+            )
+            salidas = sum(
+                Movement.objects.filter(batch__product=product)
+                .values_list("quantity", flat=True)
+            )
+            self.assertGreaterEqual(disponible, 0)
+            self.assertLessEqual(vendidas[product.id], 30)
+            self.assertEqual(salidas, vendidas[product.id])
+            self.assertEqual(disponible + salidas, 30)
+
+    def test_check_constraint_rejects_negative_stock(self):
+        """The database itself refuses a negative quantity_available."""
+        batch = Batch.objects.filter(product=self.products[0]).first()
+
+        with self.assertRaises(IntegrityError):
+            Batch.objects.filter(pk=batch.pk).update(quantity_available=-1)
+
+
+class StockLockOrderTests(TransactionTestCase):
+    """Stock-ins and dispatches of one product run concurrently without deadlocks."""
+
+    HILOS = 4
+    OPERACIONES = 10
+
+    def setUp(self):
+        company = Company.objects.create(name="Lock Order Co")
+        category = Category.objects.create(name="Lock", slug="lock", company=company)
+        self.product = Product.objects.create(
+            name="Lock", slug="lock", category=category, supplier="Supplier", company=company
+        )
+        StockService.registrar_entrada(self.product, 20, "1.00", date(2027, 1, 1), "Supplier")
+
+    def _entradas(self, errores):
+        try:
+            for i in range(self.OPERACIONES):
+                try:
+                    StockService.registrar_entrada(
+                        self.product, 1, "2.00", date(2027, 2, 1) + timedelta(days=i), "Supplier"
+                    )
+                except OperationalError as exc:
+                    errores.append(exc)
+        finally:
+            connection.close()
+
+    def _salidas(self, errores):
+        try:
+            for _ in range(self.OPERACIONES):
+                try:
+                    StockService.registrar_salida(self.product, 1)
+                except ValueError:
+                    continue
+                except OperationalError as exc:
+                    errores.append(exc)
+        finally:
+            connection.close()
+
+    def test_concurrent_in_and_dispatch(self):
+        errores = []
+        hilos = [
+            threading.Thread(target=self._entradas if i % 2 else self._salidas, args=(errores,))
+            for i in range(self.HILOS)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        # SQLite refuses concurrent writers outright; only a deadlock is a bug
+        self.assertFalse([exc for exc in errores if "deadlock" in str(exc).lower()])
+        self.assertGreater(Movement.objects.filter(batch__product=self.product).count(), 1)
+
+        stock = ProductStock.objects.get(product=self.product)
+        self.assertEqual(
+            stock.on_hand,
+            sum(Batch.objects.filter(product=self.product).values_list("quantity_available", flat=True))
+        )
+        valoracion = CategoryValuation.objects.values_list("quantity", "value", "cogs").get()
+        ValuationService.reconstruir()
+        self.assertEqual(
+            CategoryValuation.objects.values_list("quantity", "value", "cogs").get(), valoracion
+        )
+
+
+class ProductStockProjectionTests(MultiTenantTestBase):
+    """ProductStock must track the batches through every StockService call."""
+
+    def _proyeccion(self):
+        stock = ProductStock.objects.get(product=self.product_a)
+        return (stock.on_hand, stock.expiring_soon, stock.batch_count)
+
+    def _reconstruida(self):
+        ProductStock.objects.all().delete()
+        StockService.reconstruir_stock()
+        return self._proyeccion()
+
+    def test_projection_follows_stock_operations(self):
+        """Counters kept by the service match a rebuild from batches."""
+        pronto = timezone.localdate() + timedelta(days=5)
+        lejos = timezone.localdate() + timedelta(days=300)
+        lote_pronto = StockService.registrar_entrada(
+            self.product_a, 10, "1.00", pronto.isoformat(), "Supplier A"
+        )
+        lote_lejos = StockService.registrar_entrada(
+            self.product_a, 20, "1.00", lejos, "Supplier A"
+        )
+        self.assertEqual(self._proyeccion(), (30, 10, 2))
+
+        StockService.registrar_salida(self.product_a, 12)
+        self.assertEqual(self._proyeccion(), (18, 0, 1))
+
+        StockService.ajustar_stock(lote_lejos, 25)
+        StockService.ajustar_stock(lote_pronto, 4)
+        self.assertEqual(self._proyeccion(), (29, 4, 2))
+
+        StockService.marcar_vencido(lote_pronto)
+        esperado = (25, 0, 1)
+        self.assertEqual(self._proyeccion(), esperado)
+        self.assertEqual(self._reconstruida(), esperado)
+
+    def test_product_list_reads_stock_projection(self):
+        """GET /products/ reports stock without touching batches."""
+        StockService.registrar_entrada(
+            self.product_a, 7, "1.00", None, "Supplier A"
+        )
+        self.client.force_authenticate(user=self.user_a)
+
+        response = self.client.get("/api/products/")
+
+        self.assertEqual(response.data[0]["stock"], 7)
+        self.assertEqual(stock_total(self.product_a), 7)
+
+    def test_rebuild_command_repairs_drift(self):
+        """reconstruir_stock fixes a projection that drifted from batches."""
+        StockService.registrar_entrada(
+            self.product_a, 7, "1.00", None, "Supplier A"
+        )
+        ProductStock.objects.filter(product=self.product_a).update(on_hand=99)
+
+        call_command("reconstruir_stock", company=self.company_a.id, stdout=StringIO())
+
+        self.assertEqual(self._proyeccion(), (7, 0, 1))
+
+
+class BatchCodeSequenceTests(MultiTenantTestBase):
+    """Batch codes come from a per-company sequence."""
+
+    def test_codes_are_sequential_per_company(self):
+        """Each company numbers its batches independently."""
+        primero = StockService.registrar_entrada(
+            self.product_a, 1, "1.00", None, "Supplier A"
+        )
+        segundo = StockService.registrar_entrada(
+            self.product_a, 1, "1.00", None, "Supplier A"
+        )
+        otra = StockService.registrar_entrada(
+            self.product_b, 1, "1.00", None, "Supplier B"
+        )
+
+        self.assertEqual(
+            [primero.code, segundo.code, otra.code],
+            ["BAT-0001", "BAT-0002", "BAT-0001"]
+        )
+
+    def test_block_reservation(self):
+        """A block reservation hands out consecutive codes in one go."""
+        StockService.reservar_codigos(self.company_a.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            codigos = StockService.reservar_codigos(self.company_a.id, 3)
+
+        self.assertEqual(codigos, ["BAT-0002", "BAT-0003", "BAT-0004"])
+        self.assertEqual(
+            len([q for q in queries if q["sql"].startswith("UPDATE")]), 1
+        )
+
+    def test_sequence_seeded_from_existing_codes(self):
+        """Companies with legacy codes continue after their highest number."""
+        Batch.objects.create(
+            product=self.product_a,
+            code="BAT-0041",
+            quantity_received=1,
+            quantity_available=1,
+            purchase_price=1.00,
+            supplier="Supplier A"
+        )
+
+        self.assertEqual(
+            StockService.reservar_codigos(self.company_a.id), ["BAT-0042"]
+        )
+
+
+class StockBulkInViewTests(MultiTenantTestBase):
+    """Tests for POST /stock/in/bulk/."""
+
+    def _lineas(self, count, product=None):
+        product = product or self.product_a
+        return [
+            {
+                "product": product.id,
+                "quantity": 5,
+                "purchase_price": "2.50",
+                "supplier": "Supplier A",
+                "expiration_date": "2027-06-30",
+            }
+            for _ in range(count)
+        ]
+
+    def test_bulk_in_creates_batches_and_movements(self):
+        """Every line becomes a batch with its IN movement."""
+        self.client.force_authenticate(user=self.user_a)
+
+        response = self.client.post(
+            "/api/stock/in/bulk/", {"lines": self._lineas(3)}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [r["batch_code"] for r in response.data["results"]],
+            ["BAT-0001", "BAT-0002", "BAT-0003"]
+        )
+        self.assertEqual(Batch.objects.filter(product=self.product_a).count(), 3)
+        self.assertEqual(Movement.objects.filter(movement_type="IN").count(), 3)
+        self.assertEqual(stock_total(self.product_a), 15)
+        # The denormalized company follows the product
+        self.assertEqual(Batch.objects.filter(company=self.company_a).count(), 3)
+        self.assertEqual(Movement.objects.filter(company=self.company_a).count(), 3)
+
+    def test_bulk_in_query_count_independent_of_lines(self):
+        """A large delivery costs the same queries as a small one."""
+        self.client.force_authenticate(user=self.user_a)
+        StockService.reservar_codigos(self.company_a.id)
+        VersionService.incrementar(
+            self.company_a.id,
+            CompanyResourceVersion.PRODUCTS,
+            CompanyResourceVersion.BATCHES,
+            CompanyResourceVersion.MOVEMENTS,
+        )
+
+        with CaptureQueriesContext(connection) as pocas:
+            self.client.post(
+                "/api/stock/in/bulk/", {"lines": self._lineas(2)}, format="json"
+            )
+        with CaptureQueriesContext(connection) as muchas:
+            self.client.post(
+                "/api/stock/in/bulk/", {"lines": self._lineas(50)}, format="json"
+            )
+
+        self.assertEqual(len(pocas), len(muchas))
+
+    def test_bulk_in_rejects_other_company_products(self):
+        """Lines for another company's products fail the whole delivery."""
+        self.client.force_authenticate(user=self.user_a)
+        lineas = self._lineas(1) + self._lineas(1, product=self.product_b)
+
+        response = self.client.post(
+            "/api/stock/in/bulk/", {"lines": lineas}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["lines"][0]["line"], 1)
+        self.assertFalse(Batch.objects.exists())
+
+
+class StockOrderOutViewTests(MultiTenantTestBase):
+    """Tests for POST /stock/out/order/."""
+
+    def setUp(self):
+        super().setUp()
+        self.product_a2 = Product.objects.create(
+            name="Product A2",
+            slug="product-a2",
+            category=self.category_a,
+            supplier="Supplier A",
+            company=self.company_a
+        )
+        for product in (self.product_a, self.product_a2):
+            StockService.registrar_entrada(product, 10, "1.00", "2027-01-01", "Supplier A")
+            StockService.registrar_entrada(product, 10, "1.00", "2027-02-01", "Supplier A")
+
+    def test_order_dispatches_every_line(self):
+        """Each line is allocated FEFO and all stock leaves together."""
+        self.client.force_authenticate(user=self.user_a)
+        data = {"lines": [
+            {"product": self.product_a.id, "quantity": 12},
+            {"product": self.product_a2.id, "quantity": 3},
+            {"product": self.product_a.id, "quantity": 5},
+        ]}
+
+        response = self.client.post("/api/stock/out/order/", data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [len(r["allocations"]) for r in response.data["results"]], [2, 1, 1]
+        )
+        self.assertEqual(stock_total(self.product_a), 3)
+        self.assertEqual(stock_total(self.product_a2), 17)
+
+    def test_order_short_line_dispatches_nothing(self):
+        """A short line rolls back the order and is reported."""
+        self.client.force_authenticate(user=self.user_a)
+        data = {"lines": [
+            {"product": self.product_a.id, "quantity": 5},
+            {"product": self.product_a2.id, "quantity": 25},
+        ]}
+
+        response = self.client.post("/api/stock/out/order/", data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["lines"],
+            [{"line": 1, "product": self.product_a2.id, "requested": 25, "missing": 5}]
+        )
+        self.assertEqual(stock_total(self.product_a), 20)
+        self.assertFalse(Movement.objects.filter(movement_type="OUT").exists())
+
+    def test_order_query_count_independent_of_lines(self):
+        """An order costs the same queries whatever its number of lines."""
+        self.client.force_authenticate(user=self.user_a)
+        una = {"lines": [{"product": self.product_a.id, "quantity": 1}]}
+        varias = {"lines": [
+            {"product": product.id, "quantity": 1}
+            for product in (self.product_a, self.product_a2) * 5
+        ]}
+
+        with CaptureQueriesContext(connection) as pocas:
+            self.client.post("/api/stock/out/order/", una, format="json")
+        with CaptureQueriesContext(connection) as muchas:
+            self.client.post("/api/stock/out/order/", varias, format="json")
+
+        self.assertEqual(len(pocas), len(muchas))
+
+
+class StockReservationTests(MultiTenantTestBase):
+    """Tests for stock holds and their interaction with sales."""
+
+    def setUp(self):
+        super().setUp()
+        StockService.registrar_entrada(self.product_a, 10, "1.00", "2027-01-01", "Supplier A")
+
+    def test_reservation_blocks_sales_of_held_stock(self):
+        """Held units can't be sold or held twice."""
+        ReservationService.reservar(self.product_a, 8)
+
+        with self.assertRaises(ValueError):
+            StockService.registrar_salida(self.product_a, 3)
+        with self.assertRaises(ValueError):
+            ReservationService.reservar(self.product_a, 3)
+
+        StockService.registrar_salida(self.product_a, 2)
+        self.assertEqual(stock_total(self.product_a), 8)
+
+    def test_release_returns_stock(self):
+        """DELETE /reservations/{id}/ frees the held units."""
+        self.client.force_authenticate(user=self.user_a)
+        response = self.client.post(
+            "/api/reservations/",
+            {"product": self.product_a.id, "quantity": 10},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.delete(f"/api/reservations/{response.data['id']}/")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        StockService.registrar_salida(self.product_a, 10)
+
+    def test_confirm_consumes_reservation(self):
+        """POST /reservations/{id}/confirm/ sells exactly the held units."""
+        reservation = ReservationService.reservar(self.product_a, 6)
+        self.client.force_authenticate(user=self.user_a)
+
+        response = self.client.post(f"/api/reservations/{reservation.id}/confirm/")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        stock = ProductStock.objects.get(product=self.product_a)
+        self.assertEqual((stock.on_hand, stock.reserved), (4, 0))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, StockReservation.CONSUMED)
+
+    def test_sweeper_releases_expired_holds(self):
+        """liberar_vencidas expires old holds and frees their stock."""
+        ReservationService.reservar(self.product_a, 4)
+        vieja = ReservationService.reservar(self.product_a, 5)
+        StockReservation.objects.filter(pk=vieja.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(ReservationService.liberar_vencidas(), 1)
+
+        vieja.refresh_from_db()
+        self.assertEqual(vieja.status, StockReservation.EXPIRED)
+        self.assertEqual(ProductStock.objects.get(product=self.product_a).reserved, 4)
+
+    def test_expired_hold_does_not_block_sales(self):
+        """Expired holds stop counting before the sweeper releases them."""
+        vieja = ReservationService.reservar(self.product_a, 8)
+        StockReservation.objects.filter(pk=vieja.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        StockService.registrar_salida(self.product_a, 10)
+
+        self.assertEqual(ReservationService.liberar_vencidas(), 1)
+        stock = ProductStock.objects.get(product=self.product_a)
+        self.assertEqual((stock.on_hand, stock.reserved), (0, 0))
+
+    def test_other_company_cannot_reserve(self):
+        """Reservations are scoped to the user's company."""
+        self.client.force_authenticate(user=self.user_b)
+
+        response = self.client.post(
+            "/api/reservations/",
+            {"product": self.product_a.id, "quantity": 1},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExpirySweeperTests(MultiTenantTestBase):
+    """Tests for the bulk expiry sweeper."""
+
+    def setUp(self):
+        super().setUp()
+        ayer = timezone.localdate() - timedelta(days=1)
+        manana = timezone.localdate() + timedelta(days=1)
+        self.vencido_a = StockService.registrar_entrada(self.product_a, 5, "1.00", ayer, "Supplier A")
+        self.vigente_a = StockService.registrar_entrada(self.product_a, 7, "1.00", manana, "Supplier A")
+        self.vencido_b = StockService.registrar_entrada(self.product_b, 3, "1.00", ayer, "Supplier B")
+
+    def test_sweeper_expires_past_batches_of_every_company(self):
+        """Only batches past their date are zeroed, with EXPIRED movements."""
+        call_command("vencer_lotes", company_chunk=1, batch_size=1, stdout=StringIO())
+
+        self.vencido_a.refresh_from_db()
+        self.vigente_a.refresh_from_db()
+        self.vencido_b.refresh_from_db()
+        self.assertEqual(
+            (self.vencido_a.quantity_available, self.vigente_a.quantity_available,
+             self.vencido_b.quantity_available),
+            (0, 7, 0)
+        )
+        self.assertEqual(
+            sorted(Movement.objects.filter(movement_type="EXPIRED")
+                   .values_list("quantity", flat=True)),
+            [3, 5]
+        )
+        self.assertEqual(stock_total(self.product_a), 7)
+
+    def test_sweeper_is_idempotent(self):
+        """A second run finds nothing left to expire."""
+        self.assertEqual(StockService.vencer_lotes(), 2)
+        self.assertEqual(StockService.vencer_lotes(), 0)
+        self.assertEqual(Movement.objects.filter(movement_type="EXPIRED").count(), 2)
+
+
+class StockAsOfTests(MultiTenantTestBase):
+    """Historical stock from snapshots plus later movement deltas."""
+
+    def setUp(self):
+        super().setUp()
+        self.dia1 = date(2026, 3, 1)
+        self.dia2 = date(2026, 3, 2)
+        self.dia3 = date(2026, 3, 3)
+
+        lote = StockService.registrar_entrada(self.product_a, 10, "1.00", None, "Supplier A")
+        self._mover_a(self.dia1)
+        StockService.registrar_salida(self.product_a, 3)
+        self._mover_a(self.dia2)
+        StockService.ajustar_stock(lote, 9)
+        self._mover_a(self.dia3)
+
+    def _mover_a(self, dia):
+        """Date every movement created since the last call at noon of ``dia``."""
+        Movement.objects.filter(created_at__gt=timezone.now() - timedelta(minutes=1)).update(
+            created_at=timezone.make_aware(datetime.combine(dia, time(12)))
+        )
+
+    def test_stock_as_of_without_snapshots(self):
+        """Without snapshots the whole history is replayed."""
+        self.assertEqual(
+            [
+                SnapshotService.stock_a_fecha([self.product_a.id], dia)[self.product_a.id]
+                for dia in (self.dia1 - timedelta(days=1), self.dia1, self.dia2, self.dia3)
+            ],
+            [0, 10, 7, 9]
+        )
+
+    def test_stock_as_of_starts_from_snapshot(self):
+        """Snapshots are used as the starting point for later dates."""
+        SnapshotService.tomar_snapshots(self.dia2)
+        ProductStockSnapshot.objects.filter(date=self.dia2).update(quantity=100)
+
+        self.assertEqual(
+            SnapshotService.stock_a_fecha([self.product_a.id], self.dia3),
+            {self.product_a.id: 102}
+        )
+        self.assertEqual(
+            SnapshotService.stock_a_fecha([self.product_a.id], self.dia1),
+            {self.product_a.id: 10}
+        )
+
+    def test_as_of_endpoint_is_company_scoped(self):
+        """GET /stock/as-of/ only reports user's company products."""
+        call_command("tomar_snapshots", fecha="2026-03-02", stdout=StringIO())
+        self.client.force_authenticate(user=self.user_a)
+
+        response = self.client.get(
+            "/api/stock/as-of/",
+            {"date": "2026-03-03", "product_ids": f"{self.product_a.id},{self.product_b.id}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"], [{"product": self.product_a.id, "quantity": 9}]
+        )
+
+
+class OutboxTests(MultiTenantTestBase):
+    """Movement events written with the movement and relayed at least once."""
+
+    def setUp(self):
+        super().setUp()
+        self.settle = OutboxService.SETTLE_SECONDS
+        OutboxService.SETTLE_SECONDS = 0
+        StockService.registrar_entrada(self.product_a, 10, "1.00", None, "Supplier A")
+        StockService.registrar_salida(self.product_a, 4)
+        StockService.registrar_entrada(self.product_b, 3, "1.00", None, "Supplier B")
+
+    def tearDown(self):
+        OutboxService.SETTLE_SECONDS = self.settle
+        super().tearDown()
+
+    def _recibidos(self, sink):
+        eventos = []
+        while not sink.queue.empty():
+            eventos.append(sink.queue.get_nowait())
+        return eventos
+
+    def test_event_written_for_every_movement(self):
+        """Each movement gets exactly one event for its company."""
+        self.assertEqual(OutboxEvent.objects.count(), Movement.objects.count())
+        event = OutboxEvent.objects.get(movement__movement_type="OUT")
+        self.assertEqual(event.company_id, self.company_a.id)
+        self.assertEqual(event.payload["stock_delta"], -4)
+
+    def test_failed_movement_writes_no_event(self):
+        """Events roll back together with the movement."""
+        antes = OutboxEvent.objects.count()
+        with self.assertRaises(ValueError):
+            StockService.registrar_salida(self.product_a, 100)
+        self.assertEqual(OutboxEvent.objects.count(), antes)
+
+    def test_relay_publishes_once_and_advances_cursor(self):
+        """A second pass sends nothing already delivered."""
+        sink = QueueSink()
+
+        self.assertEqual(OutboxService.publicar(sink, batch_size=2), 3)
+        self.assertEqual(OutboxService.publicar(sink, batch_size=2), 0)
+
+        ids = [event["id"] for event in self._recibidos(sink)]
+        self.assertEqual(ids, sorted(OutboxEvent.objects.values_list("id", flat=True)))
+        self.assertEqual(OutboxCursor.objects.get(name="default").last_event_id, ids[-1])
+
+    def test_failing_sink_keeps_cursor(self):
+        """Events are sent again when the sink fails."""
+        class SinkCaido:
+            def send(self, events):
+                raise ConnectionError("sink caido")
+
+        with self.assertRaises(ConnectionError):
+            OutboxService.publicar(SinkCaido())
+        self.assertEqual(OutboxCursor.objects.get(name="default").last_event_id, 0)
+
+        sink = QueueSink(queue.Queue())
+        self.assertEqual(OutboxService.publicar(sink), 3)
+
+    def test_events_endpoint_is_company_scoped(self):
+        """GET /events/ only returns user's company events after the cursor."""
+        self.client.force_authenticate(user=self.user_a)
+
+        response = self.client.get("/api/events/", {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get("/api/events/", {"after": response.data["next_cursor"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertTrue(all(
+            event["company_id"] == self.company_a.id for event in response.data["results"]
+        ))
+
+    def test_events_endpoint_holds_back_unsettled_events(self):
+        """Events younger than SETTLE_SECONDS are not served or skipped."""
+        self.client.force_authenticate(user=self.user_a)
+        OutboxService.SETTLE_SECONDS = 60
+        OutboxEvent.objects.filter(company=self.company_a).update(
+            created_at=timezone.now() - timedelta(seconds=120)
+        )
+        reciente = OutboxEvent.objects.filter(company=self.company_a).latest("id")
+        OutboxEvent.objects.filter(id=reciente.id).update(created_at=timezone.now())
+
+        response = self.client.get("/api/events/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [event["id"] for event in response.data["results"]]
+        self.assertNotIn(reciente.id, ids)
+        self.assertEqual(response.data["next_cursor"], ids[-1])
+
+        # Once settled, the next poll from the cursor picks it up
+        OutboxService.SETTLE_SECONDS = 0
+        response = self.client.get("/api/events/", {"after": response.data["next_cursor"]})
+        self.assertEqual([event["id"] for event in response.data["results"]], [reciente.id])
+
+
+class KeysetPaginationTests(MultiTenantTestBase):
+    """Cursor pagination on the movement and batch lists."""
+
+    def setUp(self):
+        super().setUp()
+        StockService.registrar_entradas([
+            {
+                "product": self.product_a,
+                "quantity": 1,
+                "purchase_price": "1.00",
+                "expiration_date": None,
+                "supplier": "Supplier A",
+            }
+            for _ in range(5)
+        ])
+        StockService.registrar_entrada(self.product_b, 1, "1.00", None, "Supplier B")
+        self.client.force_authenticate(user=self.user_a)
+
+    def _recorrer(self, url, limit):
+        ids, paginas = [], 0
+        params = {"limit": limit}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in response.data)
+            paginas += 1
+            if "X-Next-Cursor" not in response:
+                return ids, paginas
+            self.assertIn('rel="next"', response["Link"])
+            params = {"limit": limit, "cursor": response["X-Next-Cursor"]}
+
+    def test_movements_walk_all_pages_in_order(self):
+        """Following the cursor returns every company movement once."""
+        ids, paginas = self._recorrer("/api/movements/", 2)
+
+        esperados = list(
+            Movement.objects.filter(batch__product__company=self.company_a)
+            .order_by("id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, esperados)
+        self.assertEqual(paginas, 3)
+
+    def test_batches_walk_all_pages_in_order(self):
+        """Batch list pages are company-scoped and stable."""
+        ids, _ = self._recorrer("/api/batches/", 4)
+
+        self.assertEqual(
+            ids,
+            list(Batch.objects.filter(product__company=self.company_a)
+                 .order_by("id").values_list("id", flat=True))
+        )
+
+    def test_limit_is_capped(self):
+        """A huge limit is clamped instead of loading the whole table."""
+        response = self.client.get("/api/movements/", {"limit": 10 ** 9})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+        self.assertNotIn("X-Next-Cursor", response)
+
+    def test_invalid_cursor_is_rejected(self):
+        """A tampered cursor returns 400."""
+        response = self.client.get("/api/batches/", {"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryBudgetTests(QueryBudgetMixin, MultiTenantTestBase):
+    """Every endpoint issues a fixed number of queries, whatever the row count."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user_a)
+        StockService.reservar_codigos(self.company_a.id)
+        VersionService.incrementar(
+            self.company_a.id,
+            CompanyResourceVersion.PRODUCTS,
+            CompanyResourceVersion.BATCHES,
+            CompanyResourceVersion.MOVEMENTS,
+        )
+
+    def _producto(self, i):
+        return Product.objects.create(
+            name=f"Budget {i}",
+            slug=f"budget-{i}-{Product.objects.count()}",
+            category=self.category_a,
+            supplier="Supplier A",
+            company=self.company_a
+        )
+
+    def _lotes(self, product, n):
+        StockService.registrar_entradas([
+            {
+                "product": product,
+                "quantity": 1,
+                "purchase_price": "1.00",
+                "expiration_date": None,
+                "supplier": "Supplier A",
+            }
+            for _ in range(n)
+        ])
+
+    def _descargar(self, url):
+        """GET a streaming export and read the whole body, so every query runs."""
+        def peticion():
+            response = self.client.get(url)
+            b"".join(response.streaming_content)
+            return response
+        return peticion
+
+    def test_category_list(self):
+        def preparar(n):
+            for i in range(n):
+                Category.objects.create(
+                    name=f"Cat {i}", slug=f"cat-{n}-{i}", company=self.company_a
+                )
+            return lambda: self.client.get("/api/categories/")
+        self.assertQueryBudget(preparar)
+
+    def test_product_list(self):
+        def preparar(n):
+            for i in range(n):
+                self._lotes(self._producto(i), 1)
+            return lambda: self.client.get("/api/products/")
+        self.assertQueryBudget(preparar)
+
+    def test_batch_list(self):
+        def preparar(n):
+            self._lotes(self._producto(n), n)
+            return lambda: self.client.get("/api/batches/")
+        self.assertQueryBudget(preparar)
+
+    def test_movement_list(self):
+        def preparar(n):
+            self._lotes(self._producto(n), n)
+            return lambda: self.client.get("/api/movements/")
+        self.assertQueryBudget(preparar)
+
+    def test_event_list(self):
+        def preparar(n):
+            self._lotes(self.product_a, n)
+            return lambda: self.client.get("/api/events/")
+        self.assertQueryBudget(preparar)
+
+    def test_reservation_list(self):
+        def preparar(n):
+            self._lotes(self.product_a, n)
+            for _ in range(n):
+                ReservationService.reservar(self.product_a, 1)
+            return lambda: self.client.get("/api/reservations/")
+        self.assertQueryBudget(preparar)
+
+    def test_reservation_confirm(self):
+        def preparar(n):
+            product = self._producto(n)
+            self._lotes(product, n)
+            reservation = ReservationService.reservar(product, n)
+            return lambda: self.client.post(f"/api/reservations/{reservation.id}/confirm/")
+        self.assertQueryBudget(preparar)
+
+    def test_stock_in(self):
+        def preparar(n):
+            return lambda: self.client.post(
+                f"/api/products/{self.product_a.id}/stock/in/",
+                {"quantity": n, "purchase_price": "1.00", "supplier": "Supplier A"},
+                format="json"
+            )
+        self.assertQueryBudget(preparar)
+
+    def test_stock_out_across_batches(self):
+        def preparar(n):
+            product = self._producto(n)
+            self._lotes(product, n)
+            return lambda: self.client.post(
+                f"/api/products/{product.id}/stock/out/", {"quantity": n}, format="json"
+            )
+        self.assertQueryBudget(preparar)
+
+    def test_stock_bulk_in(self):
+        def preparar(n):
+            lineas = [
+                {"product": self.product_a.id, "quantity": 1,
+                 "purchase_price": "1.00", "supplier": "Supplier A"}
+                for _ in range(n)
+            ]
+            return lambda: self.client.post(
+                "/api/stock/in/bulk/", {"lines": lineas}, format="json"
+            )
+        self.assertQueryBudget(preparar)
+
+    def test_stock_order_out(self):
+        def preparar(n):
+            productos = [self._producto(i) for i in range(n)]
+            for product in productos:
+                self._lotes(product, 2)
+            lineas = [{"product": product.id, "quantity": 2} for product in productos]
+            return lambda: self.client.post(
+                "/api/stock/out/order/", {"lines": lineas}, format="json"
+            )
+        self.assertQueryBudget(preparar)
+
+    def test_stock_as_of(self):
+        def preparar(n):
+            productos = [self._producto(i) for i in range(n)]
+            for product in productos:
+                self._lotes(product, 1)
+            ids = ",".join(str(product.id) for product in productos)
+            return lambda: self.client.get(
+                "/api/stock/as-of/", {"date": timezone.localdate().isoformat(), "product_ids": ids}
+            )
+        self.assertQueryBudget(preparar)
+
+    def test_product_search(self):
+        def preparar(n):
+            for i in range(n):
+                self._lotes(self._producto(i), 1)
+            return lambda: self.client.get("/api/products/search/", {"q": "Budget"})
+        self.assertQueryBudget(preparar)
+
+    def test_product_search_by_batch_code(self):
+        def preparar(n):
+            for i in range(n):
+                self._lotes(self._producto(i), 1)
+            return lambda: self.client.get("/api/products/search/", {"q": "BAT-"})
+        self.assertQueryBudget(preparar)
+
+    def test_movement_export(self):
+        def preparar(n):
+            self._lotes(self._producto(n), n)
+            return self._descargar("/api/movements/export/")
+        self.assertQueryBudget(preparar)
+
+    def test_batch_export(self):
+        def preparar(n):
+            self._lotes(self._producto(n), n)
+            return self._descargar("/api/batches/export/?output=ndjson")
+        self.assertQueryBudget(preparar)
+
+    def test_movement_report(self):
+        def preparar(n):
+            for i in range(n):
+                product = self._producto(i)
+                self._lotes(product, 1)
+                StockService.registrar_salida(product, 1)
+            return lambda: self.client.get("/api/reports/movements/")
+        self.assertQueryBudget(preparar)
+
+    def test_dashboard_summary(self):
+        # Both measured calls refresh an existing metrics row
+        self.client.get("/api/dashboard/summary/")
+
+        def preparar(n):
+            # Run the version bumps so each call recomputes the metrics
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(n):
+                    product = self._producto(i)
+                    self._lotes(product, 2)
+                    StockService.registrar_salida(product, 1)
+            return lambda: self.client.get("/api/dashboard/summary/")
+        self.assertQueryBudget(preparar)
+
+    def test_reorder_report(self):
+        def preparar(n):
+            for i in range(n):
+                product = self._producto(i)
+                self._lotes(product, 1)
+                self._ventas(product, [5] * 7)
+            ReorderService.calcular()
+            return lambda: self.client.get("/api/reports/reorder/")
+        self.assertQueryBudget(preparar)
+
+    def test_expiration_risk_report(self):
+        def preparar(n):
+            product = self._producto(n)
+            StockService.registrar_entradas([
+                {
+                    "product": product,
+                    "quantity": 5,
+                    "purchase_price": "1.00",
+                    "expiration_date": timezone.localdate() + timedelta(days=i),
+                    "supplier": "Supplier A",
+                }
+                for i in range(n)
+            ])
+            ExpirationRiskService.pronosticar()
+            return lambda: self.client.get("/api/reports/expiration-risk/")
+        self.assertQueryBudget(preparar)
+
+
+class ExportTests(MultiTenantTestBase):
+    """Streaming CSV/NDJSON exports."""
+
+    def setUp(self):
+        super().setUp()
+        self.lote = StockService.registrar_entrada(self.product_a, 10, "1.50", None, "Supplier A")
+        StockService.registrar_salida(self.product_a, 4, note="Venta, mostrador")
+        StockService.registrar_entrada(self.product_b, 3, "1.00", None, "Supplier B")
+        self.client.force_authenticate(user=self.user_a)
+
+    def _cuerpo(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_movement_csv_is_streamed_and_company_scoped(self):
+        """CSV export has a header and only user's company rows."""
+        response = self.client.get("/api/movements/export/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        filas = list(csv.reader(StringIO(self._cuerpo(response))))
+        self.assertEqual(filas[0][:3], ["id", "created_at", "movement_type"])
+        self.assertEqual([fila[2] for fila in filas[1:]], ["IN", "OUT"])
+        self.assertEqual(filas[2][-1], "Venta, mostrador")
+
+    def test_movement_ndjson_with_filters(self):
+        """NDJSON export honours type and date filters."""
+        hoy = timezone.localdate()
+        response = self.client.get("/api/movements/export/", {
+            "output": "ndjson",
+            "movement_type": "OUT",
+            "date_from": hoy.isoformat(),
+            "date_to": hoy.isoformat(),
+        })
+
+        filas = [json.loads(linea) for linea in self._cuerpo(response).splitlines()]
+        self.assertEqual(len(filas), 1)
+        self.assertEqual((filas[0]["quantity"], filas[0]["stock_delta"]), (4, -4))
+
+        response = self.client.get("/api/movements/export/", {
+            "output": "ndjson", "date_from": (hoy + timedelta(days=1)).isoformat()
+        })
+        self.assertEqual(self._cuerpo(response), "")
+
+    def test_batch_export(self):
+        """Batch export streams user's company batches."""
+        response = self.client.get("/api/batches/export/", {"output": "ndjson", "in_stock": "true"})
+
+        filas = [json.loads(linea) for linea in self._cuerpo(response).splitlines()]
+        self.assertEqual([fila["code"] for fila in filas], [self.lote.code])
+        self.assertEqual(filas[0]["quantity_available"], 6)
+
+    def test_invalid_parameters(self):
+        """Unknown output or bad dates are rejected before streaming."""
+        self.assertEqual(
+            self.client.get("/api/movements/export/", {"output": "xml"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get("/api/batches/export/", {"date_from": "ayer"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+
+class ConditionalGetTests(MultiTenantTestBase):
+    """ETag / 304 on the polled list endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user_a)
+
+    def _etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response["ETag"]
+
+    def test_unchanged_list_returns_304_without_reading_table(self):
+        """A matching If-None-Match is answered from the version counter."""
+        etag = self._etag("/api/products/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(any(
+            "inventario_product" in query["sql"] for query in queries.captured_queries
+        ))
+
+    def test_view_writes_change_etag(self):
+        """Creating a category changes the category ETag only for that company."""
+        etag = self._etag("/api/categories/")
+        self.client.force_authenticate(user=self.user_b)
+        etag_b = self._etag("/api/categories/")
+
+        self.client.force_authenticate(user=self.user_a)
+        self.client.post("/api/categories/", {"name": "Nueva", "slug": "nueva"}, format="json")
+
+        response = self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        self.client.force_authenticate(user=self.user_b)
+        response = self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag_b)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_stock_service_writes_change_etag(self):
+        """Stock movements change product, batch and movement ETags."""
+        urls = ["/api/products/", "/api/batches/", f"/api/products/{self.product_a.id}/"]
+        etags = [self._etag(url) for url in urls]
+
+        # Versions move when the stock transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            StockService.registrar_entrada(self.product_a, 5, "1.00", None, "Supplier A")
+
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+    def test_stock_versions_bumped_after_commit(self):
+        """Stock writes leave the shared version rows alone until commit."""
+        antes = VersionService.firma(self.company_a.id)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            StockService.registrar_entrada(self.product_a, 5, "1.00", None, "Supplier A")
+            self.assertEqual(VersionService.firma(self.company_a.id), antes)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(VersionService.firma(self.company_a.id), antes)
+
+
+class CatalogCacheTests(MultiTenantTestBase):
+    """Read-through cache for category and product GETs."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user_a)
+
+    def test_second_read_is_served_from_cache(self):
+        """A repeated GET does not touch the product table."""
+        primera = self.client.get("/api/products/")
+
+        with CaptureQueriesContext(connection) as queries:
+            segunda = self.client.get("/api/products/")
+
+        self.assertEqual(segunda.data, primera.data)
+        self.assertFalse(any(
+            "inventario_product" in query["sql"] for query in queries.captured_queries
+        ))
+        self.assertEqual(
+            self.client.get("/api/cache/stats/").data["products"],
+            {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        )
+
+    def test_entries_are_keyed_by_company_and_params(self):
+        """Another company or other filters never get a cached answer."""
+        self.client.get("/api/products/")
+        self.client.get("/api/products/", {"category_id": self.category_a.id})
+
+        self.client.force_authenticate(user=self.user_b)
+        response = self.client.get("/api/products/")
+
+        self.assertEqual([p["id"] for p in response.data], [self.product_b.id])
+        self.assertEqual(CatalogCache.estadisticas(self.company_a.id)["products"]["misses"], 2)
+
+    def test_view_and_stock_writes_invalidate(self):
+        """Product writes and stock movements make the next read a miss."""
+        self.client.get("/api/products/")
+        self.client.patch(
+            f"/api/products/{self.product_a.id}/", {"name": "Renombrado"}, format="json"
+        )
+        self.assertEqual(self.client.get("/api/products/").data[0]["name"], "Renombrado")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StockService.registrar_entrada(self.product_a, 5, "1.00", None, "Supplier A")
+        self.assertEqual(self.client.get("/api/products/").data[0]["stock"], 5)
+
+    def test_admin_writes_invalidate(self):
+        """Saving a category in the admin invalidates the category list."""
+        self.client.get("/api/categories/")
+        self.category_a.name = "Desde admin"
+        admin_site._registry[Category].save_model(None, self.category_a, None, True)
+
+        response = self.client.get("/api/categories/")
+        self.assertEqual(response.data[0]["name"], "Desde admin")
+
+
+class SparseFieldsTests(MultiTenantTestBase):
+    """?fields= and the values() fast path on catalog lists."""
+
+    def setUp(self):
+        super().setUp()
+        StockService.registrar_entrada(self.product_a, 7, "1.00", None, "Supplier A")
+        self.sin_stock = Product.objects.create(
+            name="Sin stock",
+            slug="sin-stock",
+            category=self.category_a,
+            supplier="Supplier A",
+            company=self.company_a
+        )
+        self.client.force_authenticate(user=self.user_a)
+
+    def test_fast_path_matches_model_serializer(self):
+        """The lean list output is identical to ProductSerializer's."""
+        response = self.client.get("/api/products/")
+
+        esperado = ProductSerializer(
+            Product.objects.filter(company=self.company_a).select_related("stock"), many=True
+        ).data
+        self.assertEqual(response.json(), json.loads(json.dumps(esperado)))
+
+        response = self.client.get("/api/categories/")
+        esperado = CategorySerializer(Category.objects.filter(company=self.company_a), many=True).data
+        self.assertEqual(response.json(), json.loads(json.dumps(esperado)))
+
+    def test_fields_narrow_output_and_sql(self):
+        """Only the requested columns are selected and returned."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/products/", {"fields": "id,name,stock"})
+
+        self.assertEqual(
+            response.data,
+            [
+                {"id": self.product_a.id, "name": "Product A", "stock": 7},
+                {"id": self.sin_stock.id, "name": "Sin stock", "stock": 0},
+            ]
+        )
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn('"slug"', sql)
+        self.assertNotIn('"supplier"', sql)
+
+        response = self.client.get(f"/api/products/{self.product_a.id}/", {"fields": "name"})
+        self.assertEqual(response.data, {"name": "Product A"})
+
+    def test_unknown_field_is_rejected(self):
+        """Asking for a field that does not exist returns 400."""
+        response = self.client.get("/api/categories/", {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductIncludeStockTests(QueryBudgetMixin, MultiTenantTestBase):
+    """?include=stock on GET /products/."""
+
+    def setUp(self):
+        super().setUp()
+        StockService.registrar_entrada(self.product_a, 4, "1.00", date(2027, 3, 1), "Supplier A")
+        StockService.registrar_entrada(self.product_a, 6, "1.00", date(2027, 1, 15), "Supplier A")
+        vacio = StockService.registrar_entrada(self.product_a, 2, "1.00", date(2026, 12, 1), "Supplier A")
+        StockService.registrar_salida(self.product_a, 2)
+        self.assertEqual(Batch.objects.get(pk=vacio.pk).quantity_available, 0)
+        self.client.force_authenticate(user=self.user_a)
+
+    def _crear_productos(self, cantidad):
+        for i in range(cantidad):
+            producto = Product.objects.create(
+                name=f"Extra {cantidad}-{i}", slug=f"extra-{cantidad}-{i}",
+                category=self.category_a, supplier="Supplier A", company=self.company_a
+            )
+            StockService.registrar_entrada(producto, 3, "1.00", None, "Supplier A")
+
+    def test_aggregates_only_in_stock_batches(self):
+        """Empty batches do not count towards the nearest expiration."""
+        response = self.client.get(
+            "/api/products/",
+            {"include": "stock", "fields": "id,stock_available,nearest_expiration,active_batches"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [{
+            "id": self.product_a.id,
+            "stock_available": 10,
+            "nearest_expiration": "2027-01-15",
+            "active_batches": 2,
+        }])
+
+        response = self.client.get(f"/api/products/{self.product_a.id}/", {"include": "stock"})
+        self.assertEqual(response.json()["stock_available"], 10)
+        self.assertEqual(response.json()["active_batches"], 2)
+
+    def test_product_without_batches(self):
+        """Products with no stock get zero counts and no expiration."""
+        Product.objects.create(
+            name="Sin lotes", slug="sin-lotes", category=self.category_a,
+            supplier="Supplier A", company=self.company_a
+        )
+        response = self.client.get("/api/products/", {"include": "stock", "name": "Sin lotes"})
+        self.assertEqual(response.data[0]["stock_available"], 0)
+        self.assertIsNone(response.data[0]["nearest_expiration"])
+        self.assertEqual(response.data[0]["active_batches"], 0)
+
+    def test_single_query_whatever_the_product_count(self):
+        """The aggregates ride on the list query itself."""
+        def preparar(n):
+            self._crear_productos(n)
+            return lambda: self.client.get("/api/products/", {"include": "stock"})
+        self.assertQueryBudget(preparar)
+
+    def test_unknown_include_is_rejected(self):
+        response = self.client.get("/api/products/", {"include": "movements"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductSearchTests(MultiTenantTestBase):
+    """GET /products/search/ (LIKE fallback on SQLite)."""
+
+    def setUp(self):
+        super().setUp()
+        for name, slug, supplier in [
+            ("Paracetamol 500mg", "paracetamol-500", "Bayer"),
+            ("Ibuprofeno", "ibuprofeno", "Paramedic Labs"),
+            ("Jarabe para la tos", "jarabe-tos", "Genfar"),
+        ]:
+            Product.objects.create(
+                name=name, slug=slug, supplier=supplier,
+                category=self.category_a, company=self.company_a
+            )
+        Product.objects.create(
+            name="Paracetamol B", slug="paracetamol-b", supplier="Bayer",
+            category=self.category_b_data, company=self.company_b
+        )
+        self.lote = StockService.registrar_entrada(self.product_a, 4, "1.00", None, "Supplier A")
+        self.client.force_authenticate(user=self.user_a)
+
+    def _nombres(self, q):
+        response = self.client.get("/api/products/search/", {"q": q})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product["name"] for product in response.data]
+
+    def test_prefix_ranks_before_contains(self):
+        """Name prefix first, then supplier prefix, then substring matches."""
+        self.assertEqual(
+            self._nombres("para"),
+            ["Paracetamol 500mg", "Ibuprofeno", "Jarabe para la tos"]
+        )
+
+    def test_batch_code_and_company_scope(self):
+        """Batch codes match their product; other companies never show up."""
+        self.assertEqual(self._nombres(self.lote.code.lower()), ["Product A"])
+        self.assertNotIn("Paracetamol B", self._nombres("paracetamol"))
+
+    def test_results_include_stock_and_honour_limit(self):
+        """Results use the lean product fields and are capped by limit."""
+        response = self.client.get("/api/products/search/", {"q": "a", "limit": 2})
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(set(response.data[0]), {"id", "name", "slug", "supplier", "stock"})
+
+        response = self.client.get("/api/products/search/", {"q": "  "})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ValuationTests(QueryBudgetMixin, MultiTenantTestBase):
+    """CategoryValuation upkeep and GET /reports/valuation/."""
+
+    def setUp(self):
+        super().setUp()
+        self.category_a2 = Category.objects.create(
+            name="Category A2", slug="category-a2", company=self.company_a
+        )
+        self.product_a2 = Product.objects.create(
+            name="Product A2", slug="product-a2", category=self.category_a2,
+            supplier="Supplier A", company=self.company_a
+        )
+        # Two cost layers; the one expiring first is consumed first
+        self.caro = StockService.registrar_entrada(
+            self.product_a, 10, "3.00", date(2027, 6, 1), "Supplier A"
+        )
+        self.barato = StockService.registrar_entrada(
+            self.product_a, 4, "2.50", date(2027, 1, 1), "Supplier A"
+        )
+        StockService.registrar_entrada(self.product_a2, 5, "10.00", None, "Supplier A")
+        StockService.registrar_entrada(self.product_b, 8, "1.00", None, "Supplier B")
+        self.client.force_authenticate(user=self.user_a)
+
+    def _valoracion(self):
+        return {
+            fila["category"]: (fila["quantity"], fila["value"], fila["cogs"])
+            for fila in self.client.get("/api/reports/valuation/").data["categories"]
+        }
+
+    def _esperado(self):
+        """Brute force: every batch times its price, every sale times its cost."""
+        return {
+            category.id: (
+                sum(b.quantity_available for b in Batch.objects.filter(product__category=category)),
+                "%.2f" % sum(
+                    b.quantity_available * b.purchase_price
+                    for b in Batch.objects.filter(product__category=category)
+                ),
+                "%.2f" % sum(
+                    m.quantity * m.unit_cost
+                    for m in Movement.objects.filter(
+                        batch__product__category=category, movement_type="OUT"
+                    )
+                ),
+            )
+            for category in Category.objects.filter(company=self.company_a)
+        }
+
+    def test_entries_value_each_layer(self):
+        self.assertEqual(self._valoracion(), {
+            self.category_a.id: (14, "40.00", "0.00"),
+            self.category_a2.id: (5, "50.00", "0.00"),
+        })
+        response = self.client.get("/api/reports/valuation/")
+        self.assertEqual(response.data["totals"], {"quantity": 19, "value": "90.00", "cogs": "0.00"})
+
+    def test_sale_costs_the_layers_it_consumed(self):
+        """Selling 6 units takes 4 at 2.50 and 2 at 3.00."""
+        StockService.registrar_salida(self.product_a, 6)
+
+        self.assertEqual(self._valoracion()[self.category_a.id], (8, "24.00", "16.00"))
+        self.assertEqual(
+            sorted(Movement.objects.filter(movement_type="OUT").values_list("unit_cost", flat=True)),
+            [Decimal("2.50"), Decimal("3.00")]
+        )
+        self.assertEqual(self._valoracion(), self._esperado())
+
+    def test_adjust_and_expiry_change_value_not_cogs(self):
+        StockService.ajustar_stock(Batch.objects.get(pk=self.caro.pk), 7)
+        StockService.marcar_vencido(Batch.objects.get(pk=self.barato.pk))
+
+        self.assertEqual(self._valoracion()[self.category_a.id], (7, "21.00", "0.00"))
+        self.assertEqual(self._valoracion(), self._esperado())
+
+    def test_edits_outside_stock_service_are_revalued(self):
+        """Batch price edits and category moves rebuild the categories involved."""
+        StockService.registrar_salida(self.product_a, 6)
+        response = self.client.put(f"/api/batches/{self.caro.pk}/", {
+            "product": self.product_a.id,
+            "quantity_received": 10,
+            "quantity_available": 8,
+            "purchase_price": "4.00",
+            "supplier": "Supplier A",
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._valoracion()[self.category_a.id], (8, "32.00", "16.00"))
+
+        response = self.client.patch(
+            f"/api/products/{self.product_a.id}/", {"category": self.category_a2.id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._valoracion(), {
+            self.category_a.id: (0, "0.00", "0.00"),
+            self.category_a2.id: (13, "82.00", "16.00"),
+        })
+        self.assertEqual(self._valoracion(), self._esperado())
+
+    def test_deleted_sale_leaves_cogs(self):
+        StockService.registrar_salida(self.product_a, 6)
+        venta = Movement.objects.filter(movement_type="OUT", unit_cost=Decimal("3.00")).get()
+
+        response = self.client.delete(f"/api/movements/{venta.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._valoracion()[self.category_a.id], (8, "24.00", "10.00"))
+        self.assertEqual(self._valoracion(), self._esperado())
+
+    def test_rebuild_matches_incremental(self):
+        StockService.registrar_salida(self.product_a, 5)
+        StockService.vencer_lotes(date(2027, 2, 1))
+        incremental = self._valoracion()
+
+        CategoryValuation.objects.all().delete()
+        call_command("reconstruir_valoracion", stdout=StringIO())
+        self.assertEqual(self._valoracion(), incremental)
+        self.assertEqual(incremental, self._esperado())
+
+    def test_report_is_company_scoped_and_flat_cost(self):
+        """Only the user's categories; the cost does not grow with batches."""
+        def preparar(n):
+            StockService.registrar_entradas([
+                {"product": self.product_a, "quantity": 1, "purchase_price": "1.00",
+                 "supplier": "Supplier A"}
+                for _ in range(n)
+            ])
+            return lambda: self.client.get("/api/reports/valuation/")
+        self.assertQueryBudget(preparar)
+        self.assertNotIn(self.category_b_data.id, self._valoracion())
+
+
+class MovementRollupTests(MultiTenantTestBase):
+    """DailyMovementRollup upkeep, backfill and GET /reports/movements/."""
+
+    def setUp(self):
+        super().setUp()
+        StockService.registrar_entrada(self.product_a, 10, "1.00", None, "Supplier A")
+        StockService.registrar_entrada(self.product_a, 5, "1.00", None, "Supplier A")
+        StockService.registrar_salida(self.product_a, 3)
+        StockService.registrar_salida(self.product_a, 12)
+        StockService.registrar_entrada(self.product_b, 4, "1.00", None, "Supplier B")
+        self.hoy = timezone.localdate()
+        self.client.force_authenticate(user=self.user_a)
+
+    def _rollup(self):
+        return set(
+            DailyMovementRollup.objects.values_list(
+                "company_id", "product_id", "day", "movement_type", "quantity", "stock_delta", "count"
+            )
+        )
+
+    def test_stock_service_keeps_rollup_current(self):
+        """Movements of the same day and type add up in one row."""
+        self.assertEqual(self._rollup(), {
+            (self.company_a.id, self.product_a.id, self.hoy, "IN", 15, 15, 2),
+            (self.company_a.id, self.product_a.id, self.hoy, "OUT", 15, -15, 3),
+            (self.company_b.id, self.product_b.id, self.hoy, "IN", 4, 4, 1),
+        })
+
+    def test_deleted_movement_leaves_rollup(self):
+        salidas = Movement.objects.filter(movement_type="OUT", company=self.company_a)
+        for movimiento in salidas.order_by("id")[:2]:
+            response = self.client.delete(f"/api/movements/{movimiento.pk}/")
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        restante = salidas.get()
+
+        self.assertIn(
+            (self.company_a.id, self.product_a.id, self.hoy, "OUT",
+             restante.quantity, restante.stock_delta, 1),
+            self._rollup()
+        )
+
+        response = self.client.delete(f"/api/movements/{restante.pk}/")
+        self.assertFalse(DailyMovementRollup.objects.filter(movement_type="OUT").exists())
+
+    def test_backfill_rebuilds_history_by_day(self):
+        """The command rebuilds every day from the ledger, idempotently."""
+        ayer = timezone.now() - timedelta(days=1)
+        Movement.objects.filter(movement_type="IN", company=self.company_a).update(created_at=ayer)
+        DailyMovementRollup.objects.all().delete()
+
+        # Today is still open and left alone by default
+        call_command("reconstruir_rollup", workers=1, chunk_days=1, stdout=StringIO())
+        self.assertEqual(self._rollup(), {
+            (self.company_a.id, self.product_a.id, timezone.localdate(ayer), "IN", 15, 15, 2),
+        })
+
+        for _ in range(2):
+            call_command(
+                "reconstruir_rollup", workers=1, chunk_days=1, hasta=self.hoy.isoformat(),
+                stdout=StringIO()
+            )
+
+        self.assertEqual(self._rollup(), {
+            (self.company_a.id, self.product_a.id, timezone.localdate(ayer), "IN", 15, 15, 2),
+            (self.company_a.id, self.product_a.id, self.hoy, "OUT", 15, -15, 3),
+            (self.company_b.id, self.product_b.id, self.hoy, "IN", 4, 4, 1),
+        })
+
+    def test_report_reads_rollup_only(self):
+        """Trends come from the rollup, grouped by period, company scoped."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/reports/movements/", {"interval": "month"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mes = self.hoy.replace(day=1)
+        self.assertEqual(response.json(), [
+            {"period": mes.isoformat(), "movement_type": "IN", "quantity": 15, "stock_delta": 15, "count": 2},
+            {"period": mes.isoformat(), "movement_type": "OUT", "quantity": 15, "stock_delta": -15, "count": 3},
+        ])
+        self.assertFalse(
+            [q["sql"] for q in queries.captured_queries if '"inventario_movement"' in q["sql"]]
+        )
+
+        response = self.client.get("/api/reports/movements/", {"movement_type": "OUT"})
+        self.assertEqual([fila["movement_type"] for fila in response.data], ["OUT"])
+
+    def test_invalid_parameters(self):
+        for params in ({"interval": "year"}, {"date_from": "ayer"},
+                       {"date_from": "2026-02-01", "date_to": "2026-01-01"}):
+            response = self.client.get("/api/reports/movements/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DashboardSummaryTests(MultiTenantTestBase):
+    """GET /dashboard/summary/ served from CompanyMetrics."""
+
+    def setUp(self):
+        super().setUp()
+        pronto = timezone.localdate() + timedelta(days=10)
+        self.poco = Product.objects.create(
+            name="Poco stock", slug="poco-stock", category=self.category_a,
+            supplier="Supplier A", company=self.company_a
+        )
+        StockService.registrar_entrada(self.product_a, 20, "2.00", None, "Supplier A")
+        StockService.registrar_entrada(self.product_a, 4, "1.00", pronto, "Supplier A")
+        StockService.registrar_entrada(self.poco, 3, "5.00", None, "Supplier A")
+        StockService.registrar_salida(self.product_a, 2)
+        StockService.registrar_entrada(self.product_b, 100, "1.00", pronto, "Supplier B")
+        self.client.force_authenticate(user=self.user_a)
+
+    def _resumen(self):
+        response = self.client.get("/api/dashboard/summary/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_kpis(self):
+        data = self._resumen()
+        self.assertEqual(
+            {clave: data[clave] for clave in (
+                "total_products", "total_categories", "active_batches", "stock_units",
+                "stock_value", "low_stock_products", "expiring_soon_units",
+                "expiring_soon_products", "movements_today",
+            )},
+            {
+                "total_products": 2,
+                "total_categories": 1,
+                "active_batches": 3,
+                "stock_units": 25,
+                "stock_value": "57.00",
+                "low_stock_products": 1,
+                "expiring_soon_units": 2,
+                "expiring_soon_products": 1,
+                "movements_today": 4,
+            }
+        )
+
+    def test_fresh_row_is_served_without_recomputing(self):
+        """Until something is written the row is read as is."""
+        self._resumen()
+        with CaptureQueriesContext(connection) as queries:
+            self._resumen()
+        self.assertFalse(
+            [q["sql"] for q in queries.captured_queries if '"inventario_product"' in q["sql"]]
+        )
+
+    def test_writes_and_age_refresh_the_row(self):
+        self._resumen()
+        with self.captureOnCommitCallbacks(execute=True):
+            StockService.registrar_salida(self.poco, 1)
+        self.assertEqual(self._resumen()["movements_today"], 5)
+
+        # Date-dependent KPIs are recomputed once the row gets old
+        CompanyMetrics.objects.filter(company=self.company_a).update(
+            refreshed_at=timezone.now() - timedelta(hours=1), movements_today=0
+        )
+        self.assertEqual(self._resumen()["movements_today"], 5)
+
+    def test_command_refreshes_every_company(self):
+        call_command("refrescar_metricas", stdout=StringIO())
+        self.assertEqual(
+            CompanyMetrics.objects.get(company=self.company_b).stock_units, 100
+        )
+
+
+class ReorderPointTests(QueryBudgetMixin, MultiTenantTestBase):
+    """ReorderService and GET /reports/reorder/."""
+
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.localdate()
+        self.estable = Product.objects.create(
+            name="Estable", slug="estable", category=self.category_a,
+            supplier="Supplier A", company=self.company_a, lead_time_days=4
+        )
+        self.sin_ventas = Product.objects.create(
+            name="Sin ventas", slug="sin-ventas", category=self.category_a,
+            supplier="Supplier A", company=self.company_a
+        )
+        # product_a sells 10 a day every other day, estable 2 a day
+        self._ventas(self.product_a, [10 if dia % 2 else 0 for dia in range(56)])
+        self._ventas(self.estable, [2] * 56)
+        self._ventas(self.product_b, [50] * 56)
+        StockService.registrar_entrada(self.product_a, 20, "1.00", None, "Supplier A")
+        StockService.registrar_entrada(self.estable, 100, "1.00", None, "Supplier A")
+        self.client.force_authenticate(user=self.user_a)
+
+    def test_vectorized_maths_match_definition(self):
+        """Mean, sample std over the whole window and z * std * sqrt(L)."""
+        from statistics import NormalDist, mean, stdev
+        import numpy as np
+
+        demanda = {1: [3, 0, 5, 0], 2: [0, 0, 0, 0], 3: [1, 1, 1, 1]}
+        media, desviacion, seguridad, punto = ReorderService.calcular_puntos(
+            np.array([1, 1, 3, 3, 3, 3, 99]),
+            np.array([3.0, 5.0, 1.0, 1.0, 1.0, 1.0, 7.0]),
+            np.array([1, 2, 3]),
+            np.array([2.0, 2.0, 9.0]),
+            4, 0.95
+        )
+        z = NormalDist().inv_cdf(0.95)
+        for i, (pid, lead_time) in enumerate([(1, 2), (2, 2), (3, 9)]):
+            self.assertAlmostEqual(media[i], mean(demanda[pid]))
+            self.assertAlmostEqual(desviacion[i], stdev(demanda[pid]))
+            esperado = math.ceil(z * stdev(demanda[pid]) * math.sqrt(lead_time))
+            self.assertEqual(seguridad[i], esperado)
+            self.assertEqual(punto[i], math.ceil(mean(demanda[pid]) * lead_time + esperado))
+
+    def test_points_stored_for_every_product(self):
+        self.assertEqual(ReorderService.calcular(), 4)
+
+        puntos = {p.product_id: p for p in ProductReorderPoint.objects.all()}
+        self.assertAlmostEqual(puntos[self.product_a.id].avg_daily_demand, 5.0)
+        self.assertEqual(puntos[self.product_a.id].lead_time_days, 7)
+        self.assertEqual(puntos[self.estable.id].reorder_point, 8)
+        self.assertEqual(puntos[self.estable.id].safety_stock, 0)
+        self.assertEqual(puntos[self.sin_ventas.id].reorder_point, 0)
+
+    def test_query_count_independent_of_products(self):
+        def preparar(n):
+            for i in range(n):
+                producto = Product.objects.create(
+                    name=f"Extra {n}-{i}", slug=f"extra-{n}-{i}", category=self.category_a,
+                    supplier="Supplier A", company=self.company_a
+                )
+                self._ventas(producto, [1, 2, 3])
+            return ReorderService.calcular
+        self.assertQueryBudget(preparar)
+
+    def test_report_lists_products_below_reorder_point(self):
+        """Only products with sales whose available stock is at or below it."""
+        call_command("calcular_reorden", stdout=StringIO())
+
+        response = self.client.get("/api/reports/reorder/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([fila["product"] for fila in response.data], [self.product_a.id])
+        fila = response.data[0]
+        self.assertEqual(fila["available"], 20)
+        self.assertEqual(fila["shortfall"], fila["reorder_point"] - 20)
+
+        # Reserved units are not available
+        ReservationService.reservar(self.estable, 95)
+        response = self.client.get("/api/reports/reorder/")
+        self.assertEqual(
+            [fila["product"] for fila in response.data], [self.product_a.id, self.estable.id]
+        )
+
+
+class ExpirationRiskTests(QueryBudgetMixin, MultiTenantTestBase):
+    """ExpirationRiskService and GET /reports/expiration-risk/."""
+
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.localdate()
+        # product_a sells 2 a day, product_b (company B) 1 a day
+        self._ventas(self.product_a, [2] * ReorderService.WINDOW_DAYS)
+        self._ventas(self.product_b, [1] * ReorderService.WINDOW_DAYS)
+        self.vencido = self._lote(self.product_a, 3, "1.00", -1)
+        self.cercano = self._lote(self.product_a, 8, "2.00", 5)
+        self.lejano = self._lote(self.product_a, 30, "2.50", 10)
+        self.sin_fecha = self._lote(self.product_a, 50, "1.00", None)
+        self.lote_b = self._lote(self.product_b, 40, "1.00", 10)
+        self.client.force_authenticate(user=self.user_a)
+
+    def _lote(self, producto, cantidad, precio, dias):
+        vencimiento = None if dias is None else self.hoy + timedelta(days=dias)
+        return StockService.registrar_entrada(
+            producto, cantidad, precio, vencimiento, "Supplier"
+        )
+
+    def test_vectorized_simulation_matches_fefo_loop(self):
+        """Closed form equals selling day by day, earliest expiration first."""
+        import numpy as np
+
+        productos = np.array([0, 0, 0, 1, 1, 2, 2, 2, 2])
+        cantidades = np.array([5.0, 4.0, 20.0, 7.0, 9.0, 3.0, 1.0, 6.0, 100.0])
+        dias = np.array([2.0, 3.0, 12.0, 0.0, np.inf, 1.0, 1.0, 4.0, np.inf])
+        demanda = np.array([1.5, 3.0, 0.0])
+
+        vendido = ExpirationRiskService.simular(productos, cantidades, dias, demanda)
+
+        esperado = []
+        for producto in range(3):
+            lotes = [i for i in range(len(productos)) if productos[i] == producto]
+            tiempo = 0.0
+            for i in lotes:
+                # Sell from batch i from ``tiempo`` until it runs out or expires
+                if np.isinf(dias[i]):
+                    disponible = np.inf
+                else:
+                    disponible = max(dias[i] - tiempo, 0.0) * demanda[producto]
+                venta = min(cantidades[i], disponible)
+                esperado.append(venta)
+                if demanda[producto]:
+                    tiempo += venta / demanda[producto]
+        np.testing.assert_allclose(vendido, esperado)
+
+    def test_forecast_flags_units_left_at_expiration(self):
+        """
+        At 2 a day: the expired batch is lost, the 5-day batch sells out,
+        the 10-day batch sells 12 of 30 and the undated batch is never
+        at risk.
+        """
+        self.assertEqual(ExpirationRiskService.pronosticar(company_ids=[self.company_a.id]), 2)
+
+        riesgos = {r.batch_id: r for r in BatchExpirationRisk.objects.all()}
+        self.assertEqual(set(riesgos), {self.vencido.id, self.lejano.id})
+        self.assertEqual(riesgos[self.vencido.id].at_risk_quantity, 3)
+        self.assertEqual(riesgos[self.lejano.id].expected_sold, 12)
+        self.assertEqual(riesgos[self.lejano.id].at_risk_quantity, 18)
+        self.assertEqual(riesgos[self.lejano.id].at_risk_value, Decimal("45.00"))
+        self.assertAlmostEqual(riesgos[self.lejano.id].daily_demand, 2.0)
+
+    def test_rerun_replaces_rows(self):
+        call_command("pronosticar_vencimientos", stdout=StringIO())
+        call_command("pronosticar_vencimientos", stdout=StringIO())
+        self.assertEqual(BatchExpirationRisk.objects.filter(company=self.company_a).count(), 2)
+        self.assertEqual(BatchExpirationRisk.objects.filter(company=self.company_b).count(), 1)
+
+        # Emptied batches drop out on the next run
+        StockService.ajustar_stock(self.vencido, 0)
+        StockService.ajustar_stock(self.lejano, 0)
+        call_command("pronosticar_vencimientos", "--company", str(self.company_a.id), stdout=StringIO())
+        self.assertFalse(BatchExpirationRisk.objects.filter(company=self.company_a).exists())
+        self.assertEqual(BatchExpirationRisk.objects.filter(company=self.company_b).count(), 1)
+
+    def test_query_count_independent_of_batches(self):
+        def preparar(n):
+            for i in range(n):
+                self._lote(self.product_a, 5, "1.00", i)
+            return ExpirationRiskService.pronosticar
+        self.assertQueryBudget(preparar)
+
+    def test_report_is_company_scoped_and_paginated(self):
+        call_command("pronosticar_vencimientos", stdout=StringIO())
+
+        response = self.client.get("/api/reports/expiration-risk/", {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([fila["batch"] for fila in response.data], [self.vencido.id])
+        self.assertEqual(response.data[0]["at_risk_value"], "3.00")
+
+        response = self.client.get(
+            "/api/reports/expiration-risk/", {"limit": 1, "cursor": response["X-Next-Cursor"]}
+        )
+        self.assertEqual([fila["batch"] for fila in response.data], [self.lejano.id])
+        self.assertNotIn("X-Next-Cursor", response)
+
+        response = self.client.get(
+            "/api/reports/expiration-risk/", {"product_id": self.product_b.id}
+        )
+        self.assertEqual(response.data, [])
+
+
+class ExplainMixin:
+    """
+    Run EXPLAIN on every SELECT issued by a block and fail on full scans
+    of the tenant tables.
+
+    SQLite: any ``SCAN <table>`` line not walking an index, subquery
+    aliases (``U0``) resolved to their table. PostgreSQL: any ``Seq Scan`` node
+    with ``enable_seqscan`` off, so only queries with no usable index hit.
+    """
+
+    TABLAS = {
+        "inventario_category",
+        "inventario_product",
+        "inventario_batch",
+        "inventario_movement",
+        "inventario_stockreservation",
+        "inventario_outboxevent",
+        "inventario_productstocksnapshot",
+    }
+
+    def _escaneos(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+                pendientes, escaneos = [cursor.fetchone()[0][0]["Plan"]], []
+                while pendientes:
+                    nodo = pendientes.pop()
+                    if nodo["Node Type"] == "Seq Scan" and nodo["Relation Name"] in self.TABLAS:
+                        escaneos.append(nodo["Relation Name"])
+                    pendientes.extend(nodo.get("Plans", []))
+                return escaneos
+
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            # Subquery tables are aliased (``"inventario_product" U0``) and
+            # the plan names the alias
+            alias = dict(
+                (nombre, tabla) for tabla, nombre in re.findall(r'"(\w+)" ([A-Z]\d+)\b', sql)
+            )
+            return [
+                fila[-1] for fila in cursor.fetchall()
+                if fila[-1].startswith("SCAN ")
+                and alias.get(fila[-1].split()[1], fila[-1].split()[1]) in self.TABLAS
+                and " USING COVERING INDEX " not in fila[-1]
+                and " USING INDEX " not in fila[-1]
+            ]
+
+    def assertIndexedQueries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        selects = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertTrue(selects)
+        problemas = {sql: self._escaneos(sql) for sql in selects}
+        problemas = {sql: escaneos for sql, escaneos in problemas.items() if escaneos}
+        self.assertFalse(
+            problemas,
+            "Full table scans:\n" + "\n".join(f"{e}: {sql}" for sql, e in problemas.items())
+        )
+
+
+class QueryPlanTests(ExplainMixin, MultiTenantTestBase):
+    """Hot tenant queries must be answered from an index."""
+
+    def setUp(self):
+        super().setUp()
+        hoy = timezone.localdate()
+        productos = Product.objects.bulk_create([
+            Product(
+                name=f"Plan {i}", slug=f"plan-{i}", supplier="Supplier A",
+                category=self.category_a, company=self.company_b if i % 2 else self.company_a
+            )
+            for i in range(200)
+        ])
+        lotes = Batch.objects.bulk_create([
+            Batch(
+                product=productos[i % 200], company_id=productos[i % 200].company_id,
+                code=f"PLAN-{i}", quantity_received=5,
+                quantity_available=5 if i % 25 == 0 else 0, purchase_price="1.00",
+                supplier="Supplier A", expiration_date=hoy + timedelta(days=i % 400 - 10)
+            )
+            for i in range(2000)
+        ])
+        Movement.objects.bulk_create([
+            Movement(
+                batch=lotes[i % 2000], company_id=lotes[i % 2000].company_id,
+                movement_type="IN", quantity=5, stock_delta=5
+            )
+            for i in range(4000)
+        ])
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                company=self.company_a, product=productos[0], quantity=1,
+                status=StockReservation.ACTIVE if i % 50 == 0 else StockReservation.CONSUMED,
+                expires_at=timezone.now() + timedelta(minutes=i % 30 - 15)
+            )
+            for i in range(1000)
+        ])
+        self.producto = productos[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.client.force_authenticate(user=self.user_a)
+
+    def test_catalog_lists(self):
+        """Category and product lists use the (company, id) indexes."""
+        def listar():
+            for url in (
+                "/api/categories/",
+                "/api/products/",
+                "/api/products/?include=stock",
+                "/api/products/search/?q=plan",
+            ):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertIndexedQueries(listar)
+
+    def test_batch_and_movement_lists(self):
+        """Batch and movement lists, filters and exports filter on company_id."""
+        def listar():
+            for url in (
+                "/api/batches/",
+                "/api/movements/",
+                "/api/movements/?movement_type=OUT",
+                "/api/movements/export/?date_from=2026-01-01&movement_type=IN",
+                "/api/batches/export/?in_stock=true",
+            ):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+        self.assertIndexedQueries(listar)
+
+    def test_fefo_dispatch(self):
+        """A sale reads the product's in-stock batches from an index."""
+        self.assertIndexedQueries(lambda: StockService.registrar_salida(self.producto, 1))
+
+    def test_subquery_scans_are_caught(self):
+        """A scan of an aliased subquery table (``SCAN U0``) still fails."""
+        def buscar():
+            list(Product.objects.filter(
+                id__in=Batch.objects.filter(supplier="Nadie").values("product_id")
+            ))
+        with self.assertRaises(AssertionError):
+            self.assertIndexedQueries(buscar)
+
+    def test_sweepers_and_as_of(self):
+        """Expiry and reservation sweepers and as-of stock avoid full scans."""
+        self.assertIndexedQueries(lambda: (
+            StockService.vencer_lotes(),
+            ReservationService.liberar_vencidas(),
+            SnapshotService.stock_a_fecha([self.producto.id], timezone.localdate()),
+        ))
@@ -1,9 +1,26 @@
 from django.urls import path
 from inventario.views.category_view import CategoryAPIView
-from inventario.views.product_view import ProductAPIView
+from inventario.views.product_view import ProductAPIView, ProductSearchView
 from inventario.views.batch_view import BatchAPIView
 from inventario.views.movement_view import MovementAPIView
-from inventario.views.stock_view import StockInView, StockOutView
+from inventario.views.event_view import OutboxEventAPIView
+from inventario.views.dashboard_view import DashboardSummaryView
+from inventario.views.cache_view import CacheStatsView
+from inventario.views.export_view import BatchExportView, MovementExportView
+from inventario.views.report_view import (
+    ExpirationRiskReportView,
+    MovementReportView,
+    ReorderReportView,
+    ValuationReportView,
+)
+from inventario.views.reservation_view import ReservationAPIView, ReservationConfirmView
+from inventario.views.stock_view import (
+    StockInView,
+    StockOutView,
+    StockBulkInView,
+    StockOrderOutView,
+    StockAsOfView,
+)
 
 urlpatterns = [
     # Categories
@@ -13,14 +30,45 @@ urlpatterns = [
     # Products
     path("products/", ProductAPIView.as_view(), name="product-list"),
     path("products/<int:pk>/", ProductAPIView.as_view(), name="product-detail"),
+    path("products/search/", ProductSearchView.as_view(), name="product-search"),
 
     # Batches
     path("batches/", BatchAPIView.as_view(), name="batch-list"),
     path("batches/<int:pk>/", BatchAPIView.as_view(), name="batch-detail"),
+    path("batches/export/", BatchExportView.as_view(), name="batch-export"),
 
     # Movements
     path("movements/", MovementAPIView.as_view(), name="movement-list"),
     path("movements/<int:pk>/", MovementAPIView.as_view(), name="movement-detail"),
+    path("movements/export/", MovementExportView.as_view(), name="movement-export"),
+
+    # Catalog cache
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+
+    # Movement change feed
+    path("events/", OutboxEventAPIView.as_view(), name="event-list"),
+
+    # Dashboard
+    path("dashboard/summary/", DashboardSummaryView.as_view(), name="dashboard-summary"),
+
+    # Reports
+    path("reports/valuation/", ValuationReportView.as_view(), name="report-valuation"),
+    path("reports/movements/", MovementReportView.as_view(), name="report-movements"),
+    path("reports/reorder/", ReorderReportView.as_view(), name="report-reorder"),
+    path(
+        "reports/expiration-risk/",
+        ExpirationRiskReportView.as_view(),
+        name="report-expiration-risk",
+    ),
+
+    # Stock reservations
+    path("reservations/", ReservationAPIView.as_view(), name="reservation-list"),
+    path("reservations/<int:pk>/", ReservationAPIView.as_view(), name="reservation-detail"),
+    path(
+        "reservations/<int:pk>/confirm/",
+        ReservationConfirmView.as_view(),
+        name="reservation-confirm",
+    ),
 
     # Stock operations (legacy compatibility)
     path(
@@ -33,4 +81,7 @@ urlpatterns = [
         StockOutView.as_view(),
         name="stock-out",
     ),
+    path("stock/in/bulk/", StockBulkInView.as_view(), name="stock-in-bulk"),
+    path("stock/out/order/", StockOrderOutView.as_view(), name="stock-out-order"),
+    path("stock/as-of/", StockAsOfView.as_view(), name="stock-as-of"),
 ]
@@ -6,17 +6,37 @@ Secure multi-tenant API views with company isolation.
 
 from inventario.views.base_views import BaseCompanyAPIView
 from inventario.views.category_view import CategoryAPIView
-from inventario.views.product_view import ProductAPIView
+from inventario.views.product_view import ProductAPIView, ProductSearchView
 from inventario.views.batch_view import BatchAPIView
 from inventario.views.movement_view import MovementAPIView
-from inventario.views.stock_view import StockInView, StockOutView
+from inventario.views.event_view import OutboxEventAPIView
+from inventario.views.cache_view import CacheStatsView
+from inventario.views.export_view import BatchExportView, MovementExportView
+from inventario.views.reservation_view import ReservationAPIView, ReservationConfirmView
+from inventario.views.stock_view import (
+    StockInView,
+    StockOutView,
+    StockBulkInView,
+    StockOrderOutView,
+    StockAsOfView,
+)
 
 __all__ = [
     'BaseCompanyAPIView',
     'CategoryAPIView',
     'ProductAPIView',
+    'ProductSearchView',
     'BatchAPIView',
     'MovementAPIView',
+    'OutboxEventAPIView',
+    'CacheStatsView',
+    'MovementExportView',
+    'BatchExportView',
+    'ReservationAPIView',
+    'ReservationConfirmView',
     'StockInView',
     'StockOutView',
+    'StockBulkInView',
+    'StockOrderOutView',
+    'StockAsOfView',
 ]
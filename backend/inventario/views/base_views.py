@@ -3,10 +3,74 @@ Base API views for multi-tenant security.
 All views must enforce company isolation.
 """
 
+from functools import wraps
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+
+from inventario.services.cache_service import CatalogCache
+from inventario.services.version_service import VersionService
+
+
+def conditional_get(method):
+    """
+    Answer a GET with 304 Not Modified when the client's ETag is current.
+
+    The ETag comes from the view's ``version_resource`` counter, so a
+    matching poll costs the profile lookup and one indexed read, and never
+    touches the resource tables.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        if etag is None:
+            return method(self, request, *args, **kwargs)
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
+
+
+def cached_get(method):
+    """
+    Serve a GET from CatalogCache, keyed by company, ``version_resource``
+    version, URL kwargs and query parameters. Only 200 responses are stored.
+    
+    Stack it under @conditional_get so both share the version lookup.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        version = self.get_version()
+        if version is None:
+            return method(self, request, *args, **kwargs)
+
+        company_id = self.request.user.profile.company_id
+        params = {**request.query_params.dict(), **{f"kwarg:{k}": v for k, v in kwargs.items()}}
+
+        data = CatalogCache.obtener(company_id, self.version_resource, version, params)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            CatalogCache.guardar(
+                company_id, self.version_resource, version, params, response.data
+            )
+        return response
+
+    return wrapper
 
 
 class BaseCompanyAPIView(APIView):
@@ -21,11 +85,18 @@ class BaseCompanyAPIView(APIView):
     Subclasses must implement:
     - model: Django model class
     - serializer_class: DRF Serializer class
+    
+    Optional:
+    - version_resource: counter used for ETags on GETs decorated with
+      @conditional_get
+    - touches: counters bumped after every successful write
     """
     
     permission_classes = [IsAuthenticated]
     model = None
     serializer_class = None
+    version_resource = None
+    touches = ()
 
     def get_company(self):
         """
@@ -58,6 +129,51 @@ class BaseCompanyAPIView(APIView):
         company = self.get_company()
         return self.model.objects.filter(company=company)
 
+    def get_version(self):
+        """
+        Version of ``version_resource`` for user's company, read once per
+        request.
+        
+        Returns:
+            int: Version, or None if the view is not versioned or the user
+            has no company
+        """
+        if self.version_resource is None:
+            return None
+        if not hasattr(self, '_version'):
+            try:
+                company_id = self.request.user.profile.company_id
+            except AttributeError:
+                return None
+            self._version = VersionService.version(company_id, self.version_resource)
+        return self._version
+
+    def get_etag(self):
+        """
+        Weak ETag for the user's company version of ``version_resource``.
+        
+        Returns:
+            str: ETag, or None if the view is not versioned
+        """
+        version = self.get_version()
+        if version is None:
+            return None
+        company_id = self.request.user.profile.company_id
+        return f'W/"{company_id}-{self.version_resource}-{version}"'
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Bump the ``touches`` counters after a successful write, so cached
+        ETags of the affected lists stop matching.
+        """
+        if (
+            self.touches
+            and request.method not in SAFE_METHODS
+            and 200 <= response.status_code < 300
+        ):
+            VersionService.incrementar(self.get_company().id, *self.touches)
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def validate_company_ownership(self, obj):
         """
         Validate that object belongs to user's company.
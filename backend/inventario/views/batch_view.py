@@ -2,14 +2,18 @@
 Batch API Views with multi-tenant security.
 """
 
+from django.db import transaction
 from rest_framework.response import Response
 from rest_framework import status
 
 from inventario.models.batch import Batch
 from inventario.models.product import Product
+from inventario.pagination import KeysetPagination
 from inventario.serializers.batch_serializer import BatchCreateSerializer, BatchSerializer
-from inventario.views.base_views import BaseCompanyAPIView
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.views.base_views import BaseCompanyAPIView, conditional_get
 from inventario.services.stock_service import StockService
+from inventario.services.valuation_service import ValuationService
 
 
 class BatchResponseSerializer:
@@ -20,7 +24,7 @@ class BatchResponseSerializer:
         return {
             "id": batch.id,
             "code": batch.code,
-            "product": batch.product.id,
+            "product": batch.product_id,
             "quantity_received": batch.quantity_received,
             "quantity_available": batch.quantity_available,
             "purchase_price": str(batch.purchase_price),
@@ -38,9 +42,10 @@ class BatchAPIView(BaseCompanyAPIView):
     - Only lists/modifies batches for products in user's company
     - Product must belong to user's company
     - Uses StockService for safe batch creation
+    - GETs send an ETag and answer 304 Not Modified while nothing changed
     
     Endpoints:
-    - GET /batches/ → List batches for user's company products
+    - GET /batches/ → List batches for user's company products (keyset paginated)
     - POST /batches/ → Create batch for user's company product
     - GET /batches/{id}/ → Retrieve only if product belongs to user's company
     - DELETE /batches/{id}/ → Delete only if product belongs to user's company
@@ -48,7 +53,14 @@ class BatchAPIView(BaseCompanyAPIView):
     
     model = Batch
     serializer_class = BatchCreateSerializer
+    version_resource = CompanyResourceVersion.BATCHES
+    touches = (
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.PRODUCTS,
+        CompanyResourceVersion.MOVEMENTS,
+    )
 
+    @conditional_get
     def get(self, request, pk=None):
         """
         List batches or retrieve a specific batch.
@@ -56,18 +68,20 @@ class BatchAPIView(BaseCompanyAPIView):
         
         Query Parameters:
             - product_id: Filter by product ID (optional)
+            - cursor: Opaque cursor from the previous page's Link header
+            - limit: Page size (default 100, max 1000)
             
         Args:
             pk: Optional batch ID
             
         Returns:
-            Response: Batch data or list
+            Response: Batch data or one page of the list, oldest first
         """
         try:
             company = self.get_company()
             
             # Base queryset: only batches of products in user's company
-            base_queryset = Batch.objects.filter(product__company=company)
+            base_queryset = Batch.objects.filter(company=company)
             
             if pk is not None:
                 # Retrieve specific batch
@@ -84,11 +98,10 @@ class BatchAPIView(BaseCompanyAPIView):
             else:
                 queryset = base_queryset
 
-            if not queryset.exists():
-                return Response([], status=status.HTTP_200_OK)
-
-            data = [BatchResponseSerializer.serialize(batch) for batch in queryset]
-            return Response(data, status=status.HTTP_200_OK)
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, request)
+            data = [BatchResponseSerializer.serialize(batch) for batch in page]
+            return paginator.get_paginated_response(data)
 
         except Exception as exc:
             return self.handle_exception(exc)
@@ -189,7 +202,7 @@ class BatchAPIView(BaseCompanyAPIView):
         try:
             company = self.get_company()
             
-            batch = Batch.objects.filter(product__company=company).get(pk=pk)
+            batch = Batch.objects.filter(company=company).get(pk=pk)
             
             serializer = BatchCreateSerializer(data=request.data)
             if not serializer.is_valid():
@@ -218,6 +231,8 @@ class BatchAPIView(BaseCompanyAPIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
+            previous_product_id = batch.product_id
+            previous_category_id = batch.product.category_id
             batch.product = product
             batch.quantity_received = serializer.validated_data.get('quantity_received')
             batch.quantity_available = serializer.validated_data.get('quantity_available', batch.quantity_received)
@@ -227,7 +242,10 @@ class BatchAPIView(BaseCompanyAPIView):
             if 'expiration_date' in serializer.validated_data:
                 batch.expiration_date = serializer.validated_data.get('expiration_date')
             
-            batch.save()
+            with transaction.atomic():
+                batch.save()
+                StockService.reconstruir_stock({previous_product_id, product.id})
+                ValuationService.reconstruir({previous_category_id, product.category_id})
             
             return Response(
                 BatchResponseSerializer.serialize(batch),
@@ -255,8 +273,11 @@ class BatchAPIView(BaseCompanyAPIView):
         try:
             company = self.get_company()
             
-            batch = Batch.objects.filter(product__company=company).get(pk=pk)
-            batch.delete()
+            batch = Batch.objects.filter(company=company).select_related('product').get(pk=pk)
+            with transaction.atomic():
+                batch.delete()
+                StockService.reconstruir_stock([batch.product_id])
+                ValuationService.reconstruir([batch.product.category_id])
             
             return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -0,0 +1,35 @@
+"""
+Catalog cache statistics API View.
+"""
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from inventario.services.cache_service import CatalogCache
+from inventario.views.base_views import BaseCompanyAPIView
+
+
+class CacheStatsView(BaseCompanyAPIView):
+    """
+    Hit/miss counters of the catalog cache for user's company.
+    
+    Endpoint:
+    GET /cache/stats/
+    """
+
+    def get(self, request):
+        """
+        Report hits, misses and hit rate per cached resource.
+        
+        Returns:
+            Response: Counters per resource
+        """
+        try:
+            company = self.get_company()
+            return Response(
+                CatalogCache.estadisticas(company.id),
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
@@ -10,7 +10,9 @@ logger = logging.getLogger(__name__)
 
 from inventario.models.category import Category
 from inventario.serializers.category_serializer import CategorySerializer
-from inventario.views.base_views import BaseCompanyAPIView
+from inventario.serializers.values_serializer import CategoryValuesSerializer, pick_fields
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.views.base_views import BaseCompanyAPIView, cached_get, conditional_get
 
 
 class CategoryAPIView(BaseCompanyAPIView):
@@ -24,11 +26,22 @@ class CategoryAPIView(BaseCompanyAPIView):
     - PUT /categories/{id}/ → Update only if belongs to user's company
     - PATCH /categories/{id}/ → Partial update only if belongs to user's company
     - DELETE /categories/{id}/ → Delete only if belongs to user's company
+    
+    GETs send an ETag and answer 304 Not Modified while nothing changed.
     """
     
     model = Category
     serializer_class = CategorySerializer
-
+    version_resource = CompanyResourceVersion.CATEGORIES
+    touches = (
+        CompanyResourceVersion.CATEGORIES,
+        CompanyResourceVersion.PRODUCTS,
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.MOVEMENTS,
+    )
+
+    @conditional_get
+    @cached_get
     def get(self, request, pk=None):
         """
         List categories or retrieve a specific category.
@@ -36,6 +49,7 @@ class CategoryAPIView(BaseCompanyAPIView):
         Query Parameters:
             - name: Filter by name
             - slug: Filter by slug
+            - fields: Comma-separated fields to return (e.g. id,name)
             
         Args:
             pk: Optional category ID
@@ -44,11 +58,13 @@ class CategoryAPIView(BaseCompanyAPIView):
             Response: Category data or list
         """
         try:
+            fields = CategoryValuesSerializer.parse_fields(request.query_params.get('fields'))
+
             if pk is not None:
                 # Retrieve specific category
                 category = self.get_company_queryset().get(pk=pk)
                 serializer = self.serializer_class(category)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+                return Response(pick_fields(serializer.data, fields), status=status.HTTP_200_OK)
 
             # List with optional filters
             filters = {}
@@ -57,13 +73,12 @@ class CategoryAPIView(BaseCompanyAPIView):
                 if value is not None:
                     filters[field] = value
 
+            # Read-only fast path: only the requested columns, no instances
             queryset = self.get_company_queryset().filter(**filters)
-
-            if not queryset.exists():
-                return Response([], status=status.HTTP_200_OK)
-
-            serializer = self.serializer_class(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(
+                CategoryValuesSerializer.serialize(queryset, fields),
+                status=status.HTTP_200_OK
+            )
 
         except Exception as exc:
             return self.handle_exception(exc)
@@ -0,0 +1,39 @@
+"""
+Dashboard API Views with multi-tenant security.
+"""
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from inventario.services.metrics_service import MetricsService
+from inventario.views.base_views import BaseCompanyAPIView
+
+
+class DashboardSummaryView(BaseCompanyAPIView):
+    """
+    Dashboard KPIs of user's company in one request.
+    
+    Served from the company's CompanyMetrics row, which is recomputed from
+    the stock projections only after a write or once it gets older than
+    DASHBOARD_METRICS_MAX_AGE.
+    
+    Endpoint:
+    GET /dashboard/summary/
+    """
+
+    def get(self, request):
+        """
+        Report product, stock, expiry and movement KPIs.
+        
+        Returns:
+            Response: KPIs and the time they were computed
+        """
+        try:
+            company = self.get_company()
+            return Response(
+                MetricsService.serializar(MetricsService.resumen(company.id)),
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
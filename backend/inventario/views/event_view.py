@@ -0,0 +1,70 @@
+"""
+Movement change-feed API View with multi-tenant security.
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework import status
+
+from inventario.models.outbox import OutboxEvent
+from inventario.services.outbox_service import OutboxService
+from inventario.views.base_views import BaseCompanyAPIView
+
+
+class OutboxEventAPIView(BaseCompanyAPIView):
+    """
+    Read movement events of user's company after a cursor.
+    
+    Endpoint:
+    GET /events/?after={event_id}&limit={n}
+    
+    Consumers store `next_cursor` and pass it as `after` on the next call,
+    so each poll only returns new events. Events younger than
+    OutboxService.SETTLE_SECONDS are held back, like in the relay, so a
+    transaction that commits late with a lower id is not skipped.
+    """
+    
+    model = OutboxEvent
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request):
+        """
+        List events with id greater than `after`, oldest first.
+        
+        Query Parameters:
+            - after: Last event ID already processed (default 0)
+            - limit: Maximum events returned (default 100, max 1000)
+            
+        Returns:
+            Response: Events and the cursor for the next call
+        """
+        try:
+            try:
+                after = int(request.query_params.get('after', 0))
+                limit = int(request.query_params.get('limit', self.default_limit))
+            except ValueError:
+                return Response(
+                    {"detail": "after and limit must be integers"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            limit = max(1, min(limit, self.max_limit))
+
+            limite = timezone.now() - timedelta(seconds=OutboxService.SETTLE_SECONDS)
+            events = list(
+                self.get_company_queryset()
+                .filter(id__gt=after, created_at__lte=limite)
+                .order_by('id')[:limit]
+            )
+            return Response(
+                {
+                    "results": [OutboxService._serializar(event) for event in events],
+                    "next_cursor": events[-1].id if events else after,
+                },
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
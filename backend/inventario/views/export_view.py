@@ -0,0 +1,211 @@
+"""
+Streaming export API Views with multi-tenant security.
+"""
+
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework import status
+
+from inventario.models.batch import Batch
+from inventario.models.movement import Movement
+from inventario.views.base_views import BaseCompanyAPIView
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class BaseExportView(BaseCompanyAPIView):
+    """
+    Stream the ``model`` rows of user's company as CSV or NDJSON.
+
+    Rows are read with ``values_list().iterator(chunk_size)`` (a server-side
+    cursor on PostgreSQL) and written out as they arrive, so memory stays
+    flat whatever the size of the export.
+
+    Query Parameters:
+        - output: csv (default) or ndjson
+        - date_from: YYYY-MM-DD, inclusive (optional)
+        - date_to: YYYY-MM-DD, inclusive (optional)
+        - product_id: Filter by product ID (optional)
+    """
+
+    chunk_size = 2000
+    filename = None
+    date_field = None
+    product_field = None
+    columns = ()
+
+    def get_export_queryset(self, request, company):
+        """Rows of ``model`` for ``company``, narrowed by filter_export."""
+        return self.filter_export(request, self.model.objects.filter(company=company))
+
+    def filter_export(self, request, queryset):
+        """Apply view-specific query parameters; exports every row by default."""
+        return queryset
+
+    def _fecha(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{param} must be a date (YYYY-MM-DD)")
+
+    def filter_dates(self, request, queryset):
+        """Filter on a datetime range so the column index can be used."""
+        date_from = self._fecha(request, 'date_from')
+        date_to = self._fecha(request, 'date_to')
+        if date_from:
+            queryset = queryset.filter(**{
+                f"{self.date_field}__gte": timezone.make_aware(datetime.combine(date_from, time.min))
+            })
+        if date_to:
+            queryset = queryset.filter(**{
+                f"{self.date_field}__lt": timezone.make_aware(
+                    datetime.combine(date_to + timedelta(days=1), time.min)
+                )
+            })
+        return queryset
+
+    def _csv(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow([name for name, _ in self.columns])
+        for row in rows:
+            yield writer.writerow(row)
+
+    def _ndjson(self, rows):
+        names = [name for name, _ in self.columns]
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+    def get(self, request):
+        """
+        Stream the export.
+
+        Returns:
+            StreamingHttpResponse: CSV or NDJSON body, ordered by id
+        """
+        try:
+            company = self.get_company()
+
+            output = request.query_params.get('output', 'csv')
+            if output not in ('csv', 'ndjson'):
+                return Response(
+                    {"detail": "output must be csv or ndjson"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            queryset = self.filter_dates(request, self.get_export_queryset(request, company))
+
+            product_id = request.query_params.get('product_id')
+            if product_id:
+                queryset = queryset.filter(**{self.product_field: product_id})
+
+            rows = (
+                queryset
+                .order_by('id')
+                .values_list(*[field for _, field in self.columns])
+                .iterator(chunk_size=self.chunk_size)
+            )
+
+            if output == 'csv':
+                response = StreamingHttpResponse(self._csv(rows), content_type='text/csv')
+            else:
+                response = StreamingHttpResponse(
+                    self._ndjson(rows), content_type='application/x-ndjson'
+                )
+            response['Content-Disposition'] = (
+                f'attachment; filename="{self.filename}.{output}"'
+            )
+            return response
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+
+class MovementExportView(BaseExportView):
+    """
+    Export the movement ledger of user's company.
+
+    Endpoint:
+    GET /movements/export/?output=csv&date_from=2026-01-01&date_to=2026-01-31
+
+    Query Parameters:
+        - movement_type: Filter by type (IN, OUT, ADJUST, EXPIRED)
+        - batch_id: Filter by batch ID (optional)
+    """
+
+    model = Movement
+    filename = "movements"
+    date_field = "created_at"
+    product_field = "batch__product_id"
+    columns = (
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("movement_type", "movement_type"),
+        ("quantity", "quantity"),
+        ("stock_delta", "stock_delta"),
+        ("batch", "batch_id"),
+        ("batch_code", "batch__code"),
+        ("product", "batch__product_id"),
+        ("product_name", "batch__product__name"),
+        ("reason", "note"),
+    )
+
+    def filter_export(self, request, queryset):
+        movement_type = request.query_params.get('movement_type')
+        if movement_type:
+            queryset = queryset.filter(movement_type=movement_type)
+
+        batch_id = request.query_params.get('batch_id')
+        if batch_id:
+            queryset = queryset.filter(batch_id=batch_id)
+
+        return queryset
+
+
+class BatchExportView(BaseExportView):
+    """
+    Export the batches of user's company.
+
+    Endpoint:
+    GET /batches/export/?output=ndjson&in_stock=true
+
+    Query Parameters:
+        - in_stock: true to export only batches with units available
+        - date_from / date_to: Filter on received_at
+    """
+
+    model = Batch
+    filename = "batches"
+    date_field = "received_at"
+    product_field = "product_id"
+    columns = (
+        ("id", "id"),
+        ("code", "code"),
+        ("product", "product_id"),
+        ("product_name", "product__name"),
+        ("quantity_received", "quantity_received"),
+        ("quantity_available", "quantity_available"),
+        ("purchase_price", "purchase_price"),
+        ("expiration_date", "expiration_date"),
+        ("received_at", "received_at"),
+        ("supplier", "supplier"),
+    )
+
+    def filter_export(self, request, queryset):
+        if request.query_params.get('in_stock') == 'true':
+            queryset = queryset.filter(quantity_available__gt=0)
+
+        return queryset
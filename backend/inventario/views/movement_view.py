@@ -2,14 +2,19 @@
 Movement API Views with multi-tenant security.
 """
 
+from django.db import transaction
 from rest_framework.response import Response
 from rest_framework import status
 
 from inventario.models.movement import Movement
 from inventario.models.batch import Batch
+from inventario.pagination import KeysetPagination
 from inventario.serializers.movement_serializer import MovementSerializer, MovementCreateSerializer
-from inventario.views.base_views import BaseCompanyAPIView
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.views.base_views import BaseCompanyAPIView, conditional_get
+from inventario.services.rollup_service import RollupService
 from inventario.services.stock_service import StockService
+from inventario.services.valuation_service import ValuationService
 
 
 class MovementAPIView(BaseCompanyAPIView):
@@ -20,9 +25,10 @@ class MovementAPIView(BaseCompanyAPIView):
     - Only lists/modifies movements for batches in user's company
     - Batch must belong to a product in user's company
     - Uses StockService for safe movement creation
+    - GETs send an ETag and answer 304 Not Modified while nothing changed
     
     Endpoints:
-    - GET /movements/ → List movements for user's company batches
+    - GET /movements/ → List movements for user's company batches (keyset paginated)
     - POST /movements/ → Create movement (stock in/out/adjust)
     - GET /movements/{id}/ → Retrieve only if batch belongs to user's company
     
@@ -35,7 +41,14 @@ class MovementAPIView(BaseCompanyAPIView):
     
     model = Movement
     serializer_class = MovementSerializer
+    version_resource = CompanyResourceVersion.MOVEMENTS
+    touches = (
+        CompanyResourceVersion.MOVEMENTS,
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.PRODUCTS,
+    )
 
+    @conditional_get
     def get(self, request, pk=None):
         """
         List movements or retrieve a specific movement.
@@ -44,18 +57,23 @@ class MovementAPIView(BaseCompanyAPIView):
         Query Parameters:
             - batch_id: Filter by batch ID (optional)
             - movement_type: Filter by type (IN, OUT, ADJUST, EXPIRED)
+            - cursor: Opaque cursor from the previous page's Link header
+            - limit: Page size (default 100, max 1000)
             
         Args:
             pk: Optional movement ID
             
         Returns:
-            Response: Movement data or list
+            Response: Movement data or one page of the list, oldest first
         """
         try:
             company = self.get_company()
             
-            # Base queryset: only movements of batches in user's company
-            base_queryset = Movement.objects.filter(batch__product__company=company)
+            # Base queryset: only movements of batches in user's company.
+            # The serializer reads batch code and product name on every row.
+            base_queryset = Movement.objects.filter(
+                company=company
+            ).select_related('batch__product')
             
             if pk is not None:
                 # Retrieve specific movement
@@ -76,11 +94,10 @@ class MovementAPIView(BaseCompanyAPIView):
 
             queryset = base_queryset.filter(**filters)
 
-            if not queryset.exists():
-                return Response([], status=status.HTTP_200_OK)
-
-            serializer = self.serializer_class(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, request)
+            serializer = self.serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
 
         except Exception as exc:
             return self.handle_exception(exc)
@@ -124,7 +141,7 @@ class MovementAPIView(BaseCompanyAPIView):
                 try:
                     batch = Batch.objects.get(
                         code=batch_code,
-                        product__company=company
+                        company=company
                     )
                 except Batch.DoesNotExist:
                     return Response(
@@ -137,7 +154,7 @@ class MovementAPIView(BaseCompanyAPIView):
                 try:
                     batch = Batch.objects.get(
                         id=batch_id,
-                        product__company=company
+                        company=company
                     )
                 except Batch.DoesNotExist:
                     return Response(
@@ -174,8 +191,7 @@ class MovementAPIView(BaseCompanyAPIView):
                     StockService.marcar_vencido(batch)
                 elif movement_type == 'IN':
                     # Direct IN movements are rare (usually via batch creation)
-                    from inventario.models.movement import Movement
-                    movement = Movement.objects.create(
+                    StockService.registrar_movimiento(
                         batch=batch,
                         movement_type='IN',
                         quantity=int(quantity),
@@ -214,10 +230,13 @@ class MovementAPIView(BaseCompanyAPIView):
             company = self.get_company()
             
             movement = Movement.objects.filter(
-                batch__product__company=company
-            ).get(pk=pk)
+                company=company
+            ).select_related('batch__product').get(pk=pk)
             
-            movement.delete()
+            with transaction.atomic():
+                movement.delete()
+                RollupService.descontar_movimiento(movement)
+                ValuationService.reconstruir([movement.batch.product.category_id])
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         except Movement.DoesNotExist:
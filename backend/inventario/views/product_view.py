@@ -2,6 +2,7 @@
 Product API Views with multi-tenant security.
 """
 
+from django.db import transaction
 from rest_framework.response import Response
 from rest_framework import status
 import logging
@@ -11,7 +12,15 @@ logger = logging.getLogger(__name__)
 from inventario.models.product import Product
 from inventario.models.category import Category
 from inventario.serializers.product_serializer import ProductSerializer
-from inventario.views.base_views import BaseCompanyAPIView
+from inventario.serializers.values_serializer import (
+    ProductStockValuesSerializer,
+    ProductValuesSerializer,
+    pick_fields,
+)
+from inventario.services.search_service import ProductSearchService
+from inventario.services.valuation_service import ValuationService
+from inventario.models.resource_version import CompanyResourceVersion
+from inventario.views.base_views import BaseCompanyAPIView, cached_get, conditional_get
 
 
 class ProductAPIView(BaseCompanyAPIView):
@@ -22,6 +31,7 @@ class ProductAPIView(BaseCompanyAPIView):
     - Only lists/modifies products belonging to user's company
     - Category must belong to same company as product
     - Company is automatically assigned on creation
+    - GETs send an ETag and answer 304 Not Modified while nothing changed
     
     Endpoints:
     - GET /products/ → List user's company products
@@ -34,7 +44,43 @@ class ProductAPIView(BaseCompanyAPIView):
     
     model = Product
     serializer_class = ProductSerializer
+    version_resource = CompanyResourceVersion.PRODUCTS
+    touches = (
+        CompanyResourceVersion.PRODUCTS,
+        CompanyResourceVersion.BATCHES,
+        CompanyResourceVersion.MOVEMENTS,
+    )
 
+    STOCK_FIELDS = ("stock_available", "nearest_expiration", "active_batches")
+
+    def get_values_serializer(self, request):
+        """
+        Pick the list serializer from the ``include`` query parameter.
+
+        Raises:
+            ValueError: If ``include`` names something other than stock
+        """
+        include = {
+            name.strip()
+            for name in request.query_params.get('include', '').split(',')
+            if name.strip()
+        }
+        if include - {'stock'}:
+            raise ValueError(
+                f"Unknown include: {', '.join(sorted(include - {'stock'}))}. Available: stock"
+            )
+        return ProductStockValuesSerializer if include else ProductValuesSerializer
+
+    def _guardar(self, serializer, product):
+        """Save an update; moving a product re-values both categories."""
+        previous_category_id = product.category_id
+        with transaction.atomic():
+            serializer.save()
+            if product.category_id != previous_category_id:
+                ValuationService.reconstruir({previous_category_id, product.category_id})
+
+    @conditional_get
+    @cached_get
     def get(self, request, pk=None):
         """
         List products or retrieve a specific product.
@@ -43,6 +89,9 @@ class ProductAPIView(BaseCompanyAPIView):
             - name: Filter by name
             - slug: Filter by slug
             - supplier: Filter by supplier
+            - fields: Comma-separated fields to return (e.g. id,name,stock)
+            - include: stock → add stock_available, nearest_expiration and
+              active_batches, aggregated from in-stock batches
             
         Args:
             pk: Optional product ID
@@ -51,11 +100,19 @@ class ProductAPIView(BaseCompanyAPIView):
             Response: Product data or list
         """
         try:
+            values_serializer = self.get_values_serializer(request)
+            fields = values_serializer.parse_fields(request.query_params.get('fields'))
+
             if pk is not None:
                 # Retrieve specific product
-                product = self.get_company_queryset().get(pk=pk)
-                serializer = self.serializer_class(product)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+                product = self.get_company_queryset().select_related('stock').get(pk=pk)
+                data = self.serializer_class(product).data
+                if values_serializer is ProductStockValuesSerializer:
+                    data.update(values_serializer.serialize(
+                        self.get_company_queryset().filter(pk=pk),
+                        list(self.STOCK_FIELDS)
+                    )[0])
+                return Response(pick_fields(data, fields), status=status.HTTP_200_OK)
 
             # List with optional filters
             filters = {}
@@ -64,13 +121,12 @@ class ProductAPIView(BaseCompanyAPIView):
                 if value is not None:
                     filters[field] = value
 
+            # Read-only fast path: only the requested columns, no instances
             queryset = self.get_company_queryset().filter(**filters)
-
-            if not queryset.exists():
-                return Response([], status=status.HTTP_200_OK)
-
-            serializer = self.serializer_class(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(
+                values_serializer.serialize(queryset, fields),
+                status=status.HTTP_200_OK
+            )
 
         except Exception as exc:
             return self.handle_exception(exc)
@@ -184,7 +240,7 @@ class ProductAPIView(BaseCompanyAPIView):
                 context={'company': product.company}
             )
             if serializer.is_valid():
-                serializer.save()
+                self._guardar(serializer, product)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             
             return Response(
@@ -232,7 +288,7 @@ class ProductAPIView(BaseCompanyAPIView):
                 context={'company': product.company}
             )
             if serializer.is_valid():
-                serializer.save()
+                self._guardar(serializer, product)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             
             return Response(
@@ -257,8 +313,75 @@ class ProductAPIView(BaseCompanyAPIView):
             product = self.get_company_queryset().get(pk=pk)
             self.validate_company_ownership(product)
             
-            product.delete()
+            with transaction.atomic():
+                product.delete()
+                ValuationService.reconstruir([product.category_id])
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         except Exception as exc:
             return self.handle_exception(exc)
+
+
+class ProductSearchView(BaseCompanyAPIView):
+    """
+    Ranked search over user's company products.
+    
+    Matches by prefix on name, slug, supplier and batch code, plus fuzzy
+    (trigram) matches on PostgreSQL. Best matches come first.
+    
+    Endpoint:
+    GET /products/search/?q=para&limit=20
+    
+    Query Parameters:
+        - q: Search text (required)
+        - limit: Maximum results (default 20, max 50)
+        - fields: Comma-separated fields to return (default id,name,slug,supplier,stock)
+    """
+    
+    model = Product
+    version_resource = CompanyResourceVersion.PRODUCTS
+    default_limit = 20
+    max_limit = 50
+    default_fields = "id,name,slug,supplier,stock"
+
+    @conditional_get
+    @cached_get
+    def get(self, request):
+        """
+        Search products.
+        
+        Returns:
+            Response: Matching products, best first
+        """
+        try:
+            company = self.get_company()
+
+            q = request.query_params.get('q', '').strip()
+            if not q:
+                return Response(
+                    {"detail": "q is required"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                limit = int(request.query_params.get('limit', self.default_limit))
+            except ValueError:
+                return Response(
+                    {"detail": "limit must be an integer"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            limit = max(1, min(limit, self.max_limit))
+
+            fields = ProductValuesSerializer.parse_fields(
+                request.query_params.get('fields', self.default_fields)
+            )
+            return Response(
+                ProductValuesSerializer.serialize(
+                    ProductSearchService.buscar(company, q, limit),
+                    fields
+                ),
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
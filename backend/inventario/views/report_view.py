@@ -0,0 +1,241 @@
+"""
+Report API Views with multi-tenant security.
+"""
+
+from datetime import date, timedelta
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework import status
+
+from inventario.models.expiration_risk import BatchExpirationRisk
+from inventario.models.product import Product
+from inventario.pagination import KeysetPagination
+from inventario.services.rollup_service import RollupService
+from inventario.services.valuation_service import ValuationService
+from inventario.views.base_views import BaseCompanyAPIView
+
+
+class ValuationReportView(BaseCompanyAPIView):
+    """
+    Inventory valuation of user's company per category.
+    
+    Value is the cost of the units on hand, each batch valued at its
+    purchase price; cogs is the cost of the units sold, taken from the
+    batches (cost layers) each sale consumed. Read from the
+    CategoryValuation aggregate, so the cost does not depend on the number
+    of batches or movements.
+    
+    Endpoint:
+    GET /reports/valuation/
+    """
+
+    def get(self, request):
+        """
+        Report quantity, value and cost of goods sold per category.
+        
+        Returns:
+            Response: ``categories`` list and ``totals``
+        """
+        try:
+            company = self.get_company()
+            return Response(
+                ValuationService.reporte(company),
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+
+class MovementReportView(BaseCompanyAPIView):
+    """
+    Movement totals of user's company over time.
+    
+    Read from the DailyMovementRollup table only, never from the raw
+    movement rows.
+    
+    Endpoint:
+    GET /reports/movements/?date_from=2026-01-01&date_to=2026-03-31&interval=month
+    
+    Query Parameters:
+        - date_from: YYYY-MM-DD, inclusive (default 30 days before date_to)
+        - date_to: YYYY-MM-DD, inclusive (default today)
+        - interval: day (default), week or month
+        - product_id: Filter by product ID (optional)
+        - movement_type: Filter by type (IN, OUT, ADJUST, EXPIRED)
+    """
+
+    default_days = 30
+
+    def _fecha(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{param} must be a date (YYYY-MM-DD)")
+
+    def get(self, request):
+        """
+        Report quantity, net stock change and movement count per period
+        and movement type.
+        
+        Returns:
+            Response: List ordered by period and movement type
+        """
+        try:
+            company = self.get_company()
+
+            date_to = self._fecha(request, 'date_to') or timezone.localdate()
+            date_from = (
+                self._fecha(request, 'date_from')
+                or date_to - timedelta(days=self.default_days - 1)
+            )
+            if date_from > date_to:
+                raise ValueError("date_from must not be after date_to")
+
+            return Response(
+                RollupService.serie(
+                    company,
+                    date_from,
+                    date_to,
+                    intervalo=request.query_params.get('interval', 'day'),
+                    product_id=request.query_params.get('product_id'),
+                    movement_type=request.query_params.get('movement_type'),
+                ),
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+
+class ReorderReportView(BaseCompanyAPIView):
+    """
+    Products of user's company at or below their reorder point.
+    
+    Available stock (on hand minus active reservations) is compared with
+    the reorder point stored by ``calcular_reorden``; products that have
+    not sold in the demand window have no reorder point and never show up.
+    
+    Endpoint:
+    GET /reports/reorder/
+    
+    Query Parameters:
+        - cursor: Opaque cursor from the previous page (optional)
+        - limit: Page size (default PAGE_SIZE, max 1000)
+    """
+
+    def get(self, request):
+        """
+        List products to reorder, by ascending product id.
+        
+        Returns:
+            Response: Paginated list with stock, reorder point and the
+            shortfall against it
+        """
+        try:
+            company = self.get_company()
+
+            queryset = (
+                Product.objects
+                .filter(company=company, reorder__reorder_point__gt=0)
+                .select_related('reorder')
+                .only('id', 'name', 'reorder')
+                .annotate(
+                    on_hand=Coalesce(F('stock__on_hand'), 0),
+                    available=Coalesce(F('stock__on_hand'), 0) - Coalesce(F('stock__reserved'), 0),
+                )
+                .filter(available__lte=F('reorder__reorder_point'))
+            )
+
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, request)
+            return paginator.get_paginated_response([
+                {
+                    "product": product.id,
+                    "name": product.name,
+                    "on_hand": product.on_hand,
+                    "available": product.available,
+                    "reorder_point": product.reorder.reorder_point,
+                    "safety_stock": product.reorder.safety_stock,
+                    "avg_daily_demand": round(product.reorder.avg_daily_demand, 3),
+                    "lead_time_days": product.reorder.lead_time_days,
+                    "shortfall": product.reorder.reorder_point - product.available,
+                    "computed_at": product.reorder.computed_at,
+                }
+                for product in page
+            ])
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+
+class ExpirationRiskReportView(BaseCompanyAPIView):
+    """
+    Batches of user's company forecast to expire with unsold units.
+    
+    Read from the table written nightly by ``pronosticar_vencimientos``,
+    which depletes each product's batches in FEFO order at its recent
+    daily demand; batches expected to sell out before expiring are not
+    listed.
+    
+    Endpoint:
+    GET /reports/expiration-risk/
+    
+    Query Parameters:
+        - product_id: Filter by product ID (optional)
+        - cursor: Opaque cursor from the previous page (optional)
+        - limit: Page size (default PAGE_SIZE, max 1000)
+    """
+
+    def get(self, request):
+        """
+        List batches with units at risk, by ascending row id.
+        
+        Returns:
+            Response: Paginated list with the units expected to sell and
+            the units and cost at risk per batch
+        """
+        try:
+            company = self.get_company()
+
+            queryset = (
+                BatchExpirationRisk.objects
+                .filter(company=company)
+                .select_related('batch')
+                .only(
+                    'id', 'product_id', 'expiration_date', 'quantity_available',
+                    'expected_sold', 'at_risk_quantity', 'at_risk_value',
+                    'daily_demand', 'computed_at', 'batch__id', 'batch__code'
+                )
+            )
+
+            product_id = request.query_params.get('product_id')
+            if product_id:
+                queryset = queryset.filter(product_id=product_id)
+
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, request)
+            return paginator.get_paginated_response([
+                {
+                    "batch": riesgo.batch.id,
+                    "batch_code": riesgo.batch.code,
+                    "product": riesgo.product_id,
+                    "expiration_date": riesgo.expiration_date,
+                    "quantity_available": riesgo.quantity_available,
+                    "expected_sold": riesgo.expected_sold,
+                    "at_risk_quantity": riesgo.at_risk_quantity,
+                    "at_risk_value": f"{riesgo.at_risk_value:.2f}",
+                    "daily_demand": round(riesgo.daily_demand, 3),
+                    "computed_at": riesgo.computed_at,
+                }
+                for riesgo in page
+            ])
+
+        except Exception as exc:
+            return self.handle_exception(exc)
@@ -0,0 +1,191 @@
+"""
+Stock reservation API Views with multi-tenant security.
+"""
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from inventario.models.product import Product
+from inventario.models.reservation import StockReservation
+from inventario.serializers.reservation_serializer import (
+    StockReservationCreateSerializer,
+    StockReservationSerializer,
+)
+from inventario.services.reservation_service import ReservationService
+from inventario.views.base_views import BaseCompanyAPIView
+
+
+class ReservationAPIView(BaseCompanyAPIView):
+    """
+    Secure Stock Reservation API View with multi-tenant isolation.
+    
+    Features:
+    - Holds stock for a checkout without writing an OUT movement
+    - Product must belong to user's company
+    - Holds expire on their own and are swept by `liberar_reservas`
+    
+    Endpoints:
+    - GET /reservations/ → List active reservations for user's company
+    - POST /reservations/ → Hold stock of a product
+    - GET /reservations/{id}/ → Retrieve only if it belongs to user's company
+    - DELETE /reservations/{id}/ → Release the hold
+    """
+    
+    model = StockReservation
+    serializer_class = StockReservationSerializer
+
+    def get(self, request, pk=None):
+        """
+        List active reservations or retrieve a specific one.
+        
+        Query Parameters:
+            - product_id: Filter by product ID (optional)
+            
+        Args:
+            pk: Optional reservation ID
+            
+        Returns:
+            Response: Reservation data or list
+        """
+        try:
+            if pk is not None:
+                reservation = self.get_company_queryset().get(pk=pk)
+                return Response(
+                    self.serializer_class(reservation).data,
+                    status=status.HTTP_200_OK
+                )
+
+            queryset = self.get_company_queryset().filter(
+                status=StockReservation.ACTIVE
+            )
+            product_id = request.query_params.get('product_id')
+            if product_id:
+                queryset = queryset.filter(product_id=product_id)
+
+            serializer = self.serializer_class(queryset, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+    def post(self, request):
+        """
+        Hold stock of a product in user's company.
+        
+        Required Fields:
+            - product: int (product ID)
+            - quantity: int
+            
+        Optional Fields:
+            - ttl_seconds: int (defaults to STOCK_RESERVATION_TTL_SECONDS)
+            - reference: str (cart or order reference)
+            
+        Returns:
+            Response: Created reservation data
+        """
+        try:
+            company = self.get_company()
+
+            serializer = StockReservationCreateSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                product = Product.objects.get(
+                    id=serializer.validated_data['product'],
+                    company=company
+                )
+            except Product.DoesNotExist:
+                return Response(
+                    {
+                        "detail": "Product not found or doesn't belong to your company"
+                    },
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            reservation = ReservationService.reservar(
+                product=product,
+                quantity=serializer.validated_data['quantity'],
+                ttl_seconds=serializer.validated_data.get('ttl_seconds'),
+                reference=serializer.validated_data.get('reference', '')
+            )
+            return Response(
+                self.serializer_class(reservation).data,
+                status=status.HTTP_201_CREATED
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+    def delete(self, request, pk):
+        """
+        Release a reservation of user's company.
+        
+        Args:
+            pk: Reservation ID
+            
+        Returns:
+            Response: Empty response with 204 status
+        """
+        try:
+            reservation = self.get_company_queryset().get(pk=pk)
+            if not ReservationService.liberar(reservation):
+                return Response(
+                    {"detail": "La reserva no está activa"},
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+
+class ReservationConfirmView(BaseCompanyAPIView):
+    """
+    Turn a reservation into a stock exit.
+    
+    Endpoint:
+    POST /reservations/{id}/confirm/
+    
+    Request Body:
+        - note: str (optional)
+    """
+    
+    model = StockReservation
+
+    def post(self, request, pk):
+        """
+        Consume the hold with StockService (FEFO allocation).
+        
+        Args:
+            pk: Reservation ID
+            
+        Returns:
+            Response: Allocations of the OUT movements
+        """
+        try:
+            reservation = self.get_company_queryset().get(pk=pk)
+            plan = ReservationService.confirmar(
+                reservation,
+                note=request.data.get('note')
+            )
+            return Response(
+                {
+                    "reservation": reservation.id,
+                    "allocations": [
+                        {
+                            "batch_id": batch.id,
+                            "batch_code": batch.code,
+                            "quantity": quantity,
+                        }
+                        for batch, quantity in plan
+                    ],
+                },
+                status=status.HTTP_201_CREATED
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)
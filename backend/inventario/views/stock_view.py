@@ -4,13 +4,18 @@ Stock operation API Views with multi-tenant security.
 Legacy endpoints for stock in/out operations.
 """
 
+from datetime import date
+
+from django.db import IntegrityError
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
 from inventario.models.product import Product
-from inventario.services.stock_service import StockService
+from inventario.services.snapshot_service import SnapshotService
+from inventario.services.stock_service import StockService, StockInsuficienteError
 from inventario.serializers.movement_serializer import MovementSerializer
+from inventario.serializers.stock_serializer import StockBulkInSerializer, StockOrderOutSerializer
 from inventario.views.base_views import BaseCompanyAPIView
 
 
@@ -153,14 +158,15 @@ class StockOutView(BaseCompanyAPIView):
                 )
 
             # Use StockService to remove stock
-            StockService.registrar_salida(
+            plan = StockService.registrar_salida(
                 product=product,
                 quantity=int(quantity),
                 note=note
             )
             
-            # Return the last created movement
-            movement = product.batches.latest('id').movements.latest('created_at')
+            # Return the movement of the last batch touched by the allocation
+            last_batch, _ = plan[-1]
+            movement = last_batch.movements.latest('id')
             serializer = MovementSerializer(movement)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -175,3 +181,272 @@ class StockOutView(BaseCompanyAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+
+class StockBulkInView(BaseCompanyAPIView):
+    """
+    Register a whole supplier delivery in one request.
+    Every product must belong to user's company.
+    
+    Endpoint:
+    POST /stock/in/bulk/
+    
+    Request Body:
+        - lines: list (required), each line with:
+            - product: int (required)
+            - quantity: int (required)
+            - purchase_price: decimal (required)
+            - supplier: str (required)
+            - expiration_date: date (optional)
+            - code: str (optional, generated when missing)
+    """
+    
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Register every line with StockService in a single transaction.
+        Either all lines are stored or none.
+        
+        Returns:
+            Response: One result per line, in request order
+        """
+        try:
+            company = self.get_company()
+
+            serializer = StockBulkInSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            lines = serializer.validated_data['lines']
+
+            # Verify every product belongs to user's company with one query
+            product_ids = {line['product'] for line in lines}
+            products = Product.objects.filter(
+                company=company,
+                id__in=product_ids
+            ).in_bulk()
+
+            errors = [
+                {
+                    "line": index,
+                    "product": line['product'],
+                    "detail": "Product not found or doesn't belong to your company"
+                }
+                for index, line in enumerate(lines)
+                if line['product'] not in products
+            ]
+            if errors:
+                return Response(
+                    {"lines": errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            batches = StockService.registrar_entradas([
+                {**line, "product": products[line['product']]}
+                for line in lines
+            ])
+
+            results = [
+                {
+                    "line": index,
+                    "product": batch.product_id,
+                    "batch_id": batch.id,
+                    "batch_code": batch.code,
+                    "quantity": batch.quantity_received,
+                }
+                for index, batch in enumerate(batches)
+            ]
+            return Response({"results": results}, status=status.HTTP_201_CREATED)
+
+        except IntegrityError:
+            return Response(
+                {"detail": "Duplicate batch code for a product in this delivery"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValueError as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as exc:
+            return Response(
+                {"detail": "An error occurred"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class StockOrderOutView(BaseCompanyAPIView):
+    """
+    Dispatch a whole order in one transaction.
+    Every product must belong to user's company.
+    
+    Endpoint:
+    POST /stock/out/order/
+    
+    Request Body:
+        - lines: list (required), each line with:
+            - product: int (required)
+            - quantity: int (required)
+        - note: str (optional)
+    """
+    
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Allocate every line FEFO with StockService.despachar_pedido.
+        Either every line is dispatched or none, and the response lists
+        the short lines.
+        
+        Returns:
+            Response: Allocations per line, in request order
+        """
+        try:
+            company = self.get_company()
+
+            serializer = StockOrderOutSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            lines = serializer.validated_data['lines']
+
+            # Verify every product belongs to user's company with one query
+            products = Product.objects.filter(
+                company=company,
+                id__in={line['product'] for line in lines}
+            ).in_bulk()
+
+            errors = [
+                {
+                    "line": index,
+                    "product": line['product'],
+                    "detail": "Product not found or doesn't belong to your company"
+                }
+                for index, line in enumerate(lines)
+                if line['product'] not in products
+            ]
+            if errors:
+                return Response(
+                    {"lines": errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            plans = StockService.despachar_pedido(
+                [
+                    {"product": products[line['product']], "quantity": line['quantity']}
+                    for line in lines
+                ],
+                note=serializer.validated_data.get('note')
+            )
+
+            results = [
+                {
+                    "line": index,
+                    "product": line['product'],
+                    "quantity": line['quantity'],
+                    "allocations": [
+                        {
+                            "batch_id": batch.id,
+                            "batch_code": batch.code,
+                            "quantity": quantity,
+                        }
+                        for batch, quantity in plan
+                    ],
+                }
+                for index, (line, plan) in enumerate(zip(lines, plans))
+            ]
+            return Response({"results": results}, status=status.HTTP_201_CREATED)
+
+        except StockInsuficienteError as e:
+            return Response(
+                {"detail": str(e), "lines": e.faltantes},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValueError as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as exc:
+            return Response(
+                {"detail": "An error occurred"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class StockAsOfView(BaseCompanyAPIView):
+    """
+    Historical stock of several products at the end of a given day.
+    
+    Endpoint:
+    GET /stock/as-of/?date=YYYY-MM-DD&product_ids=1,2,3
+    
+    Query Parameters:
+        - date: date (required)
+        - product_ids: comma-separated product IDs (optional, defaults to
+          every product of user's company)
+    """
+    
+    permission_classes = [IsAuthenticated]
+    model = Product
+    max_products = 1000
+
+    def get(self, request):
+        """
+        Compute stock from the nearest snapshot plus later movements.
+        
+        Returns:
+            Response: Stock per product at the end of the day
+        """
+        try:
+            company = self.get_company()
+
+            try:
+                fecha = date.fromisoformat(request.query_params.get('date', ''))
+            except ValueError:
+                return Response(
+                    {"detail": "date is required (YYYY-MM-DD)"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            products = Product.objects.filter(company=company)
+            raw_ids = request.query_params.get('product_ids')
+            if raw_ids:
+                try:
+                    ids = {int(pid) for pid in raw_ids.split(',') if pid.strip()}
+                except ValueError:
+                    return Response(
+                        {"detail": "product_ids must be a comma-separated list of integers"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if len(ids) > self.max_products:
+                    return Response(
+                        {"detail": f"At most {self.max_products} product_ids per request"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                products = products.filter(id__in=ids)
+
+            product_ids = list(products.order_by('id').values_list('id', flat=True))
+
+            results = []
+            for start in range(0, len(product_ids), self.max_products):
+                chunk = product_ids[start:start + self.max_products]
+                stock = SnapshotService.stock_a_fecha(chunk, fecha)
+                results.extend(
+                    {"product": pid, "quantity": stock[pid]} for pid in chunk
+                )
+
+            return Response(
+                {"date": fecha, "results": results},
+                status=status.HTTP_200_OK
+            )
+
+        except Exception as exc:
+            return self.handle_exception(exc)